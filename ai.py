@@ -0,0 +1,215 @@
+import argparse
+import random
+import threading
+
+from board import components, diagonal, dilate, fitting_starts, spread
+from core import Fleet, GameClient, SHIPS
+from protocol import BOARD_SIZE, DEFAULT_HOST, DEFAULT_PORT, HIT, MISS
+#Importing various librarys
+#argparse = command line options
+#random = breaking ties between equally good cells
+#threading = several bots at the same time
+#board = bitmask operations on the opponent board
+#core = headless client and the own fleet
+#protocol = cell values and server address
+# The heatmap is kept bit-sliced, counter bit j of all cells is one int, so adding a whole
+# set of ship positions costs a few int operations instead of a loop over the cells
+
+
+def add_counts(planes: list, mask: int, weight: int = 1) -> None:
+    '''
+    Function for adding weight to the counter of every cell in mask
+    '''
+    j = 0
+    while weight:
+        if weight & 1:
+            carry = mask
+            i = j
+            while carry:
+                while i >= len(planes):
+                    planes.append(0)
+                planes[i], carry = planes[i] ^ carry, planes[i] & carry
+                i += 1
+        weight >>= 1
+        j += 1
+
+
+def best_cells(planes: list, allowed: int) -> int:
+    '''
+    Function for getting the mask of the allowed cells with the highest counter
+    '''
+    best = allowed
+    for plane in reversed(planes):
+        if best & plane:
+            best &= plane
+    return best
+
+
+class ShotPlanner:
+    '''
+    Class for choosing shots, every cell is scored by the number of remaining ship positions covering it
+    As long as a ship is hit but not sunk only positions through its hits are counted
+    '''
+    def __init__(self, lengths: list = None, size: int = BOARD_SIZE, seed: int = None) -> None:
+        '''
+        Initializing the planner for the fleet of the opponent
+        '''
+        self.lengths = sorted(lengths or SHIPS)
+        self.size = size
+        self.full = (1 << size * size) - 1
+        self.rng = random.Random(seed)
+
+    def read_board(self, opponent: bytes) -> tuple:
+        '''
+        Method for getting the hits and misses of the opponent board as masks
+        '''
+        hits = misses = 0
+        for index, value in enumerate(opponent or b""):
+            if value == HIT:
+                hits |= 1 << index
+            elif value == MISS:
+                misses |= 1 << index
+        return hits, misses
+
+    def density(self, opponent: bytes) -> tuple:
+        '''
+        Method for computing the heatmap, returns the counter planes and the cells worth a shot
+        '''
+        hits, misses = self.read_board(opponent)
+        shot = hits | misses
+        # Cells diagonal to a hit can never hold a ship, ships are straight and do not touch
+        beside = diagonal(hits, self.size)
+        remaining = list(self.lengths)
+        sunk = 0
+        open_groups = []
+        for group in components(hits, self.size):
+            length = group.bit_count()
+            # Sunk if the ship can not continue in any direction or if no longer ship is left
+            if not spread(group, self.size) & ~group & ~misses & ~beside or length >= max(remaining, default=0):
+                sunk |= group
+                if length in remaining:
+                    remaining.remove(length)
+            else:
+                open_groups.append(group)
+
+        # Cells where no ship can be
+        blocked = misses | dilate(sunk, self.size) | beside
+        free = self.full & ~blocked
+        planes = []
+        # Target mode, only positions through the first hit ship which is not sunk yet
+        target = open_groups[0] if open_groups else 0
+        for length in set(remaining):
+            count = remaining.count(length)
+            for orientation in ("horizontal", "vertical"):
+                step = self.size if orientation == "vertical" else 1
+                starts = fitting_starts(free, length, orientation, self.size)
+                if target:
+                    # Start cells from which a ship covers every cell of the target
+                    covering = starts
+                    for cell in (target & -target, 1 << target.bit_length() - 1):
+                        reach = 0
+                        for i in range(length):
+                            reach |= cell >> i * step
+                        covering &= reach
+                    starts = covering
+                for i in range(length):
+                    add_counts(planes, starts << i * step, count)
+        return planes, free & ~shot & self.full
+
+    def heatmap(self, opponent: bytes) -> list:
+        '''
+        Method for getting the score of every cell, for showing it on the board
+        '''
+        planes, allowed = self.density(opponent)
+        scores = [0] * (self.size * self.size)
+        for index in range(self.size * self.size):
+            if allowed >> index & 1:
+                scores[index] = sum((plane >> index & 1) << j for j, plane in enumerate(planes))
+        return scores
+
+    def suggest(self, opponent: bytes) -> tuple:
+        '''
+        Method for getting the best (row, col) to shoot at, None if every cell was shot
+        '''
+        planes, allowed = self.density(opponent)
+        if not allowed:
+            # Nothing consistent with the known ships left, any cell which was not shot yet
+            hits, misses = self.read_board(opponent)
+            allowed = self.full & ~(hits | misses)
+            if not allowed:
+                return None
+        best = best_cells(planes, allowed)
+        if not best:
+            best = allowed
+        # A random one of the best cells, so the bot is not predictable
+        cells = []
+        while best:
+            low = best & -best
+            cells.append(low.bit_length() - 1)
+            best ^= low
+        return divmod(self.rng.choice(cells), self.size)
+
+
+class AIPlayer:
+    '''
+    Class for a bot which plays one game on the headless client, with a random fleet
+    '''
+    def __init__(self, username: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, seed: int = None,
+                 on_event=None, binary: bool = False, resume: bool = False) -> None:
+        '''
+        Initializing the bot, on_event gets all events of the game as well, binary uses the compact format if the server offers it
+        resume continues the game on a new connection if the old one is lost
+        '''
+        rng = random.Random(seed)
+        fleet = Fleet()
+        fleet.auto_place(rng=rng)
+        self.planner = ShotPlanner(SHIPS, fleet.size, rng.random())
+        self.forward = on_event
+        self.client = GameClient(username, fleet, self.on_event, host, port, binary=binary, resume=resume)
+        self.shots = 0
+        self.won = None
+
+    def on_event(self, kind: str, payload) -> None:
+        '''
+        Method for answering the turns of the game, called from the network thread
+        '''
+        if kind == "turn" and payload:
+            board = self.client.session.board
+            cell = self.planner.suggest(board.opponent if board else None)
+            if cell:
+                self.shots += 1
+                self.client.move(*cell)
+        elif kind == "game_over":
+            self.won = payload
+        if self.forward:
+            self.forward(kind, payload)
+
+    def run(self) -> None:
+        '''
+        Method for playing the game in the current thread
+        '''
+        self.client.run()
+        self.client.close()
+
+
+if __name__ == "__main__":
+    # Command line options
+    parser = argparse.ArgumentParser(description="Battleship bots, two of them play against each other")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="server address")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="server port")
+    parser.add_argument("--bots", type=int, default=1, help="number of bots playing at the same time")
+    parser.add_argument("--seed", type=int, default=None, help="seed for fleets and shots")
+    parser.add_argument("--binary", action="store_true", help="use the compact binary format if the server offers it")
+    parser.add_argument("--resume", action="store_true", help="continue games after a lost connection")
+    args = parser.parse_args()
+
+    players = [AIPlayer(f"bot{i}", args.host, args.port, None if args.seed is None else args.seed + i,
+                        binary=args.binary, resume=args.resume)
+               for i in range(args.bots)]
+    threads = [threading.Thread(target=player.run) for player in players]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for player in players:
+        print(f"{player.client.session.username}: {'won' if player.won else 'lost'} after {player.shots} shots")
@@ -0,0 +1,114 @@
+import time
+from collections import deque
+
+from metrics import METRICS
+#Importing various librarys
+#time = progress of the effects
+#deque = effects in the order of their next frame
+#metrics = optional timers and counters
+# No tkinter in here, the animator only needs after and after_cancel of the window
+
+
+class Effect:
+    '''
+    Class for one running effect, step gets the progress from 0 to 1, done is called once it has ended
+    '''
+    __slots__ = ("step", "done", "start", "duration")
+
+    def __init__(self, step, done, start: float, duration: float) -> None:
+        self.step = step
+        self.done = done
+        self.start = start
+        self.duration = duration
+
+
+class Animator:
+    '''
+    Class for timed effects on the Tk thread, all of them are driven by one after() tick
+    Every target (any hashable key, e.g. the window or a cell of a board) has at most one running effect
+    '''
+    def __init__(self, root, interval: int = 16, budget: float = 0.004, enabled: bool = True) -> None:
+        '''
+        Initializing the animator, interval in milliseconds, budget is the time in seconds one tick may draw
+        enabled False shows every effect in its final state right away, e.g. for bots and slow machines
+        '''
+        self.root = root
+        self.interval = interval
+        self.budget = budget
+        self.enabled = enabled
+        # Target -> running effect
+        self.effects = {}
+        # (target, effect) in the order of their next frame, cancelled effects are skipped
+        self.order = deque()
+        self.job = None
+
+    def animate(self, target, duration: int, step, done=None, merge: bool = False) -> None:
+        '''
+        Method for starting an effect of duration milliseconds on target
+        A running effect on the same target is stopped, with merge it keeps running and the new one is dropped
+        '''
+        if target in self.effects:
+            if merge:
+                return
+            self.cancel(target)
+        if not self.enabled or duration <= 0:
+            step(1.0)
+            if done:
+                done()
+            return
+        effect = Effect(step, done, time.perf_counter(), duration / 1000)
+        self.effects[target] = effect
+        self.order.append((target, effect))
+        # The first frame right away, not one tick later
+        step(0.0)
+        if self.job is None:
+            self.job = self.root.after(self.interval, self.tick)
+
+    def cancel(self, target) -> None:
+        '''
+        Method for stopping the effect on target where it is, done is not called
+        '''
+        self.effects.pop(target, None)
+
+    def cancel_all(self) -> None:
+        '''
+        Method for stopping all effects, e.g. before the widgets are destroyed
+        '''
+        self.effects.clear()
+        self.order.clear()
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def tick(self) -> None:
+        '''
+        Method for drawing the next frame of the effects, the ones which do not fit in the budget come first next tick
+        '''
+        self.job = None
+        start = time.perf_counter()
+        for _ in range(len(self.order)):
+            target, effect = self.order.popleft()
+            if self.effects.get(target) is not effect:
+                continue
+            if time.perf_counter() - start > self.budget:
+                self.order.appendleft((target, effect))
+                METRICS.count("animation_deferred")
+                break
+            progress = min(1.0, (start - effect.start) / effect.duration)
+            try:
+                effect.step(progress)
+            except Exception as e:
+                # Widget was destroyed in between
+                print(f"Error in animation: {e}")
+                del self.effects[target]
+                continue
+            if progress < 1.0:
+                self.order.append((target, effect))
+            else:
+                del self.effects[target]
+                if effect.done:
+                    effect.done()
+        METRICS.stop("animation_tick", start)
+        # A done callback may have started the next tick already
+        if self.order and self.job is None:
+            self.job = self.root.after(self.interval, self.tick)
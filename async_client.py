@@ -0,0 +1,171 @@
+import asyncio
+
+from compact import frame
+from core import Fleet, GameSession
+from protocol import DEFAULT_HOST, DEFAULT_PORT, END_BYTE
+#Importing various librarys
+#asyncio = many connections in one thread
+#compact = length prefixed frames of the compact format
+#core = protocol of one game and the own board
+#protocol = server address and message format
+
+# Longest message which is accepted, a field update has about 1 KB
+MAX_FRAME = 64 * 1024
+
+
+class AsyncConnection:
+    '''
+    Class for sending and receiving zero terminated messages with asyncio, same format as send_str / receive_str
+    '''
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, read_timeout: float = None) -> None:
+        '''
+        Initializing the connection with already opened streams, read_timeout in seconds, None waits forever
+        '''
+        self.reader = reader
+        self.writer = writer
+        self.read_timeout = read_timeout
+
+    @classmethod
+    async def open(cls, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                   connect_timeout: float = 10.0, read_timeout: float = None) -> "AsyncConnection":
+        '''
+        Method for connecting to the server, raises TimeoutError if it takes longer than connect_timeout seconds
+        '''
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, limit=MAX_FRAME),
+                                                connect_timeout)
+        return cls(reader, writer, read_timeout)
+
+    async def send(self, data: str) -> None:
+        '''
+        Method for sending one message
+        '''
+        self.writer.write(bytes(data, 'utf-8') + bytes([END_BYTE]))
+        await self.writer.drain()
+
+    async def recv(self) -> str:
+        '''
+        Method for receiving one message, raises TimeoutError after read_timeout seconds
+        and ConnectionError if the server closed the connection
+        '''
+        try:
+            frame = await asyncio.wait_for(self.reader.readuntil(bytes([END_BYTE])), self.read_timeout)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Connection closed by server")
+        except asyncio.LimitOverrunError:
+            raise ConnectionError(f"Message longer than {MAX_FRAME} bytes")
+        return str(frame[:-1], 'utf-8')
+
+    async def send_packet(self, payload: bytes) -> None:
+        '''
+        Method for sending one length prefixed message of the compact format
+        '''
+        self.writer.write(frame(payload))
+        await self.writer.drain()
+
+    async def recv_packet(self) -> bytes:
+        '''
+        Method for receiving one length prefixed message of the compact format
+        '''
+        try:
+            return await asyncio.wait_for(self._read_packet(), self.read_timeout)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Connection closed by server")
+
+    async def _read_packet(self) -> bytes:
+        length = shift = 0
+        while True:
+            byte = (await self.reader.readexactly(1))[0]
+            length |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                break
+        if length > MAX_FRAME:
+            raise ConnectionError(f"Message longer than {MAX_FRAME} bytes")
+        return await self.reader.readexactly(length)
+
+    @property
+    def closed(self) -> bool:
+        '''
+        True once the other side has closed the connection or it broke, known without reading from it
+        '''
+        return self.reader.at_eof() or self.reader.exception() is not None or self.writer.is_closing()
+
+    async def close(self) -> None:
+        '''
+        Method for closing the connection
+        '''
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class AsyncGameClient:
+    '''
+    Class for playing one game on an AsyncConnection, thousands of them can share one event loop
+    Events are passed to on_event, without on_event they are queued for next_event
+    '''
+    def __init__(self, username: str, fleet: Fleet, on_event=None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 connect_timeout: float = 10.0, read_timeout: float = None) -> None:
+        '''
+        Initializing the client, nothing happens until run is awaited
+        '''
+        self.events = asyncio.Queue()
+        self.on_event = on_event or (lambda kind, payload: self.events.put_nowait((kind, payload)))
+        self.session = GameSession(username, fleet, self.on_event)
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.connection = None
+
+    async def run(self) -> None:
+        '''
+        Method for connecting and handling all messages until the game has ended
+        '''
+        try:
+            self.connection = await AsyncConnection.open(self.host, self.port, self.connect_timeout, self.read_timeout)
+            await self.send_all(self.session.start())
+        except (OSError, asyncio.TimeoutError) as e:
+            self.session.state = "over"
+            self.on_event("error", ("Connection Error", str(e) or "Connection timed out"))
+            return
+
+        try:
+            while self.session.active:
+                message = await self.connection.recv()
+                await self.send_all(self.session.receive(message))
+        except (OSError, asyncio.TimeoutError) as e:
+            if self.session.active:
+                kind = "error" if self.session.state == "searching" else "disconnected"
+                self.session.state = "over"
+                self.on_event(kind, ("Connection Error", str(e)) if kind == "error" else str(e))
+        finally:
+            await self.connection.close()
+
+    async def send_all(self, messages: list) -> None:
+        '''
+        Method for sending several messages
+        '''
+        for message in messages:
+            await self.connection.send(message)
+
+    async def move(self, row: int, col: int) -> None:
+        '''
+        Method for sending a shot
+        '''
+        await self.connection.send(self.session.move(row, col))
+
+    async def next_event(self) -> tuple:
+        '''
+        Method for waiting for the next (kind, payload) event, only used without on_event
+        '''
+        return await self.events.get()
+
+
+async def run_many(clients: list) -> None:
+    '''
+    Function for running many clients concurrently in the current event loop
+    '''
+    await asyncio.gather(*(client.run() for client in clients))
@@ -0,0 +1,53 @@
+import random
+import time
+
+import common  # noqa: F401, only for putting the client modules on sys.path
+from ai import ShotPlanner
+from board import BitBoard
+from core import Fleet
+#Importing various librarys
+#random = seeded fleets
+#time = time measurement
+#common = makes the client modules importable
+#ai = the shot planner
+#board = the board which is shot at
+#core = random fleets
+
+# (name, ship lengths, board size)
+BOARDS = [
+    ("10x10", [2, 2, 3, 3, 4], 10),
+    ("20x20", [5, 4, 3, 3, 2] * 4, 20),
+]
+
+
+def play(lengths: list, size: int, seed: int) -> tuple:
+    '''
+    Function for letting the planner sink a random fleet, returns the shots and the time spent choosing them
+    '''
+    fleet = Fleet(size)
+    fleet.auto_place(lengths, rng=random.Random(seed))
+    board = BitBoard.from_bytes(fleet.encode(), size)
+    planner = ShotPlanner(lengths, size, seed)
+    shots = 0
+    spent = 0.0
+    while not board.all_sunk:
+        view = board.encode(hide_ships=True)
+        start = time.perf_counter()
+        row, col = planner.suggest(view)
+        spent += time.perf_counter() - start
+        board.shoot(row, col)
+        shots += 1
+    return shots, spent
+
+
+def main(games: int = 100) -> None:
+    print(f"{'board':<6} {'shots/game':>11} {'us/move':>9}")
+    for name, lengths, size in BOARDS:
+        results = [play(lengths, size, seed) for seed in range(games)]
+        shots = sum(result[0] for result in results)
+        spent = sum(result[1] for result in results)
+        print(f"{name:<6} {shots / games:>11.1f} {spent / shots * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
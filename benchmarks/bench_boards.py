@@ -0,0 +1,47 @@
+import time
+import tkinter as tk
+
+import common  # noqa: F401, only for putting the client modules on sys.path
+from main import CanvasBoard, LabelBoard, COLORS
+#Importing various librarys
+#tkinter = root window for the boards, needs a display (e.g. Xvfb)
+#common = makes the client modules importable
+
+
+def build(root: tk.Tk, board_class, size: int) -> tuple:
+    '''
+    Function for measuring build time and the time for recoloring every cell once, in milliseconds
+    '''
+    start = time.perf_counter()
+    board = board_class(root, size=size)
+    board.pack()
+    root.update()
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in range(size):
+        for col in range(size):
+            board.set_color(row, col, COLORS["hit"])
+    root.update()
+    recolored = time.perf_counter() - start
+    widgets = len(board.winfo_children()) + 1
+    board.destroy()
+    return built * 1000, recolored * 1000, widgets
+
+
+def main() -> None:
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Skipped, no display available: {e}")
+        return
+    print(f"{'board':<12} {'size':>5} {'build ms':>9} {'recolor ms':>11} {'widgets':>8}")
+    for size in (10, 30):
+        for board_class in (LabelBoard, CanvasBoard):
+            built, recolored, widgets = build(root, board_class, size)
+            print(f"{board_class.__name__:<12} {size:>5} {built:>9.1f} {recolored:>11.1f} {widgets:>8}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+import ast
+
+import common
+from protocol import decode_update
+#Importing various librarys
+#ast = literal_eval for comparison
+#common = shared benchmark helpers
+
+
+def legacy_decode(message: str) -> dict:
+    '''
+    The previous game_loop decoding, eval twice on every message
+    '''
+    if isinstance(eval(message), dict):
+        return eval(message)
+    return None
+
+
+def main() -> None:
+    print(f"{'shots':>5} {'eval x2':>10} {'literal_eval':>13} {'decode_update':>14}  (us per message)")
+    for shots in (0, 20, 60, 100):
+        message = common.sample_message(shots)
+        timings = [
+            common.measure(lambda: legacy_decode(message), number=200),
+            common.measure(lambda: ast.literal_eval(message), number=200),
+            common.measure(lambda: decode_update(message), number=200),
+        ]
+        print(f"{shots:>5} {timings[0]:>10.1f} {timings[1]:>13.1f} {timings[2]:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import socket
+import threading
+import time
+
+import common
+from protocol import FrameReader, encode_frame
+#Importing various librarys
+#socket = local socketpair
+#threading = feeding the socket while reading
+#common = shared benchmark helpers
+
+MESSAGES = 2000
+
+
+class CountingSocket:
+    '''
+    Class wrapping a socket and counting the receive syscalls
+    '''
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.calls = 0
+
+    def recv(self, size: int) -> bytes:
+        self.calls += 1
+        return self.sock.recv(size)
+
+    def recv_into(self, buffer, size: int = 0) -> int:
+        self.calls += 1
+        return self.sock.recv_into(buffer, size)
+
+
+def legacy_receive(sock: CountingSocket, stats: dict) -> str:
+    '''
+    The previous receive_str loop, one recv call per byte
+    '''
+    data_bytes = bytes()
+    end_byte = bytes([0])
+    while True:
+        chunk = sock.recv(1)
+        if chunk == end_byte or chunk == bytes([]):
+            break
+        # Every += copies the whole message received so far
+        stats["copied"] += len(data_bytes) + len(chunk)
+        data_bytes += chunk
+    return str(data_bytes, 'utf-8')
+
+
+def feed(sock: socket.socket, payload: bytes) -> None:
+    '''
+    Function for sending all messages from a second thread
+    '''
+    sock.sendall(payload * MESSAGES)
+    sock.shutdown(socket.SHUT_WR)
+
+
+def run(name: str, read_all) -> None:
+    '''
+    Function for running one reader against a fresh socketpair
+    '''
+    message = common.sample_message()
+    server, client = socket.socketpair()
+    counting = CountingSocket(client)
+    sender = threading.Thread(target=feed, args=(server, encode_frame(message)), daemon=True)
+    start = time.perf_counter()
+    sender.start()
+    copied = read_all(counting, message)
+    elapsed = time.perf_counter() - start
+    sender.join()
+    server.close()
+    client.close()
+    print(f"{name:<10} {elapsed / MESSAGES * 1e6:8.1f} us/msg "
+          f"{counting.calls / MESSAGES:8.2f} syscalls/msg "
+          f"{copied / MESSAGES:10.0f} bytes copied/msg")
+
+
+def read_legacy(sock: CountingSocket, message: str) -> int:
+    stats = {"copied": 0}
+    for _ in range(MESSAGES):
+        assert legacy_receive(sock, stats) == message
+    return stats["copied"]
+
+
+def read_framed(sock: CountingSocket, message: str) -> int:
+    reader = FrameReader(sock)
+    for _ in range(MESSAGES):
+        assert reader.read_str() == message
+    return reader.bytes_copied
+
+
+def main() -> None:
+    print(f"{MESSAGES} field updates of {len(common.sample_message())} bytes")
+    run("legacy", read_legacy)
+    run("framed", read_framed)
+
+
+if __name__ == "__main__":
+    main()
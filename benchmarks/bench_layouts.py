@@ -0,0 +1,34 @@
+import random
+import time
+
+import common
+from board import random_layouts, solve_fleet
+#Importing various librarys
+#random = seeded layouts
+#time = time measurement
+#common = shared benchmark helpers
+#board = placement solver
+
+# (name, ship lengths, board size), from the normal fleet up to dense fleets on bigger boards
+FLEETS = [
+    ("default", [2, 2, 3, 3, 4], 10),
+    ("classic", [4, 3, 3, 2, 2, 2, 1, 1, 1, 1], 10),
+    ("dense", [5, 4, 4, 3, 3, 3, 2, 2, 2, 2], 10),
+    # 34 cells, random searches often get stuck and have to start over
+    ("packed", [5, 4, 4, 3, 3, 3, 2, 2, 2, 2, 1, 1, 1, 1], 10),
+    ("large", [5, 4, 3, 3, 2] * 4, 20),
+]
+
+
+def main(count: int = 5000) -> None:
+    print(f"{'fleet':<8} {'solve ms':>9} {'layouts/s':>10} {'found':>7}")
+    for name, lengths, size in FLEETS:
+        solve = common.measure(lambda: solve_fleet(lengths, size, random.Random(1)), number=20) / 1000
+        start = time.perf_counter()
+        layouts = random_layouts(count, lengths, size, seed=1)
+        rate = len(layouts) / (time.perf_counter() - start)
+        print(f"{name:<8} {solve:>9.2f} {rate:>10.0f} {len(layouts):>7}")
+
+
+if __name__ == "__main__":
+    main()
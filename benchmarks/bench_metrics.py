@@ -0,0 +1,29 @@
+import common
+from metrics import Metrics
+#Importing various librarys
+#common = shared benchmark helpers
+#metrics = the instrumentation layer
+
+
+def hot_path(metrics: Metrics) -> None:
+    '''
+    The instrumentation of one received field update: two counters and one timer
+    '''
+    metrics.count("frames_received")
+    metrics.count("bytes_received", 1100)
+    start = metrics.clock()
+    metrics.stop("decode", start)
+
+
+def main() -> None:
+    disabled = Metrics()
+    enabled = Metrics(enabled=True)
+    baseline = common.measure(lambda: None, number=100000)
+    print(f"per received frame: disabled {common.measure(lambda: hot_path(disabled), number=100000) - baseline:6.3f} us, "
+          f"enabled {common.measure(lambda: hot_path(enabled), number=100000) - baseline:6.3f} us")
+    print(enabled.log_line())
+    print(enabled.prometheus(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import argparse
+
+import common
+import compact
+from ai import AIPlayer
+from load_test import start_server
+from metrics import METRICS
+from protocol import decode_update
+#Importing various librarys
+#argparse = command line options
+#common = shared benchmark helpers
+#compact = reference encoder and decoder of the binary format
+#ai = bots playing the measured games
+#load_test = local server
+#metrics = byte and frame counters of the clients
+#protocol = text field updates
+# Compares the text protocol with the compact binary format:
+# bytes on the wire per game and player, and the decoding time of one field update
+# Also checks that clients fall back to text against a server which offers nothing
+
+
+def bytes_per_game(port: int, games: int, binary: bool) -> dict:
+    '''
+    Function for playing games bot against bot and counting the bytes of both clients
+    '''
+    METRICS.counters.clear()
+    for game in range(games):
+        bots = [AIPlayer(f"bench{game}_{i}", "127.0.0.1", port, seed=game * 2 + i, binary=binary) for i in range(2)]
+        threads = [bot.client.start() for bot in bots]
+        for thread in threads:
+            thread.join()
+        for bot in bots:
+            bot.client.close()
+            if bot.client.compact != binary:
+                raise RuntimeError("server did not negotiate the expected format")
+    counters = METRICS.snapshot()["counters"]
+    players = 2 * games
+    return {name: counters.get(name, 0) / players
+            for name in ("bytes_sent", "bytes_received", "frames_sent", "frames_received")}
+
+
+def legacy_fallback(port: int, games: int) -> None:
+    '''
+    Function for playing games with clients which want every capability against a server which offers none,
+    it reads every message as the original protocol, so anything sent in addition would become a name or a field
+    '''
+    for game in range(games):
+        bots = [AIPlayer(f"legacy{game}_{i}", "127.0.0.1", port, seed=game * 2 + i, binary=True, resume=True)
+                for i in range(2)]
+        threads = [bot.client.start() for bot in bots]
+        for thread in threads:
+            thread.join()
+        for bot, opponent in zip(bots, reversed(bots)):
+            bot.client.close()
+            if bot.won is None or bot.client.compact or bot.client.token:
+                raise RuntimeError(f"{bot.client.session.username} did not fall back to the text protocol")
+            if bot.client.session.opponent_name != opponent.client.session.username:
+                raise RuntimeError(f"server registered {bot.client.session.opponent_name!r} "
+                                   f"instead of {opponent.client.session.username!r}")
+    print(f"legacy server: {games} games of clients with binary and resume finished on the text protocol")
+
+
+def decode_times() -> None:
+    '''
+    Function for timing the decoding of one field update in both formats
+    '''
+    old = decode_update(common.sample_message(40))
+    new = decode_update(common.sample_message(41))
+    text = common.sample_message(41)
+    delta = compact.encode_update(old, new)
+    first = compact.encode_update(compact.empty_update(), new)
+    cases = (
+        ("text, whole boards", len(text) + 1, lambda: decode_update(text)),
+        ("compact, one shot", len(delta) + 1, lambda: compact.apply_update(old, delta)),
+        ("compact, first update", len(first) + 2, lambda: compact.apply_update(compact.empty_update(), first)),
+    )
+    for name, size, func in cases:
+        print(f"{name:<24} {size:5d} bytes  decode {common.measure(func, number=2000):7.2f} us")
+    # Both formats have to give the same boards
+    assert compact.apply_update(old, delta)[0] == new
+
+
+def main() -> None:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Text protocol against the compact binary format")
+    parser.add_argument("--games", type=int, default=20, help="games per format")
+    args = parser.parse_args()
+
+    METRICS.enable()
+    process, port = start_server("--binary")
+    try:
+        for name, binary in (("text", False), ("compact", True)):
+            result = bytes_per_game(port, args.games, binary)
+            print(f"{name:<8} per game and player: sent {result['bytes_sent']:7.0f} bytes "
+                  f"in {result['frames_sent']:5.1f} frames, received {result['bytes_received']:7.0f} bytes "
+                  f"in {result['frames_received']:5.1f} frames")
+    finally:
+        process.terminate()
+        process.wait()
+    # Without --binary and --resume the server does not offer anything, like the course server
+    process, port = start_server()
+    try:
+        legacy_fallback(port, args.games)
+    finally:
+        process.terminate()
+        process.wait()
+    decode_times()
+
+
+if __name__ == "__main__":
+    main()
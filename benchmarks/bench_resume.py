@@ -0,0 +1,170 @@
+import argparse
+import random
+import socket
+import threading
+import time
+
+import common  # noqa: F401, only for putting the client modules on sys.path
+from ai import AIPlayer
+from load_test import percentiles, start_server
+#Importing various librarys
+#argparse = command line options
+#random = which connection is dropped and when
+#socket = the proxy between the bots and the server
+#threading = one thread per direction of every proxied connection
+#time = time measurement
+#common = makes the client modules importable
+#ai = bots playing the measured games
+#load_test = local server and percentiles
+# The bots connect through a local proxy which drops random connections and can add latency,
+# measured is the time from the lost connection until the snapshot of the server was shown
+
+
+class FaultProxy:
+    '''
+    Class for a TCP proxy in front of the server which injects faults
+    '''
+    def __init__(self, port: int, latency: float = 0.0, seed: int = 1) -> None:
+        '''
+        Initializing the proxy for the server on port, latency in seconds is added to every chunk
+        '''
+        self.port = port
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.pairs = []
+        self.drops = 0
+        self._lock = threading.Lock()
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.address = self.listener.getsockname()
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self) -> None:
+        while True:
+            try:
+                client, _ = self.listener.accept()
+                server = socket.create_connection(("127.0.0.1", self.port))
+            except OSError:
+                return
+            for sock in (client, server):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._lock:
+                self.pairs.append((client, server))
+            threading.Thread(target=self.pump, args=(client, server), daemon=True).start()
+            threading.Thread(target=self.pump, args=(server, client), daemon=True).start()
+
+    def pump(self, source: socket.socket, target: socket.socket) -> None:
+        '''
+        Method for forwarding one direction until either side is closed
+        '''
+        try:
+            while True:
+                data = source.recv(4096)
+                if not data:
+                    break
+                if self.latency:
+                    time.sleep(self.latency)
+                target.sendall(data)
+        except OSError:
+            pass
+        self.close_pair(source, target)
+
+    def close_pair(self, *socks) -> None:
+        for sock in socks:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        with self._lock:
+            self.pairs = [pair for pair in self.pairs if pair[0] not in socks]
+
+    def drop_random(self) -> None:
+        '''
+        Method for cutting one random connection, like a lost wifi or a NAT timeout
+        '''
+        with self._lock:
+            if not self.pairs:
+                return
+            pair = self.rng.choice(self.pairs)
+        self.drops += 1
+        self.close_pair(*pair)
+
+    def close(self) -> None:
+        self.listener.close()
+        with self._lock:
+            pairs = list(self.pairs)
+        for pair in pairs:
+            self.close_pair(*pair)
+
+
+class Recovery:
+    '''
+    Class for the time from every reconnecting event until the next board of the same bot
+    '''
+    def __init__(self) -> None:
+        self.times = []
+        self.lost = 0
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def watch(self, name: str):
+        def on_event(kind, payload):
+            with self._lock:
+                if kind == "reconnecting":
+                    self._started[name] = time.perf_counter()
+                elif kind == "board" and name in self._started:
+                    self.times.append(time.perf_counter() - self._started.pop(name))
+                elif kind in ("disconnected", "error"):
+                    self.lost += 1
+        return on_event
+
+
+def run(port: int, games: int, interval: float, latency: float, binary: bool) -> dict:
+    '''
+    Function for playing games bot against bot through the proxy while it drops a connection every interval seconds
+    '''
+    proxy = FaultProxy(port, latency)
+    recovery = Recovery()
+    host, proxy_port = proxy.address
+    bots = [AIPlayer(f"resume{i}", host, proxy_port, seed=i, on_event=recovery.watch(f"resume{i}"),
+                     binary=binary, resume=True)
+            for i in range(games * 2)]
+    threads = [bot.client.start() for bot in bots]
+    start = time.perf_counter()
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(interval * random.uniform(0.5, 1.5))
+        proxy.drop_random()
+    elapsed = time.perf_counter() - start
+    proxy.close()
+    finished = sum(bot.won is not None for bot in bots)
+    return {"drops": proxy.drops, "recovery": recovery.times, "lost": recovery.lost,
+            "finished": finished, "players": len(bots), "elapsed": elapsed}
+
+
+def main() -> None:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Recovery after dropped connections through a fault injecting proxy")
+    parser.add_argument("--games", type=int, default=10, help="games played at the same time")
+    parser.add_argument("--interval", type=float, default=0.05, help="seconds between two dropped connections")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every forwarded chunk")
+    parser.add_argument("--binary", action="store_true", help="play with the compact binary format")
+    args = parser.parse_args()
+
+    process, port = start_server("--resume", *(["--binary"] if args.binary else []))
+    try:
+        result = run(port, args.games, args.interval, args.latency, args.binary)
+    finally:
+        process.terminate()
+        process.wait()
+    print(f"{result['drops']} dropped connections in {result['elapsed']:.1f} s, "
+          f"{result['finished']}/{result['players']} players finished their game, {result['lost']} lost it")
+    if result["recovery"]:
+        times = percentiles(result["recovery"])
+        print(f"recovery of {len(result['recovery'])} games: p50 {times['p50']:.1f} ms  p99 {times['p99']:.1f} ms  "
+              f"max {times['max']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
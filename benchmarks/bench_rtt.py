@@ -0,0 +1,127 @@
+import argparse
+import socket
+import threading
+import time
+
+import common
+from core import Fleet, GameClient
+from load_test import percentiles
+from protocol import FrameReader, encode_frame
+#Importing various librarys
+#argparse = command line options
+#socket = local echo server over TCP, a socketpair has no Nagle
+#threading = echo server in the background
+#time = time measurement
+#common = shared benchmark helpers
+#core = the client send path
+#load_test = percentiles
+#protocol = frames of the echo server
+# A shot is sent and the echo server answers with a field update and "continue" like the server does,
+# the time until both arrived is the round trip a player waits for after LAUNCH
+
+
+def echo_server(reply: bytes) -> tuple:
+    '''
+    Function for starting a local server which answers every frame with reply, returns the socket and the port
+    '''
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+
+    def handle(connection):
+        # Like the asyncio streams of server.py
+        connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for _ in FrameReader(connection):
+            connection.sendall(reply)
+        connection.close()
+
+    def accept():
+        while True:
+            try:
+                connection, _ = listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+    threading.Thread(target=accept, daemon=True).start()
+    return listener, listener.getsockname()[1]
+
+
+def legacy_send(client: GameClient, data: str) -> None:
+    '''
+    The previous send_str, payload and terminator in two calls
+    '''
+    client.komm_s.sendall(bytes(data, 'utf-8'))
+    client.komm_s.sendall(bytes([0]))
+
+
+def connect(port: int, nodelay: bool) -> GameClient:
+    '''
+    Function for a client connected to the echo server, optionally with Nagle's algorithm switched back on
+    '''
+    client = GameClient("bench", Fleet(), lambda kind, payload: None, "127.0.0.1", port)
+    client.connect()
+    if not nodelay:
+        client.komm_s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 0)
+    return client
+
+
+def measure_rtt(port: int, shots: int, nodelay: bool, send) -> dict:
+    '''
+    Function for measuring shots round trips
+    '''
+    client = connect(port, nodelay)
+    times = []
+    try:
+        for i in range(shots):
+            start = time.perf_counter()
+            send(client, str(divmod(i % 100, 10)))
+            client.receive_str()
+            client.receive_str()
+            times.append(time.perf_counter() - start)
+    finally:
+        client.close()
+    return percentiles(times)
+
+
+def measure_batch(port: int, rounds: int) -> None:
+    '''
+    Function for sending several frames at once, one sendmsg call against one call per frame
+    '''
+    messages = [common.sample_message(), "(1, 2)", "(3, 4)"]
+    for name, gather in (("one call per frame", False), ("sendmsg batch", True)):
+        client = connect(port, True)
+        client.writer.gather = gather
+        start = time.perf_counter()
+        for _ in range(rounds):
+            client.send_all(messages)
+            for _ in messages:
+                client.receive_str()
+                client.receive_str()
+        elapsed = time.perf_counter() - start
+        print(f"{name:<22} {elapsed / rounds * 1e6:8.1f} us per batch of {len(messages)}, "
+              f"{client.writer.send_calls / rounds:.0f} send calls")
+        client.close()
+
+
+def main() -> None:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Round trip of a shot against a local echo server")
+    parser.add_argument("--shots", type=int, default=200, help="shots per variant")
+    args = parser.parse_args()
+
+    listener, port = echo_server(encode_frame(common.sample_message()) + encode_frame("continue"))
+    variants = (
+        ("two writes (before)", False, legacy_send),
+        ("one write, Nagle on", False, GameClient.send_str),
+        ("one write, NODELAY", True, GameClient.send_str),
+    )
+    for name, nodelay, send in variants:
+        result = measure_rtt(port, args.shots, nodelay, send)
+        print(f"{name:<22} p50 {result['p50']:7.3f} ms  p99 {result['p99']:7.3f} ms  max {result['max']:7.3f} ms")
+    measure_batch(port, args.shots)
+    listener.close()
+
+
+if __name__ == "__main__":
+    main()
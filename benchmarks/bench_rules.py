@@ -0,0 +1,59 @@
+import random
+
+import common
+from core import Fleet
+#Importing various librarys
+#random = random placements
+#common = shared benchmark helpers
+#core = the bitmask based fleet
+
+# Offsets of all neighbouring cells, as used by the previous are_cells_around_free
+OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+def legacy_can_place(field: list, row: int, col: int, length: int, orientation: str) -> bool:
+    '''
+    The previous placement check on the list of lists, 8 neighbours per ship cell
+    '''
+    cells = [(row + i, col) for i in range(length)] if orientation == "vertical" else \
+        [(row, col + i) for i in range(length)]
+    for r, c in cells:
+        if not (0 <= r < 10 and 0 <= c < 10) or field[r][c] != " ":
+            return False
+        for dr, dc in OFFSETS:
+            nr, nc = r + dr, c + dc
+            if 0 <= nr < 10 and 0 <= nc < 10 and field[nr][nc] != " ":
+                return False
+    return True
+
+
+def main() -> None:
+    rng = random.Random(1)
+    fleet = common.random_fleet(rng)
+    field = fleet.field
+    moves = [(rng.randrange(10), rng.randrange(10), rng.choice((2, 3, 4)), rng.choice(("horizontal", "vertical")))
+             for _ in range(100)]
+
+    def legacy_checks():
+        for move in moves:
+            legacy_can_place(field, *move)
+
+    def bit_checks():
+        for move in moves:
+            fleet.can_place(*move)
+
+    def place_all():
+        new = Fleet()
+        for move in moves:
+            new.place_ship(*move)
+
+    print("us per 100 calls")
+    print(f"can_place  legacy {common.measure(legacy_checks, number=200):8.1f}  "
+          f"bitmask {common.measure(bit_checks, number=200):8.1f}")
+    print(f"occupied   legacy {common.measure(lambda: sum(row.count('o') for row in field), number=2000) * 100:8.1f}  "
+          f"bitmask {common.measure(fleet.occupied, number=2000) * 100:8.1f}")
+    print(f"place 100 ships on a new fleet {common.measure(place_all, number=200):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import os
+import threading
+import time
+import tracemalloc
+
+import common  # noqa: F401, only for putting the client modules on sys.path
+from ai import AIPlayer, ShotPlanner
+from core import Fleet, GameClient, SHIPS
+from load_test import percentiles, start_server
+#Importing various librarys
+#argparse = command line options
+#os = memory of the process
+#threading = the opponent bot and the headless player
+#time = time measurement
+#tracemalloc = python memory which is still referenced after every game
+#common = makes the client modules importable
+#ai = opponent bot and the shots of the measured player
+#core = headless client for the runs without a display
+#load_test = local server and percentiles
+# Plays many games in a row against a bot on a local server.py and measures after every game
+# how long it takes back to the lobby and how much memory the process holds
+# The Tk runs need a display, e.g. xvfb-run python benchmarks/bench_soak.py --games 300
+
+
+def rss_mb() -> float:
+    '''
+    Function for the current resident memory of the process, 0 where /proc is not available
+    '''
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return 0.0
+
+
+def opponent(index: int, port: int, previous: AIPlayer = None) -> AIPlayer:
+    '''
+    Function for starting the bot of the next game, a bot which played before queues again on its connection
+    '''
+    if previous:
+        fleet = Fleet()
+        fleet.auto_place(seed=index)
+        previous.client.rematch(fleet)
+        return previous
+    bot = AIPlayer(f"soakbot{index}", "127.0.0.1", port, seed=index)
+    bot.client.start()
+    return bot
+
+
+class Soak:
+    '''
+    Class for collecting the measurements of one run
+    '''
+    def __init__(self, games: int, port: int, requeue: bool) -> None:
+        self.games = games
+        self.port = port
+        self.requeue = requeue
+        self.played = 0
+        self.lobby_times = []
+        self.samples = []
+        self.bot = None
+        self.done = threading.Event()
+
+    def next_opponent(self) -> None:
+        self.bot = opponent(self.played, self.port, self.bot if self.requeue else None)
+
+    def finished(self, seconds: float) -> None:
+        '''
+        Method for recording one game, every 10 games the memory is sampled
+        '''
+        self.played += 1
+        self.lobby_times.append(seconds)
+        if self.played % 10 == 0:
+            self.samples.append((self.played, rss_mb(), tracemalloc.get_traced_memory()[0] / 1024 / 1024))
+        if self.played >= self.games:
+            self.done.set()
+
+    def report(self, name: str) -> None:
+        lobby = percentiles(self.lobby_times)
+        print(f"{name}: {self.played} games, time to lobby p50 {lobby['p50']} ms, p99 {lobby['p99']} ms, "
+              f"max {lobby['max']} ms")
+        for played, rss, traced in self.samples[::max(1, len(self.samples) // 10)]:
+            print(f"  after {played:4d} games  rss {rss:7.1f} MB  python {traced:6.2f} MB")
+        if len(self.samples) > 1:
+            first, last = self.samples[0], self.samples[-1]
+            print(f"  growth from game {first[0]} to {last[0]}: rss {last[1] - first[1]:+.1f} MB, "
+                  f"python {last[2] - first[2]:+.2f} MB")
+
+
+def soak_tk(soak: Soak, recreate: bool) -> None:
+    '''
+    Function for playing with the real window, recreate measures the old way of building a new window for every game
+    '''
+    import main
+
+    def create():
+        game = main.BattleshipGame(False, host="127.0.0.1", port=soak.port, requeue=soak.requeue)
+        planner = ShotPlanner(SHIPS)
+        show_turn = game.show_turn
+
+        def turn(my_turn):
+            show_turn(my_turn)
+            if my_turn:
+                board = game.client.session.board
+                game.selected_cell = planner.suggest(board.opponent if board else None)
+                game.make_move()
+
+        def game_over(won):
+            # Straight back to the lobby instead of waiting for the end screen
+            game.after(0, back_to_lobby)
+
+        game.dispatcher.register("turn", turn)
+        game.dispatcher.register("game_over", game_over)
+        return game
+
+    def play(game):
+        soak.next_opponent()
+        if not game.client:
+            game.username_entry.insert(0, "soak")
+            game.auto_place_ships()
+            game.start_game()
+
+    def back_to_lobby():
+        start = time.perf_counter()
+        if recreate:
+            game = state["game"]
+            game.client.close()
+            game.destroy()
+            state["game"] = create()
+            state["game"].update()
+        else:
+            state["game"].reset_game()
+            state["game"].update()
+        soak.finished(time.perf_counter() - start)
+        if soak.done.is_set():
+            state["game"].quit()
+        else:
+            play(state["game"])
+
+    state = {"game": create()}
+    play(state["game"])
+    # Every recreated window runs in the first mainloop, so the stack does not grow during the measurement
+    while not soak.done.is_set():
+        state["game"].update()
+        time.sleep(0.001)
+    state["game"].destroy()
+
+
+def soak_headless(soak: Soak) -> None:
+    '''
+    Function for playing with the headless client only, measures the network part of the way back to the lobby
+    '''
+    planner = ShotPlanner(SHIPS)
+    over = threading.Event()
+    client = None
+
+    def on_event(kind, payload):
+        if kind == "turn" and payload:
+            board = client.session.board
+            client.move(*planner.suggest(board.opponent if board else None))
+        elif kind in ("game_over", "error", "disconnected"):
+            over.set()
+
+    while not soak.done.is_set():
+        fleet = Fleet()
+        fleet.auto_place(seed=soak.played)
+        start = time.perf_counter()
+        if client and soak.requeue:
+            client.rematch(fleet)
+        else:
+            if client:
+                client.close()
+            client = GameClient("soak", fleet, on_event, "127.0.0.1", soak.port)
+            client.start()
+        soak.next_opponent()
+        # Until the server has paired the players again
+        while client.session.state == "searching" and not over.is_set():
+            time.sleep(0.0005)
+        lobby = time.perf_counter() - start
+        over.wait(60)
+        over.clear()
+        client.thread.join()
+        soak.finished(lobby)
+    client.close()
+
+
+def main() -> None:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Many games in a row, time back to the lobby and memory")
+    parser.add_argument("--games", type=int, default=200, help="number of games")
+    parser.add_argument("--requeue", action="store_true", help="keep the connection between the games")
+    parser.add_argument("--recreate", action="store_true", help="build a new window for every game like before")
+    parser.add_argument("--headless", action="store_true",
+                        help="without a window, time until the next game has started on the server")
+    args = parser.parse_args()
+
+    process, port = start_server()
+    tracemalloc.start()
+    soak = Soak(args.games, port, args.requeue)
+    try:
+        if args.headless:
+            soak_headless(soak)
+            soak.report("headless" + (" requeue" if args.requeue else ""))
+        else:
+            import tkinter as tk
+            try:
+                soak_tk(soak, args.recreate)
+            except tk.TclError as e:
+                print(f"No display ({e}), use xvfb-run or --headless")
+                return
+            soak.report(("recreate" if args.recreate else "in place") + (" requeue" if args.requeue else ""))
+    finally:
+        process.terminate()
+        process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import json
+import subprocess
+import sys
+
+import common
+#Importing various librarys
+#json = results of the measured process
+#subprocess = every measurement runs in a fresh interpreter
+#sys = path of the python interpreter
+#common = shared benchmark helpers
+
+# Runs in a fresh interpreter, measures until the first frame of the SelectorWindow
+# and for the special path also loading the media librarys like specialClient does
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+import main
+result = {{"import_ms": (time.perf_counter() - start) * 1000}}
+try:
+    window = main.SelectorWindow()
+    window.update()
+    result["first_frame_ms"] = (time.perf_counter() - start) * 1000
+    window.destroy()
+except main.tk.TclError as e:
+    result["first_frame_ms"] = None
+if {special}:
+    result["media_loaded"] = main.load_media()
+    if result["media_loaded"]:
+        main.media.shared_assets(main.ASSETS)
+    result["special_ready_ms"] = (time.perf_counter() - start) * 1000
+result["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+
+def probe(special: bool) -> dict:
+    '''
+    Function for running one startup in a fresh interpreter
+    '''
+    code = PROBE.format(root=common.ROOT, special=special)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=common.ROOT, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs: int = 5) -> None:
+    for name, special in (("normal", False), ("special", True)):
+        results = [probe(special) for _ in range(runs)]
+        best = min(results, key=lambda r: r["import_ms"])
+        frame = best["first_frame_ms"]
+        line = (f"{name:<8} import {best['import_ms']:7.1f} ms  "
+                f"first frame {'no display' if frame is None else f'{frame:7.1f} ms'}  "
+                f"peak rss {max(r['peak_rss_mb'] for r in results):6.1f} MB")
+        if special:
+            line += f"  media ready {best['special_ready_ms']:7.1f} ms"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
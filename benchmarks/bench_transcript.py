@@ -0,0 +1,54 @@
+import os
+import tempfile
+import time
+
+import common
+from protocol import decode_update
+from transcript import TranscriptReader, TranscriptWriter
+#Importing various librarys
+#os, tempfile = temporary transcript file
+#time = time measurement
+#common = shared benchmark helpers
+#protocol = decoding the recorded updates
+#transcript = recording and seeking
+
+UPDATES = 2000
+
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench.bst")
+    messages = [common.sample_message(shots % 100, seed=shots) for shots in range(UPDATES)]
+    updates = [decode_update(message) for message in messages]
+
+    # Time spent in the calling thread, the writing happens in the background
+    writer = TranscriptWriter(path, snapshot_every=10)
+    start = time.perf_counter()
+    for message, update in zip(messages, updates):
+        writer.received(message)
+        writer.board(update)
+    calling = time.perf_counter() - start
+    writer.close()
+    print(f"recording   {calling / UPDATES * 1e6:6.2f} us per update in the network thread, "
+          f"{os.path.getsize(path) / UPDATES:.0f} bytes per update")
+
+    start = time.perf_counter()
+    reader = TranscriptReader(path)
+    print(f"indexing    {(time.perf_counter() - start) * 1000:6.2f} ms for {len(reader.index)} records")
+
+    target = UPDATES - 5
+    start = time.perf_counter()
+    for position in reader.updates[:target]:
+        decode_update(reader.message(position))
+    print(f"seek by replaying every update {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    start = time.perf_counter()
+    updates_done, boards, position = reader.seek(target)
+    for update_position in reader.updates[updates_done:target]:
+        decode_update(reader.message(update_position))
+    print(f"seek by snapshot               {(time.perf_counter() - start) * 1000:8.2f} ms")
+    reader.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
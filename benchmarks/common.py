@@ -0,0 +1,61 @@
+import os
+import random
+import sys
+import time
+#Importing various librarys
+#os, sys = making the client modules importable from this folder
+#random = generating realistic boards
+#time = time measurement
+
+# The benchmarks live next to the client modules, not inside a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def sample_fields(shots: int = 40, seed: int = 1) -> dict:
+    '''
+    Function for creating a field update like the server sends it in the middle of a game
+    '''
+    rng = random.Random(seed)
+    own = [[" " for _ in range(10)] for _ in range(10)]
+    opponent = [[" " for _ in range(10)] for _ in range(10)]
+    # A few ships on the own board
+    for row, col, length in ((0, 0, 4), (2, 5, 3), (5, 1, 3), (8, 3, 2), (6, 8, 2)):
+        for i in range(length):
+            own[row][col + i] = "o"
+    for board in (own, opponent):
+        for _ in range(shots):
+            r, c = rng.randrange(10), rng.randrange(10)
+            board[r][c] = "s" if board[r][c] == "o" or rng.random() < 0.2 else "x"
+    return {"own": own, "opponent": opponent}
+
+
+def sample_message(shots: int = 40, seed: int = 1) -> str:
+    '''
+    Function for creating a field update string exactly as the server sends it
+    '''
+    return str(sample_fields(shots, seed))
+
+
+def measure(func, repeat: int = 5, number: int = 1000) -> float:
+    '''
+    Function for measuring the best time of one call in microseconds
+    '''
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / number * 1e6
+
+
+def random_fleet(rng: random.Random):
+    '''
+    Function for placing all ships of core.SHIPS at random positions
+    '''
+    from core import Fleet
+    fleet = Fleet()
+    fleet.auto_place(rng=rng)
+    return fleet
@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import common
+from async_client import AsyncGameClient, run_many
+from core import GameClient, GameSession
+from protocol import DEFAULT_HOST, DEFAULT_PORT
+#Importing various librarys
+#argparse = command line options
+#asyncio = with --async all players share one event loop
+#json = machine readable results
+#random = boards and shots of the simulated players
+#socket = finding a free port and waiting for the server
+#subprocess = starting the local server
+#sys = path of the python interpreter
+#threading = one network thread per player, like the GUI
+#time = latency measurement
+#common = shared benchmark helpers
+#async_client = client for many games in one event loop
+#core = the same client the GUI uses for connect_to_server and make_move
+
+
+class CountingClient(GameClient):
+    '''
+    Class for a GameClient which counts its received messages
+    '''
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.received = 0
+
+    def receive_str(self) -> str:
+        message = super().receive_str()
+        self.received += 1
+        return message
+
+
+class CountingSession(GameSession):
+    '''
+    Class for a GameSession which counts its received messages
+    '''
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.received = 0
+
+    def receive(self, message: str) -> list:
+        self.received += 1
+        return super().receive(message)
+
+
+class CountingAsyncClient(AsyncGameClient):
+    '''
+    Class for an AsyncGameClient which counts its received messages
+    '''
+    def __init__(self, username: str, fleet, on_event, host: str, port: int) -> None:
+        super().__init__(username, fleet, on_event, host, port)
+        self.session = CountingSession(username, fleet, on_event)
+
+    @property
+    def received(self) -> int:
+        return self.session.received
+
+
+class LoadPlayer:
+    '''
+    Class for one simulated player, shoots at random cells it has not tried yet
+    '''
+    def __init__(self, name: str, seed: int, host: str, port: int) -> None:
+        rng = random.Random(seed)
+        self.shots = [(row, col) for row in range(10) for col in range(10)]
+        rng.shuffle(self.shots)
+        self.client = self.make_client(name, common.random_fleet(rng), host, port)
+        self.started = None
+        self.matched = None
+        self.shot_sent = None
+        self.rtts = []
+        self.cpu = 0.0
+        self.result = None
+
+    def run(self) -> None:
+        '''
+        Method for playing one game, runs in its own thread
+        '''
+        cpu_start = time.thread_time()
+        self.started = time.perf_counter()
+        self.client.run()
+        self.cpu = time.thread_time() - cpu_start
+        self.client.close()
+
+    def make_client(self, name: str, fleet, host: str, port: int):
+        return CountingClient(name, fleet, self.on_event, host, port)
+
+    def shoot(self, row: int, col: int) -> None:
+        self.client.move(row, col)
+
+    def on_event(self, kind: str, payload) -> None:
+        '''
+        Method for handling the events, called from the network thread
+        '''
+        if kind == "game_start":
+            self.matched = time.perf_counter()
+        elif kind == "board" and self.shot_sent is not None:
+            # Round trip from sending the shot until its field update arrived
+            self.rtts.append(time.perf_counter() - self.shot_sent)
+            self.shot_sent = None
+        elif kind == "turn" and payload and self.shots:
+            self.shot_sent = time.perf_counter()
+            self.shoot(*self.shots.pop())
+        elif kind == "game_over":
+            self.result = "won" if payload else "lost"
+        elif kind in ("error", "disconnected"):
+            self.result = "error"
+
+
+class AsyncLoadPlayer(LoadPlayer):
+    '''
+    Class for one simulated player on the shared event loop, the game is run by run_many
+    '''
+    def __init__(self, *args) -> None:
+        super().__init__(*args)
+        self.sending = None
+
+    def make_client(self, name: str, fleet, host: str, port: int):
+        return CountingAsyncClient(name, fleet, self.on_event, host, port)
+
+    def shoot(self, row: int, col: int) -> None:
+        # on_event can not await, the shot is sent by its own task
+        self.sending = asyncio.get_running_loop().create_task(self.client.move(row, col))
+
+
+def percentiles(values: list) -> dict:
+    '''
+    Function for summarizing latencies in milliseconds
+    '''
+    if not values:
+        return {}
+    values = sorted(values)
+
+    def pick(p: float) -> float:
+        return round(values[min(len(values) - 1, int(p * len(values)))] * 1000, 3)
+
+    return {"p50": pick(0.5), "p90": pick(0.9), "p99": pick(0.99), "max": round(values[-1] * 1000, 3),
+            "count": len(values)}
+
+
+def start_server(*options: str) -> tuple:
+    '''
+    Function for starting server.py on a free port with further command line options, returns the process and the port
+    '''
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    process = subprocess.Popen([sys.executable, "server.py", "--host", "127.0.0.1", "--port", str(port),
+                                "--deterministic", *options], cwd=common.ROOT, stdout=subprocess.DEVNULL)
+    # Waiting until the server accepts connections
+    for _ in range(100):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return process, port
+
+
+def play_threads(matches: int, host: str, port: int, seed: int) -> tuple:
+    '''
+    Function for playing with one thread and GameClient per player, like many GUIs at once
+    Returns the players, the wall time and the client CPU time
+    '''
+    players = [LoadPlayer(f"load{i}", seed + i, host, port) for i in range(matches * 2)]
+    threads = [threading.Thread(target=player.run, daemon=True) for player in players]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return players, time.perf_counter() - start, sum(player.cpu for player in players)
+
+
+async def play_async(matches: int, host: str, port: int, seed: int) -> tuple:
+    '''
+    Function for playing with all players as AsyncGameClient in the current event loop
+    Returns the players, the wall time and the client CPU time
+    '''
+    players = [AsyncLoadPlayer(f"load{i}", seed + i, host, port) for i in range(matches * 2)]
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    for player in players:
+        player.started = start
+    await run_many([player.client for player in players])
+    return players, time.perf_counter() - start, time.thread_time() - cpu_start
+
+
+def run_load(matches: int, host: str, port: int, seed: int = 1, use_async: bool = False) -> dict:
+    '''
+    Function for playing matches games at the same time and collecting the measurements
+    use_async runs all players in one event loop instead of one thread each
+    '''
+    if use_async:
+        players, elapsed, cpu = asyncio.run(play_async(matches, host, port, seed))
+    else:
+        players, elapsed, cpu = play_threads(matches, host, port, seed)
+
+    messages = sum(player.client.received for player in players)
+    finished = [player for player in players if player.result in ("won", "lost")]
+    return {
+        "mode": "async" if use_async else "threads",
+        "matches": matches,
+        "players": len(players),
+        "finished": len(finished),
+        "errors": len(players) - len(finished),
+        "wall_s": round(elapsed, 3),
+        "games_per_s": round(matches / elapsed, 1),
+        "matchmaking_ms": percentiles([p.matched - p.started for p in players if p.matched]),
+        "shot_rtt_ms": percentiles([rtt for p in players for rtt in p.rtts]),
+        "messages_per_s": round(messages / elapsed, 1),
+        "client_cpu_ms_per_game": round(cpu / matches * 1000, 3),
+    }
+
+
+def main() -> None:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Plays many games at the same time and measures the client")
+    parser.add_argument("--matches", type=int, default=100, help="number of simultaneous games")
+    parser.add_argument("--host", default=None, help=f"server address, without it server.py is started locally "
+                                                     f"(the course server runs on {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=None, help="server port")
+    parser.add_argument("--seed", type=int, default=1, help="seed for boards and shots")
+    parser.add_argument("--output", default=None, help="file for the JSON results")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="all players as AsyncGameClient in one event loop instead of one thread each")
+    args = parser.parse_args()
+
+    process = None
+    if args.host is None:
+        process, port = start_server()
+        host = "127.0.0.1"
+    else:
+        host, port = args.host, args.port or DEFAULT_PORT
+    try:
+        results = run_load(args.matches, host, port, args.seed, args.use_async)
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+    results["server"] = "local" if process else f"{host}:{port}"
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
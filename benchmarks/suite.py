@@ -0,0 +1,381 @@
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+
+import common
+from animation import Animator
+from core import Fleet, GameClient
+from protocol import FrameReader, FrameWriter, decode_update, diff_board, BOARD_SIZE, HIT
+#Importing various librarys
+#argparse = command line options
+#json = baseline file
+#os, tempfile = synthetic video file
+#random = random placements
+#socket = socketpairs for the framing cases
+#sys = exit code for regressions
+#threading = reading while sending
+#common = shared benchmark helpers
+#animation = tick of the effects
+#core = fleet rules and the client send / receive path
+#protocol = decoding and diffing field updates, board size and cell values
+# Runs all cases, compares them with baseline.json and exits with 1 if a case got slower than the threshold
+# python benchmarks/suite.py --save records a new baseline on the current machine
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name -> function returning microseconds per operation, raises Skip if the case can not run here
+CASES = {}
+
+
+class Skip(Exception):
+    '''
+    Class for cases which need something that is not available, e.g. a display or cv2
+    '''
+
+
+def case(name: str):
+    '''
+    Function for registering a benchmark case
+    '''
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+
+@case("framing.roundtrip")
+def framing_roundtrip() -> float:
+    '''
+    One field update through GameClient.send_str and receive_str over a socketpair
+    '''
+    message = common.sample_message()
+    left, right = socket.socketpair()
+    sender = GameClient("bench", Fleet(), lambda kind, payload: None)
+    receiver = GameClient("bench", Fleet(), lambda kind, payload: None)
+    sender.komm_s = left
+    sender.writer = FrameWriter(left)
+    receiver.komm_s = right
+    receiver.reader = FrameReader(right)
+
+    def roundtrip():
+        sender.send_str(message)
+        receiver.receive_str()
+
+    try:
+        return common.measure(roundtrip, number=500)
+    finally:
+        left.close()
+        right.close()
+
+
+@case("framing.burst")
+def framing_burst() -> float:
+    '''
+    Reading 200 queued field updates which arrive in large chunks, per message
+    '''
+    payload = (common.sample_message().encode("utf-8") + bytes([0])) * 200
+
+    def burst():
+        left, right = socket.socketpair()
+        feeder = threading.Thread(target=left.sendall, args=(payload,))
+        feeder.start()
+        reader = FrameReader(right)
+        for _ in range(200):
+            reader.read_str()
+        feeder.join()
+        left.close()
+        right.close()
+
+    return common.measure(burst, repeat=9, number=10) / 200
+
+
+@case("decode.update")
+def decode_updates() -> float:
+    message = common.sample_message(60)
+    return common.measure(lambda: decode_update(message), number=1000)
+
+
+@case("decode.diff")
+def decode_diff() -> float:
+    old = decode_update(common.sample_message(40, seed=1))
+    new = decode_update(common.sample_message(41, seed=1))
+    return common.measure(lambda: (diff_board(old.own, new.own), diff_board(old.opponent, new.opponent)),
+                          number=1000)
+
+
+@case("rules.can_place")
+def rules_can_place() -> float:
+    '''
+    Placement check of the drag preview and the drop, per check
+    '''
+    rng = random.Random(1)
+    fleet = common.random_fleet(rng)
+    moves = [(rng.randrange(10), rng.randrange(10), rng.choice((2, 3, 4)), rng.choice(("horizontal", "vertical")))
+             for _ in range(100)]
+
+    def checks():
+        for move in moves:
+            fleet.can_place(*move)
+
+    return common.measure(checks, number=200) / 100
+
+
+@case("rules.place_remove")
+def rules_place_remove() -> float:
+    '''
+    Placing and removing a ship like dragging it on and clicking it off the board
+    '''
+    fleet = common.random_fleet(random.Random(2))
+    ship = fleet.placed_ships[0]
+    placement = (ship["cells"][0][0], ship["cells"][0][1], ship["length"], ship["orientation"])
+    placed = [ship]
+
+    def place_remove():
+        fleet.remove_ship(placed[0])
+        placed[0] = fleet.place_ship(*placement)
+
+    return common.measure(place_remove, number=1000)
+
+
+class StubBoard:
+    '''
+    Class standing in for a board widget without a display, only counts the recolored cells
+    '''
+    def __init__(self) -> None:
+        self.colors = {}
+
+    def set_color(self, row: int, col: int, color: str) -> None:
+        self.colors[(row, col)] = color
+
+    def update_idletasks(self) -> None:
+        pass
+
+
+def repaint_case(board) -> float:
+    '''
+    Repainting every cell of a board like a field update after a reconnect
+    '''
+    import main
+    full = decode_update(common.sample_message(100)).opponent
+    changes = list(enumerate(full))
+
+    def repaint():
+        main.repaint_cells(board, changes)
+        board.update_idletasks()
+
+    return common.measure(repaint, repeat=9, number=50)
+
+
+def tk_case(board_class_name: str) -> float:
+    '''
+    Function for running the repaint case on a real board, needs a display (e.g. Xvfb)
+    '''
+    import tkinter as tk
+    import main
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise Skip(f"no display: {e}")
+    try:
+        board = getattr(main, board_class_name)(root)
+        board.pack()
+        root.update()
+        return repaint_case(board)
+    finally:
+        root.destroy()
+
+
+@case("render.repaint_loop")
+def render_repaint_loop() -> float:
+    '''
+    The repaint loop alone on a stand-in board, runs without a display
+    '''
+    return repaint_case(StubBoard())
+
+
+@case("render.repaint_labels")
+def render_repaint_labels() -> float:
+    return tk_case("LabelBoard")
+
+
+@case("render.repaint_canvas")
+def render_repaint_canvas() -> float:
+    return tk_case("CanvasBoard")
+
+
+class StubRoot:
+    '''
+    Stand-in for the window, the ticks are called by the case instead of the mainloop
+    '''
+    def after(self, ms: int, func) -> str:
+        return "tick"
+
+    def after_cancel(self, job: str) -> None:
+        pass
+
+
+@case("render.animation_tick")
+def render_animation_tick() -> float:
+    '''
+    One tick of the animator with a hit pulse on every cell of a stand-in board, per tick
+    '''
+    import main
+    board = StubBoard()
+    # Enough budget for all cells, the case measures the full tick
+    animator = Animator(StubRoot(), budget=1.0)
+    for index in range(BOARD_SIZE * BOARD_SIZE):
+        row, col = divmod(index, BOARD_SIZE)
+        animator.animate(index, 10 ** 9, lambda share, row=row, col=col: board.set_color(
+            row, col, main.blend_color(main.CELL_COLORS[HIT], main.COLORS["accent"], 1 - abs(2 * share - 1))))
+    return common.measure(animator.tick, repeat=9, number=50)
+
+
+def synthetic_video(path: str, seconds: float = 2.0, size: tuple = (640, 360), fps: int = 30) -> None:
+    '''
+    Function for writing a short video with moving content, so the codec has work to do
+    '''
+    import cv2
+    import numpy
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    for index in range(int(seconds * fps)):
+        frame = numpy.zeros((size[1], size[0], 3), numpy.uint8)
+        frame[:, :, 0] = (numpy.arange(size[0]) + index * 8) % 256
+        frame[:, :, 1] = index * 4 % 256
+        cv2.rectangle(frame, (index * 10 % size[0], 50), (index * 10 % size[0] + 80, 130), (0, 0, 255), -1)
+        writer.write(frame)
+    writer.release()
+
+
+@case("media.frame")
+def media_frame() -> float:
+    '''
+    Scaling and converting one decoded frame of a synthetic video, the work behind every update_frame
+    '''
+    try:
+        import cv2
+        import media
+    except ImportError as e:
+        raise Skip(f"media librarys not installed: {e}")
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+    synthetic_video(path)
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    os.remove(path)
+    if not frames:
+        raise Skip("no video codec available")
+    size = media.fit_size(640, 360, 1920, 1080)
+    state = {"index": 0}
+
+    def frame_work():
+        media.scale_frame(frames[state["index"] % len(frames)], size)
+        state["index"] += 1
+
+    return common.measure(frame_work, number=30)
+
+
+@case("media.video_start")
+def media_video_start() -> float:
+    '''
+    From opening a preloaded synthetic video until its first frame is ready, the delay of every hit or miss video
+    '''
+    try:
+        import media
+    except ImportError as e:
+        raise Skip(f"media librarys not installed: {e}")
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.mp4")
+    synthetic_video(path)
+    assets = media.MediaAssets({})
+    assets.preload_video(path, (1920, 1080))
+
+    def video_start():
+        decoder = assets.open_video(path, (1920, 1080))
+        decoder.start()
+        decoder.next_frame()
+        decoder.stop()
+
+    try:
+        if not assets.cache.get((path, (1920, 1080))):
+            raise Skip("no video codec available")
+        return common.measure(video_start, number=30)
+    finally:
+        os.remove(path)
+
+
+def run(names: list, rounds: int = 3) -> dict:
+    '''
+    Function for running cases, the best of several rounds counts, skipped cases get None
+    '''
+    results = {}
+    for name in names:
+        try:
+            results[name] = min(CASES[name]() for _ in range(rounds))
+        except Skip as e:
+            print(f"{name:<24} skipped: {e}")
+            results[name] = None
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    '''
+    Function for printing the results next to the baseline, returns the names of the regressed cases
+    '''
+    regressions = []
+    print(f"{'case':<24} {'us/op':>10} {'baseline':>10} {'change':>8}")
+    for name, value in results.items():
+        if value is None:
+            continue
+        base = baseline.get(name)
+        if base:
+            change = value / base - 1
+            flag = " REGRESSION" if change > threshold else ""
+            print(f"{name:<24} {value:>10.2f} {base:>10.2f} {change:>+7.0%}{flag}")
+            if flag:
+                regressions.append(name)
+        else:
+            print(f"{name:<24} {value:>10.2f} {'-':>10}")
+    return regressions
+
+
+def main() -> None:
+    # Command line options
+    parser = argparse.ArgumentParser(description="Benchmark suite with baselines")
+    parser.add_argument("-k", dest="filter", default="", help="only cases whose name contains this text")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline, 0.25 is 25 percent")
+    parser.add_argument("--rounds", type=int, default=5, help="runs of every case, the fastest counts")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    names = [name for name in CASES if args.filter in name]
+    results = run(names, args.rounds)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        baseline.update({name: round(value, 3) for name, value in results.items() if value is not None})
+        with open(args.baseline, "w") as file:
+            json.dump(dict(sorted(baseline.items())), file, indent=2)
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+    elif regressions:
+        print(f"{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+import random
+from bisect import bisect_right
+from functools import lru_cache
+from operator import itemgetter
+
+from protocol import BOARD_SIZE, EMPTY, HIT, MISS, SHIP
+#Importing various librarys
+#random = random fleet layouts
+#bisect_right = equal ships only after the position of the previous one
+#lru_cache = masks are only computed once per board size
+#itemgetter = mask of a candidate
+#protocol = cell values of the board format
+# Every cell is one bit of an int, bit row * size + col, so the rule checks are a few bit operations
+
+
+@lru_cache(maxsize=None)
+def _edge_masks(size: int) -> tuple:
+    '''
+    Function for getting the masks of the whole board and of all cells except the first / last column
+    '''
+    full = (1 << size * size) - 1
+    first_col = sum(1 << row * size for row in range(size))
+    last_col = first_col << size - 1
+    return full, full & ~first_col, full & ~last_col
+
+
+def dilate(mask: int, size: int = BOARD_SIZE) -> int:
+    '''
+    Function for growing a mask by one cell in all 8 directions, used for the touching rule
+    '''
+    full, not_first_col, not_last_col = _edge_masks(size)
+    # Left and right, without wrapping into the next row
+    row = mask | (mask << 1) & not_first_col | (mask >> 1) & not_last_col
+    # Up and down
+    return (row | row << size | row >> size) & full
+
+
+def spread(mask: int, size: int = BOARD_SIZE) -> int:
+    '''
+    Function for growing a mask by one cell up, down, left and right
+    '''
+    full, not_first_col, not_last_col = _edge_masks(size)
+    return (mask | (mask << 1) & not_first_col | (mask >> 1) & not_last_col | mask << size | mask >> size) & full
+
+
+def diagonal(mask: int, size: int = BOARD_SIZE) -> int:
+    '''
+    Function for getting the diagonal neighbours of a mask, a ship never continues there
+    '''
+    full, not_first_col, not_last_col = _edge_masks(size)
+    side = (mask << 1) & not_first_col | (mask >> 1) & not_last_col
+    return (side << size | side >> size) & full
+
+
+def components(mask: int, size: int = BOARD_SIZE) -> list:
+    '''
+    Function for splitting a mask into groups of cells which are connected up, down, left or right
+    '''
+    groups = []
+    while mask:
+        group = mask & -mask
+        while True:
+            grown = spread(group, size) & mask
+            if grown == group:
+                break
+            group = grown
+        groups.append(group)
+        mask &= ~group
+    return groups
+
+
+@lru_cache(maxsize=None)
+def _start_limits(size: int, length: int) -> tuple:
+    '''
+    Function for getting the cells where a horizontal / vertical ship of length can start without leaving the board
+    '''
+    horizontal = sum(1 << row * size + col for row in range(size) for col in range(size - length + 1))
+    vertical = (1 << (size - length + 1) * size) - 1 if length <= size else 0
+    return horizontal, vertical
+
+
+def fitting_starts(free: int, length: int, orientation: str = "horizontal", size: int = BOARD_SIZE) -> int:
+    '''
+    Function for getting all start cells of ships of length which lie completely on free cells
+    '''
+    horizontal, vertical = _start_limits(size, length)
+    step = size if orientation == "vertical" else 1
+    starts = vertical if orientation == "vertical" else horizontal
+    for i in range(length):
+        starts &= free >> i * step
+    return starts
+
+
+@lru_cache(maxsize=None)
+def ship_mask(row: int, col: int, length: int, orientation: str = "horizontal", size: int = BOARD_SIZE) -> int:
+    '''
+    Function for getting the mask of a ship, 0 if it does not fit on the board
+    '''
+    if orientation == "vertical":
+        if not (0 <= row and row + length <= size and 0 <= col < size):
+            return 0
+        return sum(1 << (row + i) * size + col for i in range(length))
+    if not (0 <= row < size and 0 <= col and col + length <= size):
+        return 0
+    return ((1 << length) - 1) << row * size + col
+
+
+def cells_of(mask: int, size: int = BOARD_SIZE) -> list:
+    '''
+    Function for getting the (row, col) of all set bits
+    '''
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(divmod(low.bit_length() - 1, size))
+        mask ^= low
+    return cells
+
+
+class BitBoard:
+    '''
+    Class for the state of one board, ships, hits and misses are stored as bitmasks
+    '''
+    __slots__ = ("size", "ships", "hits", "misses", "blocked", "ship_masks")
+
+    def __init__(self, size: int = BOARD_SIZE) -> None:
+        '''
+        Initializing an empty board
+        '''
+        self.size = size
+        self.ships = 0
+        self.hits = 0
+        self.misses = 0
+        # Cells where no new ship may go, the ships and all their neighbours
+        self.blocked = 0
+        self.ship_masks = []
+
+    @classmethod
+    def from_bytes(cls, data: bytes, size: int = BOARD_SIZE) -> "BitBoard":
+        '''
+        Method for creating a board from the decoded board format, connected cells form one ship
+        '''
+        board = cls(size)
+        for index, value in enumerate(data):
+            bit = 1 << index
+            if value == SHIP:
+                board.ships |= bit
+            elif value == HIT:
+                board.ships |= bit
+                board.hits |= bit
+            elif value == MISS:
+                board.misses |= bit
+        board.blocked = dilate(board.ships, size)
+        board.ship_masks = components(board.ships, size)
+        return board
+
+    def can_place(self, mask: int) -> bool:
+        '''
+        Method for checking if a ship fits without overlapping or touching another ship
+        '''
+        return bool(mask) and not mask & self.blocked
+
+    def place(self, mask: int) -> bool:
+        '''
+        Method for placing a ship, returns False if it does not fit
+        '''
+        if not self.can_place(mask):
+            return False
+        self.ships |= mask
+        self.blocked |= dilate(mask, self.size)
+        self.ship_masks.append(mask)
+        return True
+
+    def remove(self, mask: int) -> None:
+        '''
+        Method for removing a placed ship
+        '''
+        self.ship_masks.remove(mask)
+        self.ships &= ~mask
+        self.blocked = dilate(self.ships, self.size)
+
+    def has_ship(self, row: int, col: int) -> bool:
+        '''
+        Method for checking if a ship is on a cell, hit or not
+        '''
+        return bool(self.ships >> row * self.size + col & 1)
+
+    def ship_count(self) -> int:
+        '''
+        Method for counting all cells with a ship
+        '''
+        return self.ships.bit_count()
+
+    def shoot(self, row: int, col: int) -> bool:
+        '''
+        Method for a shot on the board, returns True if it hit a ship cell which was not hit before
+        '''
+        bit = 1 << row * self.size + col
+        if self.ships & bit:
+            if self.hits & bit:
+                return False
+            self.hits |= bit
+            return True
+        self.misses |= bit
+        return False
+
+    def is_sunk(self, mask: int) -> bool:
+        '''
+        Method for checking if every cell of the ship mask was hit
+        '''
+        return not mask & ~self.hits
+
+    def sunk_ships(self) -> list:
+        '''
+        Method for getting the masks of all sunk ships
+        '''
+        return [mask for mask in self.ship_masks if not mask & ~self.hits]
+
+    @property
+    def all_sunk(self) -> bool:
+        '''
+        True if every ship cell was hit
+        '''
+        return not self.ships & ~self.hits
+
+    def encode(self, hide_ships: bool = False) -> bytes:
+        '''
+        Method for getting the board in the decoded board format, hide_ships for the view of the opponent
+        '''
+        data = bytearray([EMPTY]) * (self.size * self.size)
+        marks = ((self.misses, MISS), (self.hits, HIT))
+        if not hide_ships:
+            marks = ((self.ships & ~self.hits, SHIP),) + marks
+        for mask, value in marks:
+            while mask:
+                low = mask & -mask
+                data[low.bit_length() - 1] = value
+                mask ^= low
+        return bytes(data)
+
+    def to_field(self) -> list:
+        '''
+        Method for getting the board as list of lists with one character per cell
+        '''
+        data = self.encode().decode("latin-1")
+        return [list(data[row:row + self.size]) for row in range(0, self.size * self.size, self.size)]
+
+    def __str__(self) -> str:
+        '''
+        The board in the format the server expects
+        '''
+        return str(self.to_field())
+
+
+@lru_cache(maxsize=None)
+def _placements(size: int, lengths: tuple) -> tuple:
+    '''
+    Function for getting all placements which fit on an empty board, and for every cell the placements near it
+    '''
+    placements = {}
+    for length in lengths:
+        for orientation in ("horizontal", "vertical"):
+            for row in range(size):
+                for col in range(size):
+                    mask = ship_mask(row, col, length, orientation, size)
+                    if mask:
+                        placements[(row, col, length, orientation)] = mask
+    # A placement becomes illegal if a ship is put on it or next to it
+    near = [[] for _ in range(size * size)]
+    for key, mask in placements.items():
+        for row, col in cells_of(dilate(mask, size), size):
+            near[row * size + col].append(key)
+    return placements, near
+
+
+class PlacementIndex:
+    '''
+    Class for the set of all legal placements of a BitBoard, kept up to date when ships are placed or removed
+    '''
+    def __init__(self, board: BitBoard, lengths) -> None:
+        '''
+        Initializing the index for the ship lengths which can be placed
+        '''
+        self.board = board
+        self.lengths = tuple(sorted(set(lengths)))
+        self._placements, self._near = _placements(board.size, self.lengths)
+        self.legal = {key for key, mask in self._placements.items() if board.can_place(mask)}
+
+    def __contains__(self, key: tuple) -> bool:
+        '''
+        Checking a placement (row, col, length, orientation), other lengths are checked on the board directly
+        '''
+        if key[2] in self.lengths:
+            return key in self.legal
+        return self.board.can_place(ship_mask(*key, self.board.size))
+
+    def mask(self, key: tuple) -> int:
+        '''
+        Method for getting the mask of a placement, 0 if it does not fit on the board
+        '''
+        return self._placements.get(key) or ship_mask(*key, self.board.size)
+
+    def _affected(self, mask: int) -> set:
+        '''
+        Method for getting all placements on or next to the cells of mask
+        '''
+        keys = set()
+        for row, col in cells_of(mask, self.board.size):
+            keys.update(self._near[row * self.board.size + col])
+        return keys
+
+    def placed(self, mask: int) -> None:
+        '''
+        Method for updating the index after a ship was placed on the board
+        '''
+        self.legal -= self._affected(mask)
+
+    def removed(self, mask: int) -> None:
+        '''
+        Method for updating the index after a ship was removed from the board
+        '''
+        for key in self._affected(mask):
+            if self.board.can_place(self._placements[key]):
+                self.legal.add(key)
+
+    def count(self, length: int) -> int:
+        '''
+        Method for counting the legal placements of one length
+        '''
+        return sum(1 for key in self.legal if key[2] == length)
+
+
+@lru_cache(maxsize=None)
+def _candidates(size: int, length: int) -> tuple:
+    '''
+    Function for getting all (mask, placement) of one ship length on an empty board, sorted by mask
+    '''
+    placements, _ = _placements(size, (length,))
+    return tuple(sorted((mask, key) for key, mask in placements.items()))
+
+
+class SearchLimit(Exception):
+    '''
+    Error for a layout search which ran out of steps, unlike None it does not mean that there is no layout
+    '''
+
+
+def solve_fleet(lengths, size: int = BOARD_SIZE, rng: random.Random = None, max_steps: int = 1_000_000,
+                restart_steps: int = 2_000) -> list:
+    '''
+    Function for finding positions for all ships without overlapping or touching, by backtracking over bitmasks
+    Returns a list of placements (row, col, length, orientation) in the order of lengths, None if there is no layout
+    With rng the layout is random, the search starts over with a new shuffle after restart_steps, then twice as many
+    Without rng the first layout in mask order is returned
+    Raises SearchLimit if no layout was found within max_steps in total
+    '''
+    # Longest ships first, they have the fewest positions
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    ships = [lengths[i] for i in order]
+    # Cells still needed by the ships from position i on, if fewer cells are free there is no layout
+    needed = [sum(ships[i:]) for i in range(len(ships) + 1)]
+    # Ships from position i on with the same length as ship i
+    equal = [ships[i:].count(length) for i, length in enumerate(ships)]
+    full = (1 << size * size) - 1
+    chosen = [None] * len(ships)
+    steps = 0
+
+    def place(i: int, blocked: int, previous_mask: int, limit: int) -> bool:
+        nonlocal steps
+        if i == len(ships):
+            return True
+        # Not enough free cells left for the remaining ships
+        if (full & ~blocked).bit_count() < needed[i]:
+            return False
+        # Only positions which are still free
+        # Equal ships are only tried in increasing mask order, so every layout is searched once,
+        # with rng only the order of the candidates is random
+        candidates = _candidates(size, ships[i])
+        if i and ships[i] == ships[i - 1]:
+            candidates = candidates[bisect_right(candidates, previous_mask, key=itemgetter(0)):]
+        candidates = [(mask, key) for mask, key in candidates if not mask & blocked]
+        # Fewer positions than equal ships left
+        if len(candidates) < equal[i]:
+            return False
+        if rng:
+            rng.shuffle(candidates)
+        for mask, key in candidates:
+            steps += 1
+            if steps > limit:
+                raise SearchLimit(f"no layout found within {max_steps} steps")
+            chosen[i] = key
+            if place(i + 1, blocked | dilate(mask, size), mask, limit):
+                return True
+        return False
+
+    # One long search without rng, with rng short ones with a new shuffle each, an early bad choice of a random
+    # search is not worth searching to the end, the budget doubles so a search can still go through everything
+    budget = restart_steps if rng else max_steps
+    while True:
+        limit = min(steps + budget, max_steps)
+        try:
+            found = place(0, 0, 0, limit)
+            break
+        except SearchLimit:
+            if limit >= max_steps:
+                raise
+            budget *= 2
+    # The search went through all candidates, there is no layout
+    if not found:
+        return None
+    # Back into the order of lengths
+    result = [None] * len(ships)
+    for position, index in enumerate(order):
+        result[index] = chosen[position]
+    return result
+
+
+def random_layouts(count: int, lengths, size: int = BOARD_SIZE, seed: int = None, max_tries: int = None) -> list:
+    '''
+    Function for generating count different valid layouts, for bots and benchmarks
+    Every layout is a tuple of placements, fewer are returned if no more distinct ones are found within max_tries
+    '''
+    rng = random.Random(seed)
+    layouts = {}
+    tries = 0
+    max_tries = max_tries or count * 10
+    while len(layouts) < count and tries < max_tries:
+        tries += 1
+        try:
+            layout = solve_fleet(lengths, size, rng)
+        except SearchLimit:
+            # Counts as a try, the next search starts with another shuffle
+            continue
+        # No layout at all, more tries will not find one
+        if layout is None:
+            break
+        # Swapping two equal ships gives the same layout
+        layouts.setdefault(frozenset(layout), tuple(layout))
+    return list(layouts.values())
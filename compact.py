@@ -0,0 +1,197 @@
+import socket
+
+from protocol import BoardUpdate, ProtocolError, BOARD_SIZE, EMPTY, HIT, MISS, RECV_SIZE, SHIP
+#Importing various librarys
+#socket = server communication
+#protocol = decoded board format shared with the text protocol
+# Optional compact binary format, negotiated per connection as the capability CAPS (see protocol.encode_caps)
+# The client sends its username, a server with CAPS offers it with "!caps", the client answers with "?caps"
+# A server without it sends "game start" right away and the client stays with the text protocol
+# If both have CAPS every further message is length prefixed (varint) instead of zero terminated,
+# for the server every message after its offer, for the client every message after its answer
+# On a resumed connection the "!caps" of the server confirms the format of the lost one instead of offering it
+
+CAPS = "bin1"
+
+# Message types of the server, first byte of every message
+START = 1
+TURN = 2
+UPDATE = 3
+RESULT = 4
+
+# Flags of an update, who shoots next or how the game ended
+TURN_OWN = 1
+TURN_OPPONENT = 2
+WON = 4
+LOST = 8
+
+# Cell values as 2 bit codes
+VALUES = (EMPTY, SHIP, HIT, MISS)
+CODES = {value: code for code, value in enumerate(VALUES)}
+# A changed cell is 16 bits: board (1 for the opponent board), value code and index
+OPPONENT_CELL = 0x8000
+
+
+def encode_length(length: int) -> bytes:
+    '''
+    Function for the varint length prefix, 7 bits per byte, messages below 128 bytes need one byte
+    '''
+    data = bytearray()
+    while length >= 0x80:
+        data.append(length & 0x7F | 0x80)
+        length >>= 7
+    data.append(length)
+    return bytes(data)
+
+
+def frame(payload: bytes) -> bytes:
+    '''
+    Function for building one length prefixed frame
+    '''
+    return encode_length(len(payload)) + payload
+
+
+def encode_shot(row: int, col: int, size: int = BOARD_SIZE) -> bytes:
+    '''
+    Function for a shot as the index of the cell, one byte up to 16x16 boards
+    '''
+    return (row * size + col).to_bytes(1 if size * size <= 256 else 2, "big")
+
+
+def decode_shot(payload: bytes, size: int = BOARD_SIZE) -> tuple:
+    '''
+    Function for decoding a shot, returns (row, col) or None for an invalid one
+    '''
+    if len(payload) != (1 if size * size <= 256 else 2):
+        return None
+    index = int.from_bytes(payload, "big")
+    if index >= size * size:
+        return None
+    return divmod(index, size)
+
+
+def encode_fleet(board: bytes, size: int = BOARD_SIZE) -> bytes:
+    '''
+    Function for the own fleet as a bitmask of the ship cells, 13 bytes on a 10x10 board
+    '''
+    mask = 0
+    for index, value in enumerate(board):
+        if value == SHIP:
+            mask |= 1 << index
+    return mask.to_bytes((size * size + 7) // 8, "little")
+
+
+def decode_fleet(payload: bytes, size: int = BOARD_SIZE) -> bytes:
+    '''
+    Function for decoding a fleet into the decoded board format
+    '''
+    if len(payload) != (size * size + 7) // 8:
+        raise ProtocolError(f"Fleet has {len(payload)} bytes")
+    mask = int.from_bytes(payload, "little")
+    if mask >> size * size:
+        raise ProtocolError("Fleet has ships outside of the board")
+    return bytes(SHIP if mask >> index & 1 else EMPTY for index in range(size * size))
+
+
+def encode_start(opponent_name: str) -> bytes:
+    return bytes([START]) + opponent_name.encode("utf-8")
+
+
+def encode_turn(mine: bool) -> bytes:
+    return bytes([TURN, mine])
+
+
+def encode_result(won: bool) -> bytes:
+    return bytes([RESULT, won])
+
+
+def update_flags(turn: bool = None, won: bool = None) -> int:
+    '''
+    Function for the flags of an update, turn True if the receiver shoots next, won once the game is over
+    '''
+    flags = 0
+    if turn is not None:
+        flags |= TURN_OWN if turn else TURN_OPPONENT
+    if won is not None:
+        flags |= WON if won else LOST
+    return flags
+
+
+def encode_update(old: BoardUpdate, new: BoardUpdate, flags: int = 0) -> bytes:
+    '''
+    Function for an update with only the cells which changed since the last one the receiver got
+    '''
+    data = bytearray([UPDATE, flags])
+    for board, before, after in ((0, old.own, new.own), (OPPONENT_CELL, old.opponent, new.opponent)):
+        if before == after:
+            continue
+        for index, value in enumerate(after):
+            if before[index] != value:
+                cell = board | CODES[value] << 12 | index
+                data += cell.to_bytes(2, "big")
+    return bytes(data)
+
+
+def empty_update(size: int = BOARD_SIZE) -> BoardUpdate:
+    '''
+    Function for the state both sides start from, the first update contains the own ships as well
+    '''
+    board = bytes([EMPTY]) * (size * size)
+    return BoardUpdate(board, board)
+
+
+def apply_update(board: BoardUpdate, payload: bytes) -> tuple:
+    '''
+    Function for applying an update to the last boards, returns the new BoardUpdate and the flags
+    '''
+    if len(payload) < 2 or payload[0] != UPDATE or len(payload) % 2:
+        raise ProtocolError(f"Malformed update: {payload[:20]!r}")
+    own = bytearray(board.own)
+    opponent = bytearray(board.opponent)
+    cells = len(own)
+    view = memoryview(payload)
+    for offset in range(2, len(payload), 2):
+        cell = view[offset] << 8 | view[offset + 1]
+        index = cell & 0x0FFF
+        if index >= cells:
+            raise ProtocolError(f"Update for cell {index} outside of the board")
+        (opponent if cell & OPPONENT_CELL else own)[index] = VALUES[cell >> 12 & 3]
+    return BoardUpdate(bytes(own), bytes(opponent)), payload[1]
+
+
+class PacketReader:
+    '''
+    Class for reading length prefixed frames, same interface as protocol.FrameReader
+    '''
+    def __init__(self, sock: socket.socket, buffered: bytes = b"", recv_size: int = RECV_SIZE) -> None:
+        '''
+        Initializing the reader, buffered are bytes which were already received after the switch
+        '''
+        self.sock = sock
+        self.recv_size = recv_size
+        self._buffer = bytearray(buffered)
+        self.closed = False
+
+    def read_frame(self) -> bytes:
+        '''
+        Method for returning the next complete frame, reading from the socket only if needed
+        '''
+        while True:
+            # Length prefix
+            length = shift = 0
+            for position, byte in enumerate(self._buffer):
+                length |= (byte & 0x7F) << shift
+                shift += 7
+                if not byte & 0x80:
+                    start = position + 1
+                    if len(self._buffer) >= start + length:
+                        payload = bytes(self._buffer[start:start + length])
+                        del self._buffer[:start + length]
+                        return payload
+                    break
+            if self.closed:
+                raise ConnectionError("Connection closed by server")
+            chunk = self.sock.recv(self.recv_size)
+            if not chunk:
+                self.closed = True
+            self._buffer += chunk
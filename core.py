@@ -0,0 +1,590 @@
+import random
+import socket
+import threading
+import time
+
+import compact
+from board import BitBoard, PlacementIndex, SearchLimit, solve_fleet
+from metrics import METRICS
+from protocol import (FrameReader, FrameWriter, ProtocolError, decode_caps, decode_update, encode_caps, is_update,
+                      BOARD_SIZE, DEFAULT_HOST, DEFAULT_PORT, RESUME, RESUME_REQUEST)
+#Importing various librarys
+#random = random fleet layouts
+#socket = server communication
+#threading = running a client in the background
+#time = waiting between connection attempts
+#compact = optional binary format
+#board = bitmask state of the own board and the placement solver
+#metrics = optional timers and counters
+#protocol = reading, writing and decoding messages of the server
+# No tkinter in here, so bots and load tests can run many clients on a headless machine
+
+# Lengths of all ships of a fleet, easy to add or remove
+SHIPS = [2, 2, 3, 3, 4]
+# Minimum number of ship cells before a game can be started
+MIN_SHIP_CELLS = 10
+
+
+def backoff(attempt: int) -> float:
+    '''
+    Function for the wait before the next connection attempt, doubling up to 2 seconds with random jitter
+    '''
+    return min(2.0, 0.05 * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class Fleet:
+    '''
+    Class for the own board while placing ships, including the placement rules
+    '''
+    def __init__(self, size: int = BOARD_SIZE) -> None:
+        '''
+        Initializing an empty board
+        '''
+        self.size = size
+        self.state = BitBoard(size)
+        # All legal placements of the fleet's ship lengths, so checking a placement is one lookup
+        self.legal = PlacementIndex(self.state, SHIPS)
+        self.placed_ships = []
+
+    def ship_cells(self, row: int, col: int, length: int, orientation: str = "horizontal") -> list:
+        '''
+        Method for getting the cells a ship would cover
+        '''
+        if orientation == "vertical":
+            return [(row + i, col) for i in range(length)]
+        return [(row, col + i) for i in range(length)]
+
+    def can_place(self, row: int, col: int, length: int, orientation: str = "horizontal") -> bool:
+        '''
+        Method for checking if a ship fits on the board without touching another ship
+        '''
+        return (row, col, length, orientation) in self.legal
+
+    def place_ship(self, row: int, col: int, length: int, orientation: str = "horizontal") -> dict:
+        '''
+        Method for placing a ship, returns the placed ship or None if it does not fit
+        '''
+        if not self.can_place(row, col, length, orientation):
+            return None
+        mask = self.legal.mask((row, col, length, orientation))
+        self.state.place(mask)
+        self.legal.placed(mask)
+        ship = {"cells": self.ship_cells(row, col, length, orientation), "length": length,
+                "orientation": orientation, "mask": mask}
+        self.placed_ships.append(ship)
+        return ship
+
+    def remove_ship(self, ship: dict) -> None:
+        '''
+        Method for removing a placed ship
+        '''
+        self.state.remove(ship["mask"])
+        self.legal.removed(ship["mask"])
+        self.placed_ships.remove(ship)
+
+    def auto_place(self, lengths: list = None, seed: int = None, rng: random.Random = None) -> list:
+        '''
+        Method for replacing all ships by a random valid layout of lengths, the same seed gives the same layout
+        Returns the placed ships, None if the ships do not fit on the board or the search gave up
+        '''
+        try:
+            layout = solve_fleet(lengths or SHIPS, self.size, rng or random.Random(seed))
+        except SearchLimit:
+            return None
+        if layout is None:
+            return None
+        for ship in list(self.placed_ships):
+            self.remove_ship(ship)
+        return [self.place_ship(*placement) for placement in layout]
+
+    def ship_at(self, row: int, col: int) -> dict:
+        '''
+        Method for getting the ship on a cell, None if there is no ship
+        '''
+        bit = 1 << row * self.size + col
+        for ship in self.placed_ships:
+            if ship["mask"] & bit:
+                return ship
+        return None
+
+    def occupied(self) -> int:
+        '''
+        Method for counting all cells with a ship
+        '''
+        return self.state.ship_count()
+
+    def ready(self) -> bool:
+        '''
+        Method for checking if enough ships are placed to start a game
+        '''
+        return self.occupied() >= MIN_SHIP_CELLS
+
+    @property
+    def field(self) -> list:
+        '''
+        The board as list of lists with one character per cell
+        '''
+        return self.state.to_field()
+
+    def encode(self) -> bytes:
+        '''
+        Method for getting the board in the format of decoded field updates
+        '''
+        return self.state.encode()
+
+    def __str__(self) -> str:
+        '''
+        The board in the format the server expects
+        '''
+        return str(self.state)
+
+
+class GameSession:
+    '''
+    Class for the protocol of one game without any network code
+    Received messages are passed to receive, the returned messages have to be sent to the server
+    Events are reported as on_event(kind, payload):
+    searching, game_start (opponent name), turn (True if it is the own turn), board (BoardUpdate),
+    game_over (True if won), error ((title, text)), disconnected (error text),
+    reconnecting (error text, the game goes on once the next board arrives)
+    '''
+    def __init__(self, username: str, fleet: Fleet, on_event) -> None:
+        '''
+        Initializing the session, nothing is sent until start is called
+        '''
+        self.username = username
+        self.fleet = fleet
+        self.on_event = on_event
+        self.state = "new"
+        self.opponent_name = None
+        self.my_turn = False
+        self.board = None
+        self.last_shot = None
+        self.won = None
+
+    def start(self) -> list:
+        '''
+        Method for logging in, returns the messages to send
+        '''
+        self.state = "searching"
+        self.on_event("searching", None)
+        return [self.username]
+
+    def receive(self, message: str) -> list:
+        '''
+        Method for handling a message of the server, returns the messages to send
+        '''
+        # Waiting for an opponent
+        if self.state == "searching":
+            # Optional features offered by the server, a plain session takes none of them
+            if decode_caps(message) is not None:
+                return [encode_caps({})]
+            if message != "game start":
+                self.state = "over"
+                self.on_event("error", ("Error", f"Unexpected response: {message}"))
+                return []
+            self.state = "opponent"
+
+        # Name of the opponent, afterwards the own field is sent
+        elif self.state == "opponent":
+            self.opponent_name = message
+            self.state = "playing"
+            self.on_event("game_start", message)
+            return [str(self.fleet)]
+
+        elif self.state == "playing":
+            # Player turn
+            if message == "your turn":
+                self.my_turn = True
+                self.on_event("turn", True)
+            # Opponent turn
+            elif message == "opponent turn":
+                self.my_turn = False
+                self.on_event("turn", False)
+            # Continue message
+            elif message == "continue":
+                pass
+            # Game end
+            elif message in ("winner", "looser"):
+                self.state = "over"
+                self.won = message == "winner"
+                self.on_event("game_over", self.won)
+            # Handle the field updates, malformed updates are skipped
+            elif is_update(message):
+                try:
+                    start = METRICS.clock()
+                    self.board = decode_update(message, self.fleet.size)
+                    METRICS.stop("decode", start)
+                except ProtocolError as e:
+                    print(f"Error in game loop: {e}")
+                else:
+                    self.on_event("board", self.board)
+            # Unknown messages are ignored
+            else:
+                print(f"Ignoring unknown message: {message}")
+        return []
+
+    def receive_packet(self, payload: bytes) -> list:
+        '''
+        Method for handling a message of the compact format, returns the messages to send
+        Causes the same events as the text messages, an update carries the next turn or the result as flags
+        '''
+        kind = payload[0] if payload else None
+        # Waiting for an opponent, the name of the opponent comes with the start
+        if self.state == "searching":
+            if kind != compact.START:
+                self.state = "over"
+                self.on_event("error", ("Error", f"Unexpected response: {payload[:20]!r}"))
+                return []
+            self.opponent_name = str(payload[1:], 'utf-8')
+            self.state = "playing"
+            self.on_event("game_start", self.opponent_name)
+            return [compact.encode_fleet(self.fleet.encode(), self.fleet.size)]
+
+        elif self.state == "playing":
+            won = None
+            if kind == compact.TURN:
+                self.my_turn = bool(payload[1])
+                self.on_event("turn", self.my_turn)
+            elif kind == compact.UPDATE:
+                try:
+                    start = METRICS.clock()
+                    self.board, flags = compact.apply_update(self.board or compact.empty_update(self.fleet.size),
+                                                             payload)
+                    METRICS.stop("decode", start)
+                except ProtocolError as e:
+                    print(f"Error in game loop: {e}")
+                    return []
+                self.on_event("board", self.board)
+                if flags & (compact.WON | compact.LOST):
+                    won = bool(flags & compact.WON)
+                elif flags & (compact.TURN_OWN | compact.TURN_OPPONENT):
+                    self.my_turn = bool(flags & compact.TURN_OWN)
+                    self.on_event("turn", self.my_turn)
+            elif kind == compact.RESULT:
+                won = bool(payload[1])
+            else:
+                print(f"Ignoring unknown message: {payload[:20]!r}")
+            # Game end
+            if won is not None:
+                self.state = "over"
+                self.won = won
+                self.on_event("game_over", won)
+        return []
+
+    def move(self, row: int, col: int) -> str:
+        '''
+        Method for a shot, returns the message to send
+        '''
+        # Server expects a tuple string like "(row,column)"
+        self.last_shot = (row, col)
+        self.my_turn = False
+        return str((row, col))
+
+    @property
+    def active(self) -> bool:
+        '''
+        True while the game has not ended
+        '''
+        return self.state != "over"
+
+
+class GameClient:
+    '''
+    Class for playing one game over a blocking socket, the messages are handled by a GameSession
+    '''
+    def __init__(self, username: str, fleet: Fleet, on_event, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 debug: bool = False, recorder=None, binary: bool = False, resume: bool = False,
+                 connect_timeout: float = 5.0, resume_timeout: float = 10.0) -> None:
+        '''
+        Initializing the client, on_event gets called from the network thread
+        recorder is an optional transcript.TranscriptWriter, it gets all frames and is closed when the game ends
+        binary uses the compact format if the server offers it, otherwise the text protocol is used
+        resume continues a running game on a new connection if the old one is lost, for up to resume_timeout seconds
+        '''
+        self.session = GameSession(username, fleet, on_event)
+        self.on_event = on_event
+        self.host = host
+        self.port = port
+        self.debug = debug
+        self.recorder = recorder
+        self.binary = binary
+        self.resume = resume
+        self.connect_timeout = connect_timeout
+        self.resume_timeout = resume_timeout
+        # True once the server has acknowledged the compact format on this connection
+        self.compact = False
+        # Resume token of the server, None if it does not support resuming
+        self.token = None
+        self.komm_s = None
+        self.reader = None
+        self.writer = None
+        self.thread = None
+
+    def start(self) -> threading.Thread:
+        '''
+        Method for connecting and playing in a background thread
+        '''
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def connect(self, attempts: int = 5) -> None:
+        '''
+        Method for opening a new connection to the server, failed attempts are repeated with exponential backoff
+        '''
+        for attempt in range(attempts):
+            try:
+                # Creating socket for server interaction
+                self.komm_s = socket.create_connection((self.host, self.port), self.connect_timeout)
+                break
+            except OSError:
+                if attempt == attempts - 1:
+                    raise
+                time.sleep(backoff(attempt))
+        # Blocking again, waiting for an opponent can take long
+        self.komm_s.settimeout(None)
+        # Shots are tiny, they are sent right away instead of waiting for the ACK of the previous segment
+        self.komm_s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = FrameReader(self.komm_s)
+        self.writer = FrameWriter(self.komm_s)
+        self.compact = False
+
+    def run(self) -> None:
+        '''
+        Method for connecting and handling all messages until the game has ended
+        After rematch the open connection is used again, if the server has closed it a new one is opened
+        '''
+        reused = self.komm_s is not None
+        try:
+            # Connecting to server and sending the username
+            if not reused:
+                self.connect()
+            self.send_all(self.session.start())
+        except Exception as e:
+            if not self.reconnect(reused, e):
+                return
+
+        while self.session.active:
+            try:
+                board = self.session.board
+                if self.compact:
+                    replies = self.session.receive_packet(self.receive_packet())
+                    reused = False
+                else:
+                    message = self.receive_str()
+                    reused = False
+                    if self.debug:
+                        print(f"Received message: {message}")  # Debug print
+                    # Capabilities offered by the server before the game starts
+                    caps = decode_caps(message) if self.session.state == "searching" else None
+                    if caps is not None:
+                        self.answer_caps(caps)
+                        continue
+                    replies = self.session.receive(message)
+                if self.recorder and self.session.board is not board:
+                    self.recorder.board(self.session.board)
+                self.send_all(replies)
+            # Error handling
+            except Exception as e:
+                # The server closed the connection after the last game, queueing again on a new one
+                if reused and self.session.state == "searching":
+                    reused = False
+                    if self.reconnect(True, e):
+                        continue
+                    return
+                # The server keeps the game for a while, continuing on a new connection
+                if self.token and self.session.state == "playing" and self.resume_game(e):
+                    continue
+                print(f"Error in game loop: {e}")
+                if self.session.state == "searching":
+                    self.on_event("error", ("Connection Error", str(e)))
+                else:
+                    self.on_event("disconnected", str(e))
+                self.session.state = "over"
+                break
+        if self.recorder:
+            self.recorder.close()
+
+    def reconnect(self, reused: bool, error: Exception) -> bool:
+        '''
+        Method for opening a new connection if the reused one failed, returns False and reports the error otherwise
+        '''
+        if reused:
+            try:
+                self.komm_s.close()
+                self.connect()
+                self.send_all(self.session.start())
+                return True
+            except Exception as e:
+                error = e
+        self.session.state = "over"
+        self.on_event("error", ("Connection Error", str(error)))
+        if self.recorder:
+            self.recorder.close()
+        return False
+
+    def resume_game(self, error: Exception) -> bool:
+        '''
+        Method for continuing the game on a new connection after the old one was lost, returns False if that failed
+        The server answers with one snapshot of both boards and the turn, it replaces the state of the session
+        '''
+        self.on_event("reconnecting", str(error))
+        start = time.perf_counter()
+        attempt = 0
+        while self.session.active and time.perf_counter() - start < self.resume_timeout:
+            try:
+                self.komm_s.close()
+                self.connect(attempts=1)
+                self.send_all([RESUME_REQUEST + self.token])
+                answer = self.receive_str()
+            except Exception:
+                time.sleep(backoff(attempt))
+                attempt += 1
+                continue
+            caps = decode_caps(answer)
+            if caps is None:
+                # The game is already over on the server
+                break
+            self.accept_caps(caps)
+            # The snapshot contains all cells, not only the changed ones
+            self.session.board = None
+            if METRICS.enabled:
+                METRICS.observe("resume", time.perf_counter() - start)
+                METRICS.count("resumes")
+            return True
+        return False
+
+    def caps(self) -> dict:
+        '''
+        Method for the capabilities the client wants to use
+        '''
+        caps = {}
+        if self.binary:
+            caps[compact.CAPS] = None
+        if self.resume:
+            caps[RESUME] = None
+        return caps
+
+    def answer_caps(self, offered: dict) -> None:
+        '''
+        Method for taking the wanted ones of the capabilities the server offers, the answer is the last text message
+        '''
+        chosen = {name: offered[name] for name in self.caps() if name in offered}
+        self.send_all([encode_caps(dict.fromkeys(chosen))])
+        self.accept_caps(chosen)
+
+    def accept_caps(self, caps: dict) -> None:
+        '''
+        Method for the capabilities which are used on this connection
+        '''
+        self.token = caps.get(RESUME)
+        if self.binary and compact.CAPS in caps:
+            # Everything after this message is length prefixed
+            self.reader = compact.PacketReader(self.komm_s, self.reader.take_buffered())
+            self.compact = True
+
+    def rematch(self, fleet: Fleet, recorder=None) -> threading.Thread:
+        '''
+        Method for queueing for the next game after the last one has ended, keeping the connection
+        '''
+        # The thread of the last game may still be between its last event and its end
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.session = GameSession(self.session.username, fleet, self.on_event)
+        self.recorder = recorder
+        return self.start()
+
+    def move(self, row: int, col: int) -> None:
+        '''
+        Method for sending a shot
+        '''
+        message = self.session.move(row, col)
+        if self.compact:
+            self.send_all([compact.encode_shot(row, col, self.session.fleet.size)])
+        else:
+            self.send_str(message)
+
+    def send_all(self, messages: list) -> None:
+        '''
+        Method for sending several messages, they leave together in one call
+        '''
+        if not messages:
+            return
+        try:
+            if self.compact:
+                # Length prefixed, text like the username is sent as utf-8
+                data = b"".join(compact.frame(bytes(message, 'utf-8') if isinstance(message, str) else message)
+                                for message in messages)
+                self.komm_s.sendall(data)
+                size = len(data)
+            else:
+                size = self.writer.write_many(messages)
+        except Exception as e:
+            raise Exception(f"Failed to send data: {e}")
+        self.sent(messages, size)
+
+    def send_str(self, data: str) -> None:
+        '''
+        Basic method for server integration / sending messages
+        '''
+        try:
+            size = self.writer.write_str(data)
+        except Exception as e:
+            raise Exception(f"Failed to send data: {e}")
+        self.sent([data], size)
+
+    def sent(self, messages: list, size: int) -> None:
+        '''
+        Method for recording and counting sent messages
+        '''
+        if self.recorder:
+            for message in messages:
+                if isinstance(message, bytes):
+                    self.recorder.sent_packet(message)
+                else:
+                    self.recorder.sent(message)
+        if METRICS.enabled:
+            METRICS.count("frames_sent", len(messages))
+            METRICS.count("bytes_sent", size)
+
+    def receive_str(self) -> str:
+        '''
+        Basic method for server integration / receiving messages
+        '''
+        try:
+            # Reading whole chunks, further messages stay buffered for the next call
+            message = self.reader.read_str()
+        except Exception as e:
+            raise Exception(f"Failed to receive data: {e}")
+        if self.recorder:
+            self.recorder.received(message)
+        if METRICS.enabled:
+            METRICS.count("frames_received")
+            METRICS.count("bytes_received", len(message) + 1)
+        return message
+
+    def receive_packet(self) -> bytes:
+        '''
+        Method for receiving one message of the compact format
+        '''
+        try:
+            payload = self.reader.read_frame()
+        except Exception as e:
+            raise Exception(f"Failed to receive data: {e}")
+        if self.recorder:
+            self.recorder.received_packet(payload)
+        if METRICS.enabled:
+            METRICS.count("frames_received")
+            METRICS.count("bytes_received", len(payload) + len(compact.encode_length(len(payload))))
+        return payload
+
+    def close(self) -> None:
+        '''
+        Method for closing the connection
+        '''
+        self.session.state = "over"
+        try:
+            self.komm_s.close()
+        except Exception:
+            pass
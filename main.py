@@ -1,24 +1,31 @@
 import tkinter as tk
-import socket
-from PIL import Image, ImageTk
-import pygame
+import argparse
 from tkinter import messagebox
-import cv2
-import threading
+import queue
 import time
+from collections import deque
 import os
-from ffpyplayer.player import MediaPlayer
+from ai import ShotPlanner
+from animation import Animator
+from core import Fleet, GameClient, SHIPS
+from metrics import METRICS
+from protocol import BoardUpdate, diff_board, BOARD_SIZE, DEFAULT_HOST, DEFAULT_PORT, EMPTY, HIT, MISS, SHIP
+from transcript import ReplayClient, TranscriptWriter
 #Importing various librarys
 #tkinter = window and gui generation
-#Socket = server communication
-#PIL = showing and editing images
-#pygame = sound and music design 
+#argparse = command line options
+#PIL = showing the video frames, only loaded for the special mode
 #messagebox = mesage window
-#cv2 = showing videos
-#threading = multi threading
+#queue, deque = events from the network threads to the gui
 #time = time and time stopping
 #os = edit and open files and folders
-#ffpyplayer = play videos and reformat
+#media = preloaded assets and videos, only loaded for the special mode (pygame, cv2, ffpyplayer)
+#ai = shot suggestions for the player
+#animation = timed effects on the Tk thread
+#core = placement rules and server communication without gui
+#metrics = optional timers and counters of the hot paths
+#protocol = board values of the field updates
+#transcript = recording and replaying games
 
 # Color scheme
 COLORS = {
@@ -28,9 +35,43 @@ COLORS = {
     "button": "#7C7C7C",
     "accent": "#D64933",
     "miss": "#FFFFFF",
-    "hit": "#FFFF00"
+    "hit": "#FFFF00",
+    "illegal": "#5C2A3D",
+    "heat": "#F28F3B"
 }
 
+# Colors of the decoded cell values on the game boards
+CELL_COLORS = {
+    EMPTY: COLORS["board"],
+    SHIP: COLORS["accent"],
+    HIT: COLORS["hit"],
+    MISS: COLORS["miss"]
+}
+
+def blend_color(start: str, end: str, share: float) -> str:
+    '''
+    Function for mixing two "#RRGGBB" colors, share 0 gives start and 1 gives end
+    '''
+    channels = [round(int(start[i:i + 2], 16) * (1 - share) + int(end[i:i + 2], 16) * share) for i in (1, 3, 5)]
+    return "#" + "".join(f"{channel:02X}" for channel in channels)
+
+def repaint_cells(board, changes: list) -> int:
+    '''
+    Function for applying a batch of changed (index, value) cells to a board, returns the number of reconfigured cells
+    '''
+    for index, value in changes:
+        row, col = divmod(index, BOARD_SIZE)
+        board.set_color(row, col, CELL_COLORS.get(value, COLORS["board"]))
+    METRICS.count("repaints", len(changes))
+    return len(changes)
+
+# Flash at the start of the own turn, colors of the window with their durations in milliseconds,
+# every flash is followed by the background for the same time
+FLASH = [("#0000FF", 300), ("#000080", 200), ("#0000FF", 300), ("#000080", 200)]
+# Durations of the hit pulse and the selection highlight in milliseconds
+PULSE_DURATION = 400
+SELECT_DURATION = 120
+
 # Asset paths
 ASSETS = {
     "cursor": "assets/cursor.png",
@@ -42,7 +83,7 @@ ASSETS = {
         "lose": "assets/lose.mp4"
     }
 }
-# Video lengths to set the pause time depending on the video
+# Fallback video lengths in seconds, only used if a video file does not contain its length
 VIDEOLENGTHS = {
     "hit": 15,
     "miss": 10,
@@ -50,6 +91,233 @@ VIDEOLENGTHS = {
     "lose": 54
 }
 
+# Media librarys, only loaded by load_media once the special mode is used
+media = None
+ImageTk = None
+
+def load_media() -> bool:
+    '''
+    Function for loading the media librarys on first use, returns False if they are not installed
+    '''
+    global media, ImageTk
+    if media is None:
+        try:
+            # media imports pygame, cv2, ffpyplayer and PIL
+            import media as media_module
+            from PIL import ImageTk as image_tk
+        except ImportError as e:
+            print(f"Special effects are not available: {e}")
+            return False
+        media, ImageTk = media_module, image_tk
+    return True
+
+# Size of one board cell in pixels, used to map screen positions to cells
+CELL_SIZE = 30
+
+class LabelBoard(tk.Frame):
+    '''
+    Class for a board made of one label per cell
+    '''
+    def __init__(self, parent, on_click=None, size: int = BOARD_SIZE, **kwargs) -> None:
+        '''
+        Creating all cells, on_click gets called with row and column of a clicked cell
+        '''
+        super().__init__(parent, bg=COLORS["background"], **kwargs)
+        self.size = size
+        self.cells = []
+        for i in range(size):
+            row = []
+            for j in range(size):
+                cell = tk.Label(self, width=4, height=2,
+                                bg=COLORS["board"], relief="solid", borderwidth=1)
+                cell.grid(row=i, column=j, padx=1, pady=1)
+                if on_click:
+                    cell.bind('<Button-1>', lambda e, x=i, y=j: on_click(x, y))
+                row.append(cell)
+            self.cells.append(row)
+
+    def set_color(self, row: int, col: int, color: str) -> None:
+        '''
+        Method for changing the color of one cell
+        '''
+        self.cells[row][col].configure(bg=color)
+
+    def set_cursor(self, cursor: str) -> None:
+        '''
+        Method for changing the cursor over all cells
+        '''
+        for row in self.cells:
+            for cell in row:
+                cell.configure(cursor=cursor)
+
+    def cell_at(self, x_root: int, y_root: int) -> tuple:
+        '''
+        Method for getting row and column at a screen position, None if outside of the board
+        '''
+        col = (x_root - self.winfo_rootx()) // CELL_SIZE
+        row = (y_root - self.winfo_rooty()) // CELL_SIZE
+        if 0 <= row < self.size and 0 <= col < self.size:
+            return row, col
+        return None
+
+class CanvasBoard(tk.Canvas):
+    '''
+    Class for a board drawn on a single canvas, cells are rectangle items
+    '''
+    def __init__(self, parent, on_click=None, size: int = BOARD_SIZE, cell_size: int = CELL_SIZE, **kwargs) -> None:
+        '''
+        Drawing all cells, on_click gets called with row and column of a clicked cell
+        '''
+        super().__init__(parent, width=size * cell_size, height=size * cell_size,
+                         bg=COLORS["background"], highlightthickness=0, **kwargs)
+        self.size = size
+        self.cell_size = cell_size
+        self.on_click = on_click
+        # Item ids in row order, index = row * size + col
+        self.items = [self.create_rectangle(j * cell_size + 1, i * cell_size + 1,
+                                            (j + 1) * cell_size - 1, (i + 1) * cell_size - 1,
+                                            fill=COLORS["board"], outline="black")
+                      for i in range(size) for j in range(size)]
+        # One handler for the whole board instead of one per cell
+        if on_click:
+            self.bind('<Button-1>', self.clicked)
+
+    def clicked(self, event: tk.Event) -> None:
+        '''
+        Method for resolving a click to a cell
+        '''
+        row, col = event.y // self.cell_size, event.x // self.cell_size
+        if 0 <= row < self.size and 0 <= col < self.size:
+            self.on_click(row, col)
+
+    def set_color(self, row: int, col: int, color: str) -> None:
+        '''
+        Method for changing the color of one cell
+        '''
+        self.itemconfig(self.items[row * self.size + col], fill=color)
+
+    def set_cursor(self, cursor: str) -> None:
+        '''
+        Method for changing the cursor over the board
+        '''
+        self.configure(cursor=cursor)
+
+    def cell_at(self, x_root: int, y_root: int) -> tuple:
+        '''
+        Method for getting row and column at a screen position, None if outside of the board
+        '''
+        col = (x_root - self.winfo_rootx()) // self.cell_size
+        row = (y_root - self.winfo_rooty()) // self.cell_size
+        if 0 <= row < self.size and 0 <= col < self.size:
+            return row, col
+        return None
+
+class UIDispatcher:
+    '''
+    Class for handing events from network threads to the Tk mainloop, only the mainloop touches widgets
+    '''
+    # Events where only the latest one matters, earlier ones in the same batch are dropped
+    COALESCED = ("board", "turn")
+
+    def __init__(self, root: tk.Tk, interval: int = 16, batch_size: int = 50) -> None:
+        '''
+        Initializing the queue and starting the drain loop, interval in milliseconds
+        '''
+        self.root = root
+        self.interval = interval
+        self.batch_size = batch_size
+        self.events = queue.SimpleQueue()
+        # Events which were taken from the queue but not handled yet because of a pause
+        self.backlog = deque()
+        self.handlers = {}
+        # Number of running effects (e.g. videos) which the events have to wait for
+        self.paused = 0
+        self.last_drain = None
+        self.root.after(self.interval, self.drain)
+
+    def register(self, kind: str, handler) -> None:
+        '''
+        Method for registering the handler of an event type
+        '''
+        self.handlers[kind] = handler
+
+    def post(self, kind: str, payload=None) -> None:
+        '''
+        Method for posting an event, safe to call from any thread
+        '''
+        self.events.put((kind, payload))
+
+    def pause(self) -> None:
+        '''
+        Method for delaying all further events until resume is called, they stay in the queue until then
+        '''
+        self.paused += 1
+
+    def resume(self) -> None:
+        '''
+        Method for continuing with the events after a pause
+        '''
+        self.paused = max(0, self.paused - 1)
+
+    def clear(self) -> None:
+        '''
+        Method for dropping all events which were not handled yet, e.g. of a game which has ended
+        '''
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                break
+        self.backlog.clear()
+        self.paused = 0
+
+    def drain(self) -> None:
+        '''
+        Method for handling a batch of events on the Tk thread
+        '''
+        try:
+            if METRICS.enabled:
+                # How much later than planned the mainloop got to this call
+                now = time.perf_counter()
+                if self.last_drain:
+                    METRICS.observe("tk_lag", max(0.0, now - self.last_drain - self.interval / 1000))
+                self.last_drain = now
+                METRICS.gauge("ui_queue", self.events.qsize() + len(self.backlog))
+            if not self.paused:
+                batch = []
+                while self.backlog and len(batch) < self.batch_size:
+                    batch.append(self.backlog.popleft())
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self.events.get_nowait())
+                    except queue.Empty:
+                        break
+                self.dispatch(batch)
+        finally:
+            self.root.after(self.interval, self.drain)
+
+    def dispatch(self, batch: list) -> None:
+        '''
+        Method for calling the handlers of a batch, coalescing redundant events
+        '''
+        # Position of the last event of every coalesced type
+        last = {kind: i for i, (kind, _) in enumerate(batch) if kind in self.COALESCED}
+        for i, (kind, payload) in enumerate(batch):
+            if kind in last and last[kind] != i:
+                continue
+            # A pause from a handler delays the rest of the batch as well
+            if self.paused:
+                self.backlog.extendleft(reversed(batch[i:]))
+                return
+            handler = self.handlers.get(kind)
+            if handler:
+                start = METRICS.clock()
+                try:
+                    handler(payload)
+                except Exception as e:
+                    print(f"Error handling {kind} event: {e}")
+                METRICS.stop(f"ui_{kind}", start)
+
 class DraggableShip(tk.Label):
     def __init__(self, parent, length: int, game_instance, orientation="horizontal", **kwargs, ) -> None:
         '''
@@ -66,6 +334,10 @@ class DraggableShip(tk.Label):
         self._original_x = 0
         self._original_y = 0
         self._preview_cells = []
+        # Cell and orientation of the current preview, it is only repainted when they change
+        self._preview_key = None
+        # Latest drag position, several motion events are handled with one move
+        self._drag_target = None
 
     def toggle_orientation(self, event=None) -> None:
         '''
@@ -89,12 +361,22 @@ class DraggableShip(tk.Label):
 
     def drag(self, event: tk.Event) -> None:
         '''
-        Method for getting coordinates of dragging
+        Method for getting coordinates of dragging, the ship is moved once the pending events are handled
         '''
         deltax = event.x - self._drag_data["x"]
         deltay = event.y - self._drag_data["y"]
-        x = self.winfo_x() + deltax
-        y = self.winfo_y() + deltay
+        if self._drag_target is None:
+            self.after_idle(self.apply_drag)
+        self._drag_target = (self.winfo_x() + deltax, self.winfo_y() + deltay)
+
+    def apply_drag(self) -> None:
+        '''
+        Method for moving the ship to the latest drag position
+        '''
+        if self._drag_target is None:
+            return
+        x, y = self._drag_target
+        self._drag_target = None
         self.place(x=x, y=y)
 
         # Calling for updated preview in window
@@ -106,104 +388,150 @@ class DraggableShip(tk.Label):
         '''    
         try:
             # Calculate the position of the ship on the board
-            self.update_preview()
-            board_x = self.winfo_rootx() - self.game.board_frame.winfo_rootx()
-            board_y = self.winfo_rooty() - self.game.board_frame.winfo_rooty()
-            grid_x = board_x // 30
-            grid_y = board_y // 30
+            self.apply_drag()
+            cell = self.game.board.cell_at(self.winfo_rootx(), self.winfo_rooty())
+            self.clear_preview()
             
             # Place the ship on the board if it fits
-            if 0 <= grid_x < 10 and 0 <= grid_y < 10:
-                if self.game.place_ship(grid_y, grid_x, self.length, self.orientation):
-                    self.game.finished_ships.remove(self)
-                    self.destroy()
-                else:
-                    # Reset ship position if it doesn't fit
-                    self.place_forget()
-                    self.pack(side=tk.LEFT, padx=5, pady=5)
-                    self.clear_preview()
+            if cell and self.game.place_ship(cell[0], cell[1], self.length, self.orientation):
+                self.game.finished_ships.remove(self)
+                self.destroy()
             else:
                 # Reset ship position if it doesn't fit
                 self.place_forget()
                 self.pack(side=tk.LEFT, padx=5, pady=5)
-                self.clear_preview()
         except Exception as e:
             print(f"Error in ship placement: {e}")
             self.place(x=self._original_x, y=self._original_y)
             
     def update_preview(self) -> None:
         '''
-        Method for updating the preview of the ship
+        Method for updating the preview of the ship, only repainted if the hovered cell changed
         '''
-        board_x = self.winfo_rootx() - self.game.board_frame.winfo_rootx()
-        board_y = self.winfo_rooty() - self.game.board_frame.winfo_rooty()
-        grid_x = board_x // 30
-        grid_y = board_y // 30
+        cell = self.game.board.cell_at(self.winfo_rootx(), self.winfo_rooty())
+        key = (cell, self.orientation)
+        if key == self._preview_key:
+            return
 
         self.clear_preview()
-
-        # Check if ship fits on the board
-        if 0 <= grid_x < 10 and 0 <= grid_y < 10:
-            for i in range(self.length):
-                r, c = (grid_y + i, grid_x) if self.orientation == "vertical" else (grid_y, grid_x + i)
-                if 0 <= r < 10 and 0 <= c < 10:
-                    # Check if no ship is already placed in the field
-                    if self.game.field[r][c] == " ":
-                        # Update the preview list
-                        self._preview_cells.append((r, c))
-                        # Change the color of the cell
-                        self.game.cells[r][c].configure(bg=COLORS["accent"])
-                    else:
-                        self.clear_preview()
-                        break
+        self._preview_key = key
+
+        # Showing where the ship would go, in another color if it does not fit
+        if cell:
+            row, col = cell
+            fits = (row, col, self.length, self.orientation) in self.game.fleet.legal
+            color = COLORS["accent"] if fits else COLORS["illegal"]
+            for r, c in self.game.fleet.ship_cells(row, col, self.length, self.orientation):
+                if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
+                    self._preview_cells.append((r, c))
+                    self.game.board.set_color(r, c, color)
     
     def clear_preview(self) -> None:
         '''
-        Method for clearing all previews and the list with previews
+        Method for clearing all previews and the list with previews, placed ships keep their color
         '''
         for r, c in self._preview_cells:
-            self.game.cells[r][c].configure(bg=COLORS["board"])
+            self.game.board.set_color(r, c, COLORS["accent"] if self.game.fleet.state.has_ship(r, c) else COLORS["board"])
         self._preview_cells.clear()
+        self._preview_key = None
 
 class BattleshipGame(tk.Tk):
     '''
     Class for a game including gameloop, screen for selecting username etc
     '''
-    def __init__(self, specialmode: bool) -> None:
+    def __init__(self, specialmode: bool, canvas_boards: bool = False, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 record_dir: str = None, replay: str = None, replay_speed: float = 10.0, replay_seek: int = None,
+                 requeue: bool = False, binary: bool = False, resume: bool = False, animations: bool = True) -> None:
         '''
         Initializing important attributes of the class, specialmode selecting wheter there should be special effects or not
+        canvas_boards selecting whether the boards are drawn on one canvas instead of one label per cell
+        host and port of the server
+        record_dir is a folder for transcripts of all games, replay a transcript which is shown instead of a live game
+        requeue keeps the connection after a game and searches the next one with the same fleet right away
+        binary uses the compact binary format if the server offers it, otherwise the text protocol
+        resume continues a game on a new connection after the old one was lost
+        animations False shows every effect in its final state right away
         '''
         super().__init__()
+        # Without the media librarys the game runs in normal mode
+        if specialmode and not load_media():
+            specialmode = False
         self.specialmode = specialmode # Special mode for special effects, bool
+        self.canvas_boards = canvas_boards
+        self.host = host
+        self.port = port
+        self.record_dir = record_dir
+        self.requeue = requeue
+        self.binary = binary
+        self.resume = resume
         self.player = None
-        self.testcell = None
         self.playing = False
         self.current_video = None
+        self.video_window = None
+        # Shown and dropped frames of the last video and seconds until its first frame was shown
+        self.last_video_frames = (0, 0)
+        self.last_video_latency = 0
+        # Called once the current video has finished or was closed
+        self.video_done = None
         self.cap = None
-        self.placed_ships = []
-        self.current_placing_rotation = "horizontal"
-        self.field = [[" " for _ in range(10)] for _ in range(10)]
+        self.client = None
         self.title("Battleship")
         self.geometry("1200x800")
         self.configure(bg=COLORS["background"])
         if self.specialmode:
+            # Sounds, short videos and the start of longer ones are kept in memory, so effects start right away
+            self.assets = media.shared_assets(ASSETS)
             # Initialize pygame mixer for sound effects
-            pygame.mixer.init()
+            self.assets.init_audio()
+            self.assets.load_sound("siren", ASSETS["siren"])
+            self.assets.preload_videos([ASSETS["videos"]["hit"], ASSETS["videos"]["miss"]],
+                                       (self.winfo_screenwidth(), self.winfo_screenheight()))
             
             # Load custom cursor
             # Only functional in some python versions - work in progress
         try:
-            cursor_image = Image.open(ASSETS["cursor"])
-            cursor_image = cursor_image.resize((32, 32), Image.Resampling.LANCZOS)
-            self.target_cursor = ImageTk.PhotoImage(cursor_image)
+            # Tk reads the png itself, so the normal mode does not need PIL
+            cursor_image = tk.PhotoImage(file=ASSETS["cursor"])
+            self.target_cursor = cursor_image.subsample(max(1, cursor_image.width() // 32))
         # Error handling
         except Exception as e:
             print(f"Could not load cursor image: {e}")
             self.target_cursor = None
         # Calling for UI setup
+        self.reset_state()
         self.setup_ui()
+        # Number of cell reconfigures in total
+        self.total_repaints = 0
+        # Flashes, pulses and highlights share one after() tick
+        self.animator = Animator(self, enabled=animations)
+        # Network threads only post events, the handlers run in the mainloop
+        self.dispatcher = UIDispatcher(self)
+        self.dispatcher.register("searching", self.show_searching)
+        self.dispatcher.register("game_start", self.setup_game_screen)
+        self.dispatcher.register("turn", self.show_turn)
+        self.dispatcher.register("board", self.show_update)
+        self.dispatcher.register("game_over", self.show_game_over)
+        self.dispatcher.register("error", self.show_error)
+        self.dispatcher.register("disconnected", self.show_disconnected)
+        self.dispatcher.register("reconnecting", self.show_reconnecting)
+
+        # A recorded game is fed through the same events as a live game
+        if replay:
+            self.client = ReplayClient(replay, self.dispatcher.post, speed=replay_speed, seek=replay_seek)
+            self.client.start()
+
+    def reset_state(self) -> None:
+        '''
+        Method for resetting everything which belongs to one game
+        '''
+        self.testcell = None
         self.selected_cell = None
         self.game_active = False
+        self.current_placing_rotation = "horizontal"
+        # Own board and placement rules, shared with the network client
+        self.fleet = Fleet()
+        # Number of cell reconfigures caused by the last field update
+        self.last_update_repaints = 0
 
     def setup_ui(self) -> None:
         '''
@@ -216,11 +544,9 @@ class BattleshipGame(tk.Tk):
         self.left_frame = tk.Frame(self.main_container, bg=COLORS["background"], width=700)
         self.left_frame.pack(side=tk.LEFT, expand=False, fill="both")
         self.left_frame.pack_propagate(False)
-        self.board_frame = tk.Frame(self.left_frame, bg=COLORS["background"])
-        self.board_frame.pack(pady=20)
-        
         # Create board cells
-        self.cells = [[self.create_cell(i, j) for j in range(10)] for i in range(10)]
+        self.board = self.create_board(self.left_frame, on_click=self.cell_clicked)
+        self.board.pack(pady=20)
         
         # Ships frame
         self.ships_frame = tk.Frame(self.left_frame, bg=COLORS["background"])
@@ -252,6 +578,11 @@ class BattleshipGame(tk.Tk):
                                     font=("Arial", 14), bg=COLORS["accent"], width=10,
                                     fg=COLORS["text"], command=self.rotate_ships)
         self.orientation_button.place(x=290, y=550)
+        # Auto place button
+        self.auto_place_button = tk.Button(self.left_frame, text="Auto place",
+                                    font=("Arial", 14), bg=COLORS["accent"], width=10,
+                                    fg=COLORS["text"], command=self.auto_place_ships)
+        self.auto_place_button.place(x=440, y=550)
 
         # Optional label which displays wrong placement
         #self.place_ship_label = tk.Label(self.left_frame, text="",
@@ -259,26 +590,15 @@ class BattleshipGame(tk.Tk):
                                          #anchor="center")
         #self.place_ship_label.place(x=290, y=600)
 
-    def create_cell(self, i: int, j: int) -> tk.Label:
-        '''
-        Method to create each cell
-        '''
-        cell = tk.Label(self.board_frame, width=4, height=2,
-                       bg=COLORS["board"], relief="solid", borderwidth=1)
-        cell.grid(row=i, column=j, padx=1, pady=1)
-        cell.bind('<Button-1>', lambda e, x=i, y=j: self.cell_clicked(x, y))
-        return cell
-
     def create_ship_buttons(self) -> None:
         '''
         Method to crete ship buttons in pregame screen
         '''
-        # List of all available ships, easy to add or remove
-        ships = [(2, "🔴🔴"), (2, "🔴🔴"), (3, "🔴🔴🔴"), (3, "🔴🔴🔴"), (4, "🔴🔴🔴🔴")]
+        # All available ships, see SHIPS
         self.finished_ships = []
-        for length, symbol in ships:
+        for length in SHIPS:
             ship = DraggableShip(self.ships_frame, length, self,
-                               text=symbol, font=("Arial", 14),
+                               text="🔴" * length, font=("Arial", 14),
                                bg=COLORS["button"], fg=COLORS["text"],
                                padx=10, pady=5)
             ship.pack(side=tk.LEFT, padx=5)
@@ -294,59 +614,40 @@ class BattleshipGame(tk.Tk):
         for s in self.finished_ships:
             s.toggle_orientation()
 
+    def auto_place_ships(self) -> None:
+        '''
+        Method for placing all ships at random positions, ships placed by hand are replaced
+        '''
+        old_cells = [cell for ship in self.fleet.placed_ships for cell in ship["cells"]]
+        # The ships placed by hand stay on the board if no layout was found
+        if not self.fleet.auto_place():
+            return
+        for row, col in old_cells:
+            self.board.set_color(row, col, COLORS["board"])
+        for ship in self.fleet.placed_ships:
+            for row, col in ship["cells"]:
+                self.board.set_color(row, col, COLORS["accent"])
+
+        # No ships left to drag
+        for ship in self.finished_ships:
+            ship.destroy()
+        self.finished_ships.clear()
+        if self.fleet.ready():
+            self.start_button.configure(state="normal")
+
     def place_ship(self, row: int, col: int, length: int, orientation="horizontal") -> bool:
         '''
         Method to place a ship on the board
         '''
-        
-        def are_cells_around_free(r: int, c: int, l: int, orient: str) -> bool:
-            '''
-            Function to check adjacent cells for ships
-            '''
-            adjacent_offsets = [(-1, -1), (-1, 0), (-1, 1),
-                                (0, -1),           (0, 1),
-                                (1, -1), (1, 0), (1, 1)]
-            for i in range(l):
-                check_row = r + (i if orient == "vertical" else 0)
-                check_col = c + (i if orient == "horizontal" else 0)
-
-                if not (0 <= check_row < 10 and 0 <= check_col < 10) or self.field[check_row][check_col] != " ":
-                    #self.place_ship_label.configure(text="Wrong placement...")
-                    return False
-
-                for dr, dc in adjacent_offsets:
-                    nr, nc = check_row + dr, check_col + dc
-                    if 0 <= nr < 10 and 0 <= nc < 10 and self.field[nr][nc] != " ":
-                        #self.place_ship_label.configure(text="Wrong placement...")
-                        return False
-            return True
-
-        ship_cells = []
-
-        # Check board for horizontal mode
-        if orientation == "horizontal":
-            if col + length > 10 or any(self.field[row][col + i] != " "  or not are_cells_around_free(row, col, length, "horizontal") for i in range(length)):
-                return False
-            # Placing horizontal ship
-            for i in range(length):
-                self.field[row][col + i] = "o"
-                self.cells[row][col + i].configure(bg=COLORS["accent"])
-                ship_cells.append((row, col + i))
-
-        # Check board for vertical mode
-        elif orientation == "vertical":
-            if row + length > 10 or any(self.field[row + i][col] != " " or not are_cells_around_free(row, col, length, "vertical") for i in range(length)):
-                return False
-            # Placing vertical ship
-            for i in range(length):
-                self.field[row + i][col] = "o"
-                self.cells[row + i][col].configure(bg=COLORS["accent"])
-                ship_cells.append((row + i, col))
-
-        self.placed_ships.append({"cells": ship_cells, "length": length, "orientation": orientation})
+        ship = self.fleet.place_ship(row, col, length, orientation)
+        if not ship:
+            #self.place_ship_label.configure(text="Wrong placement...")
+            return False
+        for r, c in ship["cells"]:
+            self.board.set_color(r, c, COLORS["accent"])
 
         # Activate start_button if enough ships are placed
-        if sum(row.count("o") for row in self.field) >= 10:
+        if self.fleet.ready():
             self.start_button.configure(state="normal")
         return True
 
@@ -355,10 +656,9 @@ class BattleshipGame(tk.Tk):
         Method for handling clicks on the board to remove a ship
         '''
         # Check if cell is occupied by ship and calling for remove if true
-        for ship in self.placed_ships:
-            if (row, col) in ship["cells"]:
-                self.remove_ship(ship)
-                break
+        ship = self.fleet.ship_at(row, col)
+        if ship:
+            self.remove_ship(ship)
 
     def remove_ship(self, ship: dict) -> None:
         '''
@@ -366,9 +666,9 @@ class BattleshipGame(tk.Tk):
         '''
 
         # Resetting the cells of the ship
+        self.fleet.remove_ship(ship)
         for row, col in ship["cells"]:
-            self.field[row][col] = " "
-            self.cells[row][col].configure(bg=COLORS["board"])
+            self.board.set_color(row, col, COLORS["board"])
 
         # Creating a new ship with the same data as the removed ship
         draggable_ship = DraggableShip(
@@ -380,55 +680,53 @@ class BattleshipGame(tk.Tk):
         )
         # Placing the new ship and adding it to the list of placeable ships
         draggable_ship.pack(side=tk.LEFT, padx=5, pady=5)
-        self.placed_ships.remove(ship)
         self.finished_ships.append(draggable_ship)
 
     def start_game(self) -> None:
         '''
-        Method for getting the username and then initializing a thread for the server connection
+        Method for getting the username and then starting the client in a thread for the server connection
         '''
         username = self.username_entry.get()
         if not username:
             messagebox.showerror("Error", "Please enter a username")
             return
         # A thread is used so the gui is still available while the other thread awaits an answer from the server
-        threading.Thread(target=self.connect_to_server, args=(username,), daemon=True).start()
+        # The client only posts events, they are handled in the mainloop
+        recorder = None
+        if self.record_dir:
+            os.makedirs(self.record_dir, exist_ok=True)
+            recorder = TranscriptWriter(os.path.join(self.record_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{username}.bst"))
+        # A connection kept from the last game is used again
+        if isinstance(self.client, GameClient) and self.client.session.username == username:
+            self.client.rematch(self.fleet, recorder)
+            return
+        self.client = GameClient(username, self.fleet, self.dispatcher.post, host=self.host, port=self.port, debug=True,
+                                 recorder=recorder, binary=self.binary, resume=self.resume)
+        self.client.start()
 
-    def connect_to_server(self, username: str) -> None:
+    def show_searching(self, payload=None) -> None:
         '''
-        Method for a first connection to the server, adress: 127.0.0.1, port: 5000
+        Method for displaying that the server is looking for an opponent
         '''
-        # Creating socket for server interaction
-        self.komm_s = socket.socket()
-        try:
-            # Connecting to server and sending the username
-            self.komm_s.connect(('127.0.0.1', 5000))
-            self.send_str(username)
-            # Changing the UI to display the current phase of game finding
-            self.start_button.configure(text="Finding game...")
-            self.start_button["state"] = "disabled"
-            # Waiting for server response and game start
-            response = self.receive_str()
-            if response == "game start":
-                # Updating stage and communication with server
-                self.game_active = True
-                opponent_name = self.receive_str()
-                self.send_str(str(self.field))
-                self.setup_game_screen(opponent_name)
-                threading.Thread(target=self.game_loop, daemon=True).start()
-            # Error handling
-            else:
-                messagebox.showerror("Error", f"Unexpected response: {response}")
-        except Exception as e:
-            messagebox.showerror("Connection Error", str(e))
+        self.start_button.configure(text="Finding game...")
+        self.start_button["state"] = "disabled"
+
+    def show_error(self, payload: tuple) -> None:
+        '''
+        Method for displaying an error of a network thread
+        '''
+        title, text = payload
+        messagebox.showerror(title, text)
 
     def setup_game_screen(self, opponent_name: str) -> None:
         '''
         Setting up the gui for the game and deleting previous lobby elements
         '''
         # Clear window
+        self.animator.cancel_all()
         for widget in self.winfo_children():
             widget.destroy()
+        self.game_active = True
 
         # Create game container
         self.game_container = tk.Frame(self, bg=COLORS["background"])
@@ -453,12 +751,15 @@ class BattleshipGame(tk.Tk):
         tk.Label(your_board_frame, text="Your Fleet",
                 font=("Arial", 16), bg=COLORS["background"],
                 fg=COLORS["text"]).pack(pady=(0, 10))
-        self.your_board = self.create_board(your_board_frame, is_opponent=False)
+        self.your_board = self.create_board(your_board_frame)
+        self.your_board.pack()
+        # Last shown state of both boards, field updates only repaint the difference
+        self.shown_own = bytes(BOARD_SIZE * BOARD_SIZE * [EMPTY])
+        self.shown_opponent = self.shown_own
         # Loading the ships on the board, so the player can see his own placed ships
-        for i in range(10):
-            for j in range(10):
-                if self.field[i][j] == "o":
-                    self.your_board[i][j].configure(bg=COLORS["accent"])
+        own = self.fleet.encode()
+        self.repaint_board(self.your_board, diff_board(self.shown_own, own))
+        self.shown_own = own
         
         
         # Opponent's board
@@ -467,7 +768,8 @@ class BattleshipGame(tk.Tk):
         tk.Label(opponent_board_frame, text=f"{opponent_name}'s Fleet",
                 font=("Arial", 16), bg=COLORS["background"],
                 fg=COLORS["text"]).pack(pady=(0, 10))
-        self.opponent_board = self.create_board(opponent_board_frame, is_opponent=True)
+        self.opponent_board = self.create_board(opponent_board_frame, on_click=self.target_cell)
+        self.opponent_board.pack()
         
         # Launch button
         self.launch_button = tk.Button(self.game_container, text="LAUNCH",
@@ -480,26 +782,50 @@ class BattleshipGame(tk.Tk):
                                      width=15, height=2)
         self.launch_button.pack(pady=20)
 
-    def create_board(self, parent: tk.Label, is_opponent=False) -> list:
+        # Suggest button, shows where the opponent's ships most likely are
+        self.planner = ShotPlanner(SHIPS, BOARD_SIZE)
+        self.overlay_active = False
+        self.suggest_button = tk.Button(self.game_container, text="Suggest shot",
+                                     font=("Arial", 14),
+                                     bg=COLORS["button"], fg=COLORS["text"],
+                                     command=self.show_suggestion)
+        self.suggest_button.pack()
+
+    def show_suggestion(self) -> None:
         '''
-        Creating board based on received message from server
+        Method for coloring the opponent board by the chance of a ship and selecting the best cell
         '''
-        # Creating frame for board
-        board_frame = tk.Frame(parent, bg=COLORS["background"])
-        board_frame.pack()
-        # Creating cells from the board
-        cells = []
-        for i in range(10):
-            row = []
-            for j in range(10):
-                cell = tk.Label(board_frame, width=4, height=2,
-                              bg=COLORS["board"], relief="solid", borderwidth=1)
-                cell.grid(row=i, column=j, padx=1, pady=1)
-                if is_opponent:
-                    cell.bind('<Button-1>', lambda e, x=i, y=j: self.target_cell(x, y))
-                row.append(cell)
-            cells.append(row)
-        return cells
+        if not self.game_active or self.launch_button["state"] == "disabled":
+            return
+        self.clear_overlay()
+        scores = self.planner.heatmap(self.shown_opponent)
+        top = max(scores) or 1
+        for index, score in enumerate(scores):
+            if score:
+                row, col = divmod(index, BOARD_SIZE)
+                self.opponent_board.set_color(row, col, blend_color(COLORS["board"], COLORS["heat"], score / top))
+        self.overlay_active = True
+        cell = self.planner.suggest(self.shown_opponent)
+        if cell:
+            self.target_cell(*cell)
+
+    def clear_overlay(self) -> None:
+        '''
+        Method for removing the suggestion colors from the opponent board
+        '''
+        if self.overlay_active:
+            self.overlay_active = False
+            changes = list(enumerate(self.shown_opponent))
+            self.stop_effects(self.opponent_board, changes)
+            self.repaint_board(self.opponent_board, changes)
+
+    def create_board(self, parent: tk.Frame, on_click=None, size: int = BOARD_SIZE):
+        '''
+        Creating a board, on_click gets called with row and column of a clicked cell
+        '''
+        if self.canvas_boards:
+            return CanvasBoard(parent, on_click=on_click, size=size)
+        return LabelBoard(parent, on_click=on_click, size=size)
 
     def target_cell(self, row: int, col: int) -> None:
         '''
@@ -513,180 +839,190 @@ class BattleshipGame(tk.Tk):
         if hasattr(self, 'selected_cell'):
             if self.selected_cell:
                 old_row, old_col = self.selected_cell
-                self.opponent_board[old_row][old_col].configure(
-                    bg=COLORS["board"])
+                self.animator.cancel((self.opponent_board, old_row * BOARD_SIZE + old_col))
+                self.opponent_board.set_color(old_row, old_col,
+                    CELL_COLORS.get(self.shown_opponent[old_row * BOARD_SIZE + old_col], COLORS["board"]))
                 
                 # Reset cursor for all cells
-                for r in self.opponent_board:
-                    for cell in r:
-                        cell.configure(cursor="")
+                self.opponent_board.set_cursor("")
         
-        # Set new selection
+        # Set new selection, fading in
         self.selected_cell = (row, col)
-        self.opponent_board[row][col].configure(bg=COLORS["accent"])
+        cell = row * BOARD_SIZE + col
+        start_color = CELL_COLORS.get(self.shown_opponent[cell], COLORS["board"])
+        self.animator.animate((self.opponent_board, cell), SELECT_DURATION,
+                              lambda share: self.opponent_board.set_color(
+                                  row, col, blend_color(start_color, COLORS["accent"], share)))
         self.launch_button.configure(state="normal")
         
         # Change cursor for opponent's board cells when it's player's turn
         if self.launch_button["state"] != "disabled":
-            for r in self.opponent_board:
-                for cell in r:
-                    if self.target_cursor:
-                        cell.configure(cursor="crosshair")
-                    else:
-                        cell.configure(cursor="target")
+            if self.target_cursor:
+                self.opponent_board.set_cursor("crosshair")
+            else:
+                self.opponent_board.set_cursor("target")
 
     def play_alert(self) -> None:
         '''
         Method for playing alerts and visiual effects at start of players turn
         '''
         if self.specialmode:
+            METRICS.count("alerts")
             try:
-                # Pygame for playing sounds
-                pygame.mixer.music.load(ASSETS["siren"])
-                pygame.mixer.music.play()
+                # Pygame for playing sounds, the siren is already loaded
+                self.assets.play_sound("siren")
                 
-                # Enhanced flash effect
-                def flash():
-                    flash_colors = ["#0000FF", "#000080", "#0000FF", "#000080"]
-                    flash_durations = [0.3, 0.2, 0.3, 0.2]
-                    
-                    for color, duration in zip(flash_colors, flash_durations):
-                        # Flash the main window
-                        self.configure(bg=color)
-                        
-                        # Flash the board frames
-                        for frame in [self.game_container, self.boards_frame]:
-                            frame.configure(bg=color)
-                        
-                        # Method intigrated in tkinter
-                        self.update()
-                        time.sleep(duration)
-                        
-                        # Reset colors
-                        self.configure(bg=COLORS["background"])
-                        for frame in [self.game_container, self.boards_frame]:
-                            frame.configure(bg=COLORS["background"])
-                        
-                        self.update()
-                        time.sleep(duration)
-                # Thread for flashing, therefore not affecting the rest of the game
-                threading.Thread(target=flash, daemon=True).start()
+                # Enhanced flash effect, a turn during a running flash does not start a second one
+                self.animator.animate("flash", 2 * sum(duration for _, duration in FLASH), self.flash_step(),
+                                      merge=True)
             # Error handling
             except Exception as e:
                 print(f"Error playing alert: {e}")
 
-    def play_video(self, video_type: str) -> None:
+    def flash_step(self):
         '''
-        Method for playing videos if special mode is activated
+        Method for the step function of the turn flash, the window is only recolored when the color changes
         '''
-        if self.specialmode:
-            try:
-                # Stop any existing playback first
+        total = 2 * sum(duration for _, duration in FLASH)
+        shown = [None]
+
+        def step(share: float) -> None:
+            elapsed = share * total
+            color = COLORS["background"]
+            for flash, duration in FLASH:
+                if elapsed < duration:
+                    color = flash
+                    break
+                elapsed -= 2 * duration
+                if elapsed < 0:
+                    break
+            if color != shown[0]:
+                shown[0] = color
+                self.set_flash_color(color)
+
+        return step
+
+    def pulse(self, board, index: int) -> None:
+        '''
+        Method for letting a cell which was just hit glow up once
+        '''
+        row, col = divmod(index, BOARD_SIZE)
+        self.animator.animate((board, index), PULSE_DURATION,
+                              lambda share: board.set_color(row, col, blend_color(
+                                  CELL_COLORS[HIT], COLORS["accent"], 1 - abs(2 * share - 1))))
+
+    def set_flash_color(self, color: str) -> None:
+        '''
+        Method for coloring the window and the board frames during a flash
+        '''
+        try:
+            self.configure(bg=color)
+            for frame in [self.game_container, self.boards_frame]:
+                frame.configure(bg=color)
+        except tk.TclError:
+            # Window was closed or reset in between
+            pass
+
+    def play_video(self, video_type: str, on_done=None) -> None:
+        '''
+        Method for playing videos if special mode is activated, returns right away
+        on_done gets called once the video has finished, was closed or could not be played
+        '''
+        if not self.specialmode:
+            if on_done:
+                on_done()
+            return
+        try:
+            # Stop any existing playback first
+            self.stop_current_playback()
+            self.video_done = on_done
+
+            # Path for video, missing videos are skipped
+            video_path = ASSETS["videos"][video_type]
+            if not self.assets.available(video_path):
                 self.stop_current_playback()
-                
-                # Wait a brief moment to ensure cleanup is complete
-                self.after(100)  # small delay for cleanup
-                
-                # Paths for video and duration in milliseconds
-                video_path = ASSETS["videos"][video_type]
-                duration = VIDEOLENGTHS[video_type] * 1000 
-
-                # Store current video type
-                self.current_video = video_type
-                    
-                # Create a new fullscreen window for the video
-                video_window = tk.Toplevel(self)
-                video_window.attributes("-fullscreen", True)
-                video_window.title(video_type.capitalize())
-                
-                # Create a label to display the video
-                video_label = tk.Label(video_window)
-                video_label.pack(expand=True, fill="both")
+                return
+            start_time = time.perf_counter()
+            self.last_video_latency = 0
 
-                # Initialize MediaPlayer and video capture
-                self.player = MediaPlayer(video_path)
-                self.cap = cv2.VideoCapture(video_path)
+            # Store current video type
+            self.current_video = video_type
                 
-                if not self.cap.isOpened():
-                    raise Exception(f"Failed to open video file: {video_path}")
+            # Create a new fullscreen window for the video
+            video_window = tk.Toplevel(self)
+            video_window.attributes("-fullscreen", True)
+            video_window.title(video_type.capitalize())
+            self.video_window = video_window
+            
+            # Create a label to display the video
+            video_label = tk.Label(video_window)
+            video_label.pack(expand=True, fill="both")
 
-                # Get video properties
-                fps = self.cap.get(cv2.CAP_PROP_FPS)
-                frame_delay = int(1000 / fps)  # Convert fps to milliseconds delay
-                
-                self.playing = True
-
-                def update_frame():
-                    '''
-                    Function for updating frames
-                    '''
-                    if not self.playing or not self.cap or not self.cap.isOpened():
-                        on_close()
-                        return
-
-                    ret, frame = self.cap.read()
-                    if not ret:
-                        on_close()
-                        return
-
-                    # Resize frame to fit the screen while maintaining aspect ratio
-                    screen_width = video_window.winfo_screenwidth()
-                    screen_height = video_window.winfo_screenheight()
-                    
-                    # Calculate aspect ratio
-                    height, width = frame.shape[:2]
-                    aspect_ratio = width / height
-                    
-                    # Calculate new dimensions
-                    if screen_width / screen_height > aspect_ratio:
-                        new_width = int(screen_height * aspect_ratio)
-                        new_height = screen_height
-                    else:
-                        new_width = screen_width
-                        new_height = int(screen_width / aspect_ratio)
-                    
-                    # Apply changes to the video/frame
-                    frame = cv2.resize(frame, (new_width, new_height))
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    frame = Image.fromarray(frame)
-                    frame = ImageTk.PhotoImage(frame)
-
-                    # Only update if window still exists
-                    if video_window.winfo_exists():
+            # Sound of the video and the decoder, frames are scaled to the screen size in the background
+            self.player = self.assets.open_sound(video_path)
+            self.cap = self.assets.open_video(video_path, (video_window.winfo_screenwidth(), video_window.winfo_screenheight()))
+
+            # The length comes from the file itself
+            if self.cap.duration:
+                duration = int(self.cap.duration * 1000)
+            else:
+                duration = VIDEOLENGTHS[video_type] * 1000
+            
+            self.playing = True
+            decoder = self.cap
+
+            def update_frame():
+                '''
+                Function for showing the frame which is due now, paced by the wall clock
+                '''
+                if not self.playing or self.cap is not decoder:
+                    on_close()
+                    return
+                if decoder.finished:
+                    on_close()
+                    return
+
+                start = METRICS.clock()
+                frame = decoder.next_frame()
+                # Only update if window still exists
+                if video_window.winfo_exists():
+                    if frame is not None:
+                        frame = ImageTk.PhotoImage(frame)
                         video_label.configure(image=frame)
                         video_label.image = frame  # Keep a reference
-
-                        if self.playing:
-                            video_window.after(frame_delay, update_frame)
-
-                def on_close():
-                    '''
-                    Function for stopping playback
-                    '''
+                        if decoder.delivered == 1:
+                            self.last_video_latency = time.perf_counter() - start_time
+                        METRICS.stop("video_frame", start)
+
+                    if self.playing:
+                        video_window.after(decoder.delay(), update_frame)
+
+            def on_close():
+                '''
+                Function for stopping playback, does nothing if this video was already replaced
+                '''
+                if self.video_window is video_window:
                     self.stop_current_playback()
-                    if video_window.winfo_exists():
-                        video_window.destroy()
 
-                # Handle window closing
-                video_window.protocol("WM_DELETE_WINDOW", on_close)
+            # Handle window closing
+            video_window.protocol("WM_DELETE_WINDOW", on_close)
 
-                # Start playback
-                if self.player:
-                    self.player.set_pause(False)
-                update_frame()
+            # Start playback
+            if self.player:
+                self.player.set_pause(False)
+            decoder.start()
+            update_frame()
 
-                # Auto-close after duration
-                video_window.after(duration, on_close)
+            # Auto-close shortly after the end of the video in case the last frame is never reported
+            self.after(duration + 1000, on_close)
 
-            # Error handling
-            except Exception as e:
-                print(f"Error playing video: {e}")
-                self.stop_current_playback()
-                if 'video_window' in locals() and video_window.winfo_exists():
-                    video_window.destroy()
+        # Error handling
+        except Exception as e:
+            print(f"Error playing video: {e}")
+            self.stop_current_playback()
 
     def stop_current_playback(self) -> None:
-        """Safely stop current playback and cleanup resources."""
+        """Safely stop current playback, cleanup resources and report the end of the video."""
         if self.specialmode:
             self.playing = False
             
@@ -699,107 +1035,117 @@ class BattleshipGame(tk.Tk):
                 except Exception as e:
                     print(f"Error cleaning up player: {e}")
 
-            # Cleanup Video Capture
+            # Cleanup Video Decoder
             if self.cap:
                 try:
-                    self.cap.release()
+                    self.cap.stop()
+                    self.last_video_frames = (self.cap.delivered, self.cap.dropped)
+                    METRICS.count("video_frames_shown", self.cap.delivered)
+                    METRICS.count("video_frames_dropped", self.cap.dropped)
+                    print(f"Video {self.current_video}: {self.cap.delivered} frames shown, {self.cap.dropped} dropped, "
+                          f"first frame after {self.last_video_latency * 1000:.0f} ms")
                     self.cap = None
                 except Exception as e:
                     print(f"Error cleaning up video capture: {e}")
+
+            # Close the video window
+            if self.video_window:
+                try:
+                    self.video_window.destroy()
+                except tk.TclError:
+                    pass
+                self.video_window = None
             
             self.current_video = None
 
+            # Continue with whatever waited for the video
+            done, self.video_done = self.video_done, None
+            if done:
+                done()
 
-    def game_loop(self) -> None:
+
+    def show_turn(self, my_turn: bool) -> None:
         '''
-        Main game loop
+        Method for displaying whose turn it is
         '''
-        while self.game_active:
-            try:
-                message = self.receive_str()
-                print(f"Received message: {message}")  # Debug print
-                
-                # Handling of different server responses
-                # Player turn
-                if message == "your turn":
-                    self.turn_label.configure(text="Your Turn!")
-                    self.launch_button.configure(state="normal")
-                    self.play_alert()
-                    for row in self.opponent_board:
-                        for cell in row:
-                            if self.target_cursor:
-                                cell.configure(cursor="crosshair")
-                            else:
-                                cell.configure(cursor="target")
-                # Opponent turn
-                elif message == "opponent turn":
-                    self.turn_label.configure(text="Opponent's Turn...")
-                    self.launch_button.configure(state="disabled")
-                    for row in self.opponent_board:
-                        for cell in row:
-                            cell.configure(cursor="")
-
-                # Continue message
-                elif message == "continue":
-                    pass
+        if my_turn:
+            self.turn_label.configure(text="Your Turn!")
+            self.launch_button.configure(state="normal")
+            self.play_alert()
+            if self.target_cursor:
+                self.opponent_board.set_cursor("crosshair")
+            else:
+                self.opponent_board.set_cursor("target")
+        else:
+            self.turn_label.configure(text="Opponent's Turn...")
+            self.launch_button.configure(state="disabled")
+            self.opponent_board.set_cursor("")
 
-                # Game end - win
-                elif message == "winner":
-                    self.game_active = False
-                    
-                    self.turn_label.configure(text="Victory!")
-                    if self.specialmode:
-                        self.play_video("win")
-                        self.after(60000, self.reset_game)
-                    self.after(2000, self.reset_game)
-
-                # Game end - loss
-                elif message == "looser":
-                    self.game_active = False
-                    self.turn_label.configure(text="Defeat!")
-                    if self.specialmode:
-                        self.play_video("lose")
-                        self.after(60000, self.reset_game)  
-                    self.after(2000, self.reset_game)
-
-                # Handle the field updates
-                elif isinstance(eval(message), dict):
-                    fields = eval(message)
-                    # Update own field
-                    for i in range(10):
-                        for j in range(10):
-                            value = fields['own'][i][j]
-                            if value == "s":
-                                self.your_board[i][j].configure(bg=COLORS["hit"])
-                            elif value == "x":
-                                self.your_board[i][j].configure(bg=COLORS["miss"])
-                            elif value == "o":
-                                self.your_board[i][j].configure(bg=COLORS["accent"])
-                    
-                    # Update opponent field
-                    for i in range(10):
-                        for j in range(10):
-                            value = fields['opponent'][i][j]
-                            if value == "s":
-                                self.opponent_board[i][j].configure(bg=COLORS["hit"])
-                                if self.testcell == (i, j) and self.game_active and self.specialmode:
-                                    self.play_video("hit")
-                                    #only waiting for the video to end before the next move happens if special mode is activated
-                                    time.sleep(VIDEOLENGTHS["hit"])
-                            elif value == "x":
-                                self.opponent_board[i][j].configure(bg=COLORS["miss"])
-                                if self.testcell == (i, j) and self.game_active and self.specialmode:
-                                    self.play_video("miss")
-                                    #only waiting for the video to end before the next move happens if specialmode is activate
-                                    time.sleep(VIDEOLENGTHS["miss"])
+    def show_disconnected(self, error: str) -> None:
+        '''
+        Method for stopping the game after the connection was lost or could not be resumed, back to the lobby
+        '''
+        self.game_active = False
+        messagebox.showerror("Connection lost", error)
+        self.reset_game()
 
+    def show_reconnecting(self, error: str) -> None:
+        '''
+        Method for displaying that the game is continued on a new connection, the snapshot of the server
+        arrives as one board update and one turn afterwards
+        '''
+        self.turn_label.configure(text="Reconnecting...")
+        self.launch_button.configure(state="disabled")
+        self.opponent_board.set_cursor("")
 
-                
-            # Error handling    
-            except Exception as e:
-                print(f"Error in game loop: {e}")
-                self.game_active = False
-                break
+    def show_game_over(self, won: bool) -> None:
+        '''
+        Method for displaying the end of the game and returning to the lobby
+        '''
+        self.game_active = False
+        self.turn_label.configure(text="Victory!" if won else "Defeat!")
+        # Back to the lobby shortly after the video, right away without special mode
+        self.play_video("win" if won else "lose", on_done=lambda: self.after(2000, self.reset_game))
+
+    def show_update(self, fields: BoardUpdate) -> None:
+        '''
+        Method for drawing a field update, only the changed cells are reconfigured
+        '''
+        own_changes = diff_board(self.shown_own, fields.own)
+        opponent_changes = diff_board(self.shown_opponent, fields.opponent)
+        self.shown_own, self.shown_opponent = fields
+        self.stop_effects(self.your_board, own_changes)
+        self.stop_effects(self.opponent_board, opponent_changes)
+        self.last_update_repaints = (self.repaint_board(self.your_board, own_changes)
+                                     + self.repaint_board(self.opponent_board, opponent_changes))
+        self.total_repaints += self.last_update_repaints
+        for board, changes in ((self.your_board, own_changes), (self.opponent_board, opponent_changes)):
+            for index, value in changes:
+                if value == HIT:
+                    self.pulse(board, index)
+
+        # Video for the result of the own shot
+        if self.testcell and self.specialmode:
+            shot = self.testcell[0] * BOARD_SIZE + self.testcell[1]
+            for index, value in opponent_changes:
+                if index == shot and value in (HIT, MISS):
+                    #only handling the next server messages after the video if special mode is activated
+                    self.dispatcher.pause()
+                    self.play_video("hit" if value == HIT else "miss", on_done=self.dispatcher.resume)
+
+    def stop_effects(self, board, changes: list) -> None:
+        '''
+        Method for stopping the effects on cells which are repainted, they would paint over the new value
+        '''
+        if self.animator.effects:
+            for index, _ in changes:
+                self.animator.cancel((board, index))
+
+    def repaint_board(self, board, changes: list) -> int:
+        '''
+        Method for applying a batch of changed cells to a board, returns the number of reconfigured cells
+        '''
+        return repaint_cells(board, changes)
 
     def make_move(self, event=None) -> None:
         '''
@@ -812,19 +1158,18 @@ class BattleshipGame(tk.Tk):
                 
         row, col = self.selected_cell
         try:
-            # Format move command to match server expectations
-            # Server expects a tuple string like "(row,column)"
-            move_cmd = str((row, col))
-            self.send_str(move_cmd)
+            # The client formats the move command to match server expectations
+            self.client.move(row, col)
                 
             # Disable launch button and reset selection
             self.launch_button.configure(state="disabled")
-            self.opponent_board[row][col].configure(bg=COLORS["board"])
+            self.clear_overlay()
+            self.animator.cancel((self.opponent_board, row * BOARD_SIZE + col))
+            self.opponent_board.set_color(row, col,
+                CELL_COLORS.get(self.shown_opponent[row * BOARD_SIZE + col], COLORS["board"]))
                 
             # Reset cursor
-            for r in self.opponent_board:
-                for cell in r:
-                    cell.configure(cursor="")
+            self.opponent_board.set_cursor("")
                 
             self.testcell = self.selected_cell
 
@@ -836,52 +1181,43 @@ class BattleshipGame(tk.Tk):
 
     def reset_game(self) -> None:
         '''
-        Method for resetting game after finished round
-        '''
-        try:
-            # Closing socket
-            self.komm_s.close()
-        except:
-            pass
-        # Destroy method, included in tkinter library
-        self.destroy()
-        # Restart in homescreen, not changing the selected mode
-        BattleshipGame(self.specialmode).mainloop()
-
-    def send_str(self, data: str) -> None:
-        '''
-        Basic method for server integration / sending messages
-        '''
-        try:
-            self.komm_s.sendall(bytes(data, 'utf-8'))
-            self.komm_s.sendall(bytes([0]))
-        except Exception as e:
-            raise Exception(f"Failed to send data: {e}")
-
-    def receive_str(self) -> str:
-        '''
-        Basic method for server integration / receiving messages
-        '''
-        try:
-            data_bytes = bytes()
-            end_byte = bytes([0])
-            
-            while True:
-                chunk = self.komm_s.recv(1)
-                if chunk == end_byte or chunk == bytes([]):
-                    break
-                data_bytes += chunk
-            
-            return str(data_bytes, 'utf-8')
-        except Exception as e:
-            raise Exception(f"Failed to receive data: {e}")
+        Method for resetting game after finished round, the window, the loaded assets and the dispatcher are kept
+        With requeue the same fleet is queued again on the open connection
+        '''
+        start = METRICS.clock()
+        username = self.client.session.username if isinstance(self.client, GameClient) else ""
+        ships = [(ship["cells"][0][0], ship["cells"][0][1], ship["length"], ship["orientation"])
+                 for ship in self.fleet.placed_ships]
+        # Closing socket
+        if self.client and not (self.requeue and isinstance(self.client, GameClient)):
+            self.client.close()
+            self.client = None
+        # Events which are still queued belong to the finished game
+        self.dispatcher.clear()
+        # Back to the homescreen in the same window, not changing the selected mode
+        self.animator.cancel_all()
+        for widget in self.winfo_children():
+            widget.destroy()
+        self.configure(bg=COLORS["background"])
+        self.reset_state()
+        self.setup_ui()
+        self.username_entry.insert(0, username)
+        if self.client:
+            for ship in ships:
+                self.place_ship(*ship)
+            for ship in self.finished_ships:
+                ship.destroy()
+            self.finished_ships.clear()
+            self.start_game()
+        METRICS.stop("time_to_lobby", start)
+        METRICS.count("games")
 
     def __del__(self) -> None:
         '''
         Method for deleting connection towards server
         '''
         try:
-            self.komm_s.close()
+            self.client.close()
         except:
             pass
 
@@ -889,11 +1225,12 @@ class SelectorWindow(tk.Tk):
     '''
     Class for starting screen and selecting whether specialmode is enabled or not and then calling the BattleshipGame method
     '''
-    def __init__(self) -> None:
+    def __init__(self, **game_options) -> None:
         '''
-        Initializing basic attributes used for this class
+        Initializing basic attributes used for this class, game_options are passed on to the BattleshipGame
         '''
         super().__init__()
+        self.game_options = game_options
         self.title("Select your Client")
         self.geometry("1200x800")
         self.configure(bg=COLORS["background"])
@@ -954,7 +1291,7 @@ class SelectorWindow(tk.Tk):
         '''
         self.destroy()
         # Global function start_game
-        start_game(specialmode=False)
+        start_game(specialmode=False, **self.game_options)
 
     def specialClient(self) -> None:
         '''
@@ -962,17 +1299,47 @@ class SelectorWindow(tk.Tk):
         '''
         self.destroy()
         # Global function start_game
-        start_game(specialmode=True)
+        start_game(specialmode=True, **self.game_options)
 
-def start_game(specialmode: bool) -> None:
+def start_game(specialmode: bool, **game_options) -> None:
     '''
     Basic function for creating game object and starting the game
     '''
-    game = BattleshipGame(specialmode)
+    game = BattleshipGame(specialmode, **game_options)
     game.mainloop()        
 
 
 if __name__ == "__main__":
+    # Command line options
+    parser = argparse.ArgumentParser(description="Battleship client")
+    parser.add_argument("--canvas", action="store_true", help="draw the boards on a single canvas")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address of the server")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port of the server")
+    parser.add_argument("--record", default=None, metavar="DIR", help="save a transcript of every game in DIR")
+    parser.add_argument("--requeue", action="store_true",
+                        help="keep the connection after a game and search the next one with the same fleet")
+    parser.add_argument("--binary", action="store_true",
+                        help="use the compact binary protocol if the server offers it, text otherwise")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue a game on a new connection if the old one is lost")
+    parser.add_argument("--no-animations", action="store_true",
+                        help="show flashes, pulses and highlights in their final state right away, for slow machines")
+    parser.add_argument("--replay", default=None, metavar="FILE", help="show a recorded game instead of playing")
+    parser.add_argument("--speed", type=float, default=10.0, help="replay speed, 10 is ten times faster")
+    parser.add_argument("--seek", type=int, default=None, help="start the replay after this many field updates")
+    parser.add_argument("--metrics", type=float, default=None, metavar="SECONDS",
+                        help="measure the hot paths and print them every SECONDS")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve the measurements for Prometheus on http://127.0.0.1:PORT/metrics")
+    args = parser.parse_args()
+
+    if args.metrics or args.metrics_port:
+        METRICS.enable()
+        if args.metrics:
+            METRICS.start_logging(args.metrics)
+        if args.metrics_port:
+            METRICS.serve(args.metrics_port)
+
     # Create assets directory if it doesn't exist
     if not os.path.exists('assets'):
         os.makedirs('assets')
@@ -984,8 +1351,14 @@ if __name__ == "__main__":
         print("- assets/victory.mp4 (win animation)")
         print("- assets/defeat.mp4 (lose animation)")
     
-    selctorWindow = SelectorWindow()
-    selctorWindow.mainloop()
+    if args.replay:
+        start_game(specialmode=False, canvas_boards=args.canvas, replay=args.replay, replay_speed=args.speed,
+                   replay_seek=args.seek, animations=not args.no_animations)
+    else:
+        selctorWindow = SelectorWindow(canvas_boards=args.canvas, host=args.host, port=args.port, record_dir=args.record,
+                                       requeue=args.requeue, binary=args.binary, resume=args.resume,
+                                       animations=not args.no_animations)
+        selctorWindow.mainloop()
 
     #game = BattleshipGame(True)
     #game.mainloop()
\ No newline at end of file
@@ -0,0 +1,383 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import cv2
+import pygame
+from ffpyplayer.player import MediaPlayer
+from PIL import Image
+#Importing various librarys
+#os = checking the asset files
+#threading = decoding in the background
+#time = wall clock for presenting the frames
+#OrderedDict = least recently used frame cache
+#deque = ring buffer of decoded frames
+#cv2 = reading and scaling videos
+#pygame = preloaded sounds
+#ffpyplayer = sound of the videos
+#PIL = frames ready for tkinter
+
+
+def fit_size(width: int, height: int, max_width: int, max_height: int) -> tuple:
+    '''
+    Function for scaling a frame size to fit into a screen while keeping the aspect ratio
+    '''
+    aspect_ratio = width / height
+    if max_width / max_height > aspect_ratio:
+        return int(max_height * aspect_ratio), max_height
+    return max_width, int(max_width / aspect_ratio)
+
+
+def scale_frame(frame, size: tuple) -> Image.Image:
+    '''
+    Function for scaling a decoded frame and converting it into an RGB image
+    '''
+    frame = cv2.resize(frame, size)
+    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return Image.fromarray(frame)
+
+
+class Clip:
+    '''
+    Class for the already scaled frames of the start of a video, complete if they are all frames of it
+    '''
+    __slots__ = ("frames", "fps", "duration", "size", "complete")
+
+    def __init__(self, frames: list, fps: float, duration: float, size: tuple, complete: bool) -> None:
+        self.frames = frames
+        self.fps = fps
+        self.duration = duration
+        self.size = size
+        self.complete = complete
+
+
+class FrameCache:
+    '''
+    Class for keeping already scaled clips in memory, the least recently used clip is removed first
+    '''
+    def __init__(self, max_bytes: int) -> None:
+        '''
+        Initializing the cache with its size limit in bytes
+        '''
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._clips = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Clip:
+        '''
+        Method for getting a cached clip, None if the clip is not cached
+        '''
+        with self._lock:
+            if key not in self._clips:
+                return None
+            self._clips.move_to_end(key)
+            return self._clips[key][0]
+
+    def put(self, key: tuple, clip: Clip) -> bool:
+        '''
+        Method for adding a clip, returns False if it is bigger than the whole cache
+        '''
+        size = sum(frame.width * frame.height * len(frame.getbands()) for frame in clip.frames)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            if key in self._clips:
+                self.used_bytes -= self._clips.pop(key)[1]
+            while self._clips and self.used_bytes + size > self.max_bytes:
+                self.used_bytes -= self._clips.popitem(last=False)[1][1]
+            self._clips[key] = (clip, size)
+            self.used_bytes += size
+        return True
+
+
+class MediaAssets:
+    '''
+    Class for checking the asset files once and keeping sounds and the start of videos in memory
+    '''
+    def __init__(self, assets: dict, cache_bytes: int = 256 * 1024 * 1024, prefix_seconds: float = 0.5,
+                 clip_bytes: int = 32 * 1024 * 1024) -> None:
+        '''
+        Checking all paths in the assets dict, missing files are reported once
+        Videos whose scaled frames take at most clip_bytes are cached whole, of longer ones the first prefix_seconds
+        '''
+        self.assets = assets
+        self.prefix_seconds = prefix_seconds
+        self.clip_bytes = clip_bytes
+        self.cache = FrameCache(cache_bytes)
+        self.sounds = {}
+        self.missing = set()
+        self._warned = set()
+        for path in self._paths(assets):
+            if not os.path.isfile(path):
+                self.missing.add(path)
+        if self.missing:
+            print(f"Missing asset files, the matching effects are skipped: {', '.join(sorted(self.missing))}")
+            self._warned.update(self.missing)
+
+    def _paths(self, assets: dict) -> list:
+        '''
+        Method for getting all file paths of a nested assets dict
+        '''
+        paths = []
+        for value in assets.values():
+            if isinstance(value, dict):
+                paths.extend(self._paths(value))
+            else:
+                paths.append(value)
+        return paths
+
+    def available(self, path: str) -> bool:
+        '''
+        Method for checking if an asset can be used, a missing file is only reported once
+        '''
+        if path in self.missing or not os.path.isfile(path):
+            self.missing.add(path)
+            if path not in self._warned:
+                print(f"Missing asset file: {path}")
+                self._warned.add(path)
+            return False
+        return True
+
+    def init_audio(self) -> None:
+        '''
+        Method for initializing the pygame mixer
+        '''
+        if not pygame.mixer.get_init():
+            try:
+                pygame.mixer.init()
+            except pygame.error as e:
+                print(f"Could not initialize sound: {e}")
+
+    def load_sound(self, name: str, path: str) -> None:
+        '''
+        Method for loading a sound into memory, the mixer has to be initialized
+        '''
+        if name not in self.sounds and self.available(path):
+            try:
+                self.sounds[name] = pygame.mixer.Sound(path)
+            except Exception as e:
+                print(f"Could not load sound {path}: {e}")
+
+    def play_sound(self, name: str) -> None:
+        '''
+        Method for playing a preloaded sound
+        '''
+        sound = self.sounds.get(name)
+        if sound and pygame.mixer.get_init():
+            sound.play()
+
+    def preload_video(self, path: str, screen_size: tuple) -> None:
+        '''
+        Method for decoding a video at the screen size into the cache, whole if it fits into clip_bytes
+        and otherwise only its start
+        '''
+        if not self.available(path) or self.cache.get((path, screen_size)) is not None:
+            return
+        cap = cv2.VideoCapture(path)
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 25
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            size = fit_size(int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), *screen_size)
+            frame_bytes = size[0] * size[1] * 3
+            # Short videos are read until their end, of the others only the start
+            if 0 < frame_count * frame_bytes <= self.clip_bytes:
+                limit = self.clip_bytes // frame_bytes
+            else:
+                limit = fps * self.prefix_seconds
+            frames = []
+            ret = True
+            while ret and len(frames) < limit:
+                ret, frame = cap.read()
+                if ret:
+                    frames.append(scale_frame(frame, size))
+            if not ret:
+                duration = len(frames) / fps
+            else:
+                duration = frame_count / fps if frame_count > 0 else None
+            self.cache.put((path, screen_size), Clip(frames, fps, duration, size, complete=not ret))
+        except Exception as e:
+            print(f"Could not preload video {path}: {e}")
+        finally:
+            cap.release()
+
+    def preload_videos(self, paths: list, screen_size: tuple) -> None:
+        '''
+        Method for preloading videos in a background thread
+        '''
+        def preload():
+            for path in paths:
+                self.preload_video(path, screen_size)
+        threading.Thread(target=preload, daemon=True).start()
+
+    def open_video(self, path: str, screen_size: tuple) -> "VideoDecoder":
+        '''
+        Method for creating a decoder, using the cached clip of the video if there is one
+        '''
+        return VideoDecoder(path, screen_size, clip=self.cache.get((path, screen_size)))
+
+    def open_sound(self, path: str) -> MediaPlayer:
+        '''
+        Method for opening the sound of a video paused, the frames come from the VideoDecoder
+        Only one player can hold the audio device, so it is opened for every play and not in advance
+        '''
+        return MediaPlayer(path, ff_opts={"paused": True, "vn": True})
+
+
+# Assets shared by all game windows, so a new round does not load them again
+_shared_assets = None
+
+
+def shared_assets(assets: dict) -> MediaAssets:
+    '''
+    Function for getting the asset manager, it is created on first use
+    '''
+    global _shared_assets
+    if _shared_assets is None:
+        _shared_assets = MediaAssets(assets)
+    return _shared_assets
+
+
+class VideoDecoder:
+    '''
+    Class for decoding and scaling a video in a background thread into a bounded ring buffer
+    The frames are presented by wall clock, frames which are too late get dropped
+    '''
+    def __init__(self, path: str, screen_size: tuple, buffer_size: int = 8, clip: Clip = None) -> None:
+        '''
+        Opening the video and computing the target size once
+        clip is the cached start of the video, its frames are shown without waiting for the decoder and the file is
+        only opened by the decoder thread, a complete clip is not read again at all
+        '''
+        self.path = path
+        self.cap = None
+        if clip is None:
+            self.cap = cv2.VideoCapture(path)
+            if not self.cap.isOpened():
+                raise Exception(f"Failed to open video file: {path}")
+            self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 25
+            frame_count = self.cap.get(cv2.CAP_PROP_FRAME_COUNT)
+            # Length from the file itself, None if the file does not contain it
+            self.duration = frame_count / self.fps if frame_count > 0 else None
+            width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self.size = fit_size(width, height, *screen_size) if width and height else screen_size
+        else:
+            self.fps, self.duration, self.size = clip.fps, clip.duration, clip.size
+        self.buffer_size = buffer_size
+        # Decoded frames as (index, image)
+        cached = clip.frames if clip else []
+        self._cached = len(cached)
+        self._frames = deque(enumerate(cached))
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._running = False
+        self._decoding_done = clip is not None and clip.complete
+        self._start_time = None
+        # Statistics, frames dropped before scaling are counted by the decoder thread
+        self.delivered = 0
+        self._late_decoded = 0
+        self._late_presented = 0
+
+    def start(self) -> None:
+        '''
+        Method for starting the decoder thread and the presentation clock
+        '''
+        self._running = True
+        self._start_time = time.perf_counter()
+        if not self._decoding_done:
+            self._thread.start()
+
+    def stop(self) -> None:
+        '''
+        Method for stopping the decoder thread and releasing the video
+        '''
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread.ident is None:
+            # Decoder thread was never started
+            if self.cap:
+                self.cap.release()
+        elif self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+
+    def _due_index(self) -> int:
+        '''
+        Method for getting the index of the frame which should be on screen right now
+        '''
+        return int((time.perf_counter() - self._start_time) * self.fps)
+
+    def _decode(self) -> None:
+        '''
+        Decoder thread, reads, scales and converts frames until the video ends or stop is called
+        '''
+        index = 0
+        try:
+            if self.cap is None:
+                self.cap = cv2.VideoCapture(self.path)
+            # Skipping the frames which are already in the buffer from the cache
+            while index < self._cached and self._running and self.cap.grab():
+                index += 1
+            while self._running:
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                # Frames which are already too late are not scaled at all
+                if index < self._due_index():
+                    self._late_decoded += 1
+                    index += 1
+                    continue
+                image = scale_frame(frame, self.size)
+                with self._cond:
+                    while self._running and len(self._frames) >= self.buffer_size:
+                        self._cond.wait(0.1)
+                    self._frames.append((index, image))
+                index += 1
+        except Exception as e:
+            print(f"Error decoding video: {e}")
+        finally:
+            if self.cap:
+                self.cap.release()
+            self._decoding_done = True
+
+    def next_frame(self):
+        '''
+        Method for getting the frame to show now, None if the frame on screen is still current
+        Older frames in the buffer are dropped
+        '''
+        due = self._due_index()
+        frame = None
+        with self._cond:
+            while self._frames and self._frames[0][0] <= due:
+                if frame is not None:
+                    self._late_presented += 1
+                frame = self._frames.popleft()[1]
+            self._cond.notify()
+        if frame is not None:
+            self.delivered += 1
+        return frame
+
+    def delay(self) -> int:
+        '''
+        Method for getting the milliseconds until the next frame is due
+        '''
+        next_index = self._due_index() + 1
+        remaining = next_index / self.fps - (time.perf_counter() - self._start_time)
+        return max(1, int(remaining * 1000))
+
+    @property
+    def dropped(self) -> int:
+        '''
+        Number of frames which were never shown
+        '''
+        return self._late_decoded + self._late_presented
+
+    @property
+    def finished(self) -> bool:
+        '''
+        True once all frames were decoded and presented or dropped
+        '''
+        with self._cond:
+            return self._decoding_done and not self._frames
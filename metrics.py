@@ -0,0 +1,156 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+#Importing various librarys
+#threading = lock for counters from several threads and the log thread
+#time = timers
+#http.server = optional /metrics endpoint for Prometheus
+# Disabled by default, every call returns right away until enable is called
+# so the instrumented hot paths cost one method call when nobody is looking
+
+PREFIX = "battleship_"
+
+
+class Metrics:
+    '''
+    Class for counters, timers and gauges of the client
+    Timers keep count, sum and maximum of the observed seconds
+    '''
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.counters = {}
+        self.timers = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def count(self, name: str, value: int = 1) -> None:
+        '''
+        Method for adding to a counter
+        '''
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        '''
+        Method for setting a value which can go up and down, e.g. the length of a queue
+        '''
+        if self.enabled:
+            self.gauges[name] = value
+
+    def clock(self) -> float:
+        '''
+        Method for starting a timer, returns 0 if disabled so no clock is read
+        '''
+        return time.perf_counter() if self.enabled else 0.0
+
+    def observe(self, name: str, seconds: float) -> None:
+        '''
+        Method for adding a measured duration to a timer
+        '''
+        if not self.enabled:
+            return
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                if seconds > timer[2]:
+                    timer[2] = seconds
+
+    def stop(self, name: str, start: float) -> None:
+        '''
+        Method for stopping a timer started with clock
+        '''
+        if self.enabled and start:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        '''
+        Method for getting a copy of all values, timers as count, total and max seconds
+        '''
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "timers": {name: {"count": timer[0], "total": timer[1], "max": timer[2]}
+                           for name, timer in self.timers.items()},
+                "gauges": dict(self.gauges),
+            }
+
+    def log_line(self) -> str:
+        '''
+        Method for getting all values in one short line
+        '''
+        values = self.snapshot()
+        parts = [f"{name}={value}" for name, value in sorted(values["counters"].items())]
+        parts += [f"{name}={value:g}" for name, value in sorted(values["gauges"].items())]
+        for name, timer in sorted(values["timers"].items()):
+            parts.append(f"{name}={timer['total'] / timer['count'] * 1000:.2f}ms/{timer['count']}"
+                         f"(max {timer['max'] * 1000:.1f}ms)")
+        return "metrics " + " ".join(parts)
+
+    def prometheus(self) -> str:
+        '''
+        Method for getting all values in the Prometheus text format
+        '''
+        values = self.snapshot()
+        lines = []
+        for name, value in sorted(values["counters"].items()):
+            lines += [f"# TYPE {PREFIX}{name}_total counter", f"{PREFIX}{name}_total {value}"]
+        for name, value in sorted(values["gauges"].items()):
+            lines += [f"# TYPE {PREFIX}{name} gauge", f"{PREFIX}{name} {value}"]
+        for name, timer in sorted(values["timers"].items()):
+            lines += [f"# TYPE {PREFIX}{name}_seconds summary",
+                      f"{PREFIX}{name}_seconds_count {timer['count']}",
+                      f"{PREFIX}{name}_seconds_sum {timer['total']}",
+                      f"# TYPE {PREFIX}{name}_seconds_max gauge",
+                      f"{PREFIX}{name}_seconds_max {timer['max']}"]
+        return "\n".join(lines) + "\n"
+
+    def start_logging(self, interval: float = 10.0) -> None:
+        '''
+        Method for printing the log line every interval seconds in a background thread
+        '''
+        def log():
+            while True:
+                time.sleep(interval)
+                print(self.log_line())
+        if self._logger is None:
+            self._logger = threading.Thread(target=log, daemon=True)
+            self._logger.start()
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        '''
+        Method for serving the Prometheus text on http://host:port/metrics in a background thread
+        '''
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Metrics of this process, shared by all modules
+METRICS = Metrics()
@@ -0,0 +1,317 @@
+import os
+import re
+import socket
+from collections import deque
+from functools import lru_cache
+from typing import NamedTuple
+#Importing various librarys
+#os = server address from the environment
+#re = checking the structure of field updates
+#socket = server communication
+#deque = queue for already received frames
+#lru_cache = building the field update pattern only once
+#NamedTuple = compact field update
+
+# Address of the server, can be changed with BATTLESHIP_HOST and BATTLESHIP_PORT
+DEFAULT_HOST = os.environ.get("BATTLESHIP_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("BATTLESHIP_PORT", "5000"))
+# Every message is terminated with a single zero byte
+END_BYTE = 0
+# Size of one recv call, big enough for a complete field update
+RECV_SIZE = 4096
+# Board size used by the server
+BOARD_SIZE = 10
+
+# Cell values in a decoded board, one byte per cell
+EMPTY = ord(" ")
+SHIP = ord("o")
+HIT = ord("s")
+MISS = ord("x")
+
+
+# Optional features are offered by the server after the username as "!caps name ...", the client answers
+# with "?caps name ..." for the ones it wants (maybe none), a name can carry a value as name=value
+# A server without them sends "game start" right away, so the client never sends anything it does not expect
+CAPS_REQUEST = "?caps "
+CAPS_ANSWER = "!caps "
+# Resuming a game after a lost connection, the token comes with the offer of the capability
+RESUME = "resume1"
+RESUME_REQUEST = "?resume "
+RESUME_FAILED = "!resume failed"
+
+
+class ProtocolError(ValueError):
+    '''
+    Error for messages which do not match the expected format
+    '''
+
+
+class BoardUpdate(NamedTuple):
+    '''
+    Decoded field update, both boards as bytes with one byte per cell in row order
+    '''
+    own: bytes
+    opponent: bytes
+
+
+class FrameReader:
+    '''
+    Class for reading zero terminated messages from a socket with a reusable receive buffer
+    '''
+    def __init__(self, sock: socket.socket, recv_size: int = RECV_SIZE) -> None:
+        '''
+        Initializing the receive buffer and the queue for complete frames
+        '''
+        self.sock = sock
+        self._chunk = bytearray(recv_size)
+        self._chunk_view = memoryview(self._chunk)
+        # Bytes of a frame which is not complete yet
+        self._pending = bytearray()
+        # Frames which are complete but were not requested yet
+        self._frames = deque()
+        self.closed = False
+        # Statistics, used for benchmarks
+        self.recv_calls = 0
+        self.bytes_copied = 0
+
+    def _fill(self) -> None:
+        '''
+        Method for reading one chunk from the socket and splitting it into frames
+        '''
+        n = self.sock.recv_into(self._chunk, len(self._chunk))
+        self.recv_calls += 1
+        if n == 0:
+            self.closed = True
+            return
+        data = self._chunk_view[:n]
+        start = 0
+        end = self._chunk.find(END_BYTE, 0, n)
+        while end != -1:
+            if self._pending:
+                # Frame started in an earlier chunk
+                self._pending += data[start:end]
+                frame = bytes(self._pending)
+                self._pending.clear()
+                self.bytes_copied += 2 * len(frame)
+            else:
+                frame = bytes(data[start:end])
+                self.bytes_copied += len(frame)
+            self._frames.append(frame)
+            start = end + 1
+            end = self._chunk.find(END_BYTE, start, n)
+        if start < n:
+            # Keep the beginning of the next frame
+            self._pending += data[start:n]
+            self.bytes_copied += n - start
+
+    def read_frame(self) -> bytes:
+        '''
+        Method for returning the next complete frame, reading from the socket only if needed
+        '''
+        while not self._frames:
+            if self.closed:
+                raise ConnectionError("Connection closed by server")
+            self._fill()
+        return self._frames.popleft()
+
+    def read_str(self) -> str:
+        '''
+        Method for returning the next frame as a string
+        '''
+        return str(self.read_frame(), 'utf-8')
+
+    def take_buffered(self) -> bytes:
+        '''
+        Method for taking all received bytes which were not read yet, e.g. before switching to another framing
+        '''
+        data = b"".join(frame + bytes([END_BYTE]) for frame in self._frames) + bytes(self._pending)
+        self._frames.clear()
+        self._pending.clear()
+        return data
+
+    def pending_frames(self) -> int:
+        '''
+        Method for getting the number of frames which can be read without a syscall
+        '''
+        return len(self._frames)
+
+    def __iter__(self):
+        '''
+        Iterating over all frames as strings until the connection is closed
+        '''
+        while True:
+            try:
+                yield self.read_str()
+            except ConnectionError:
+                return
+
+
+class FrameWriter:
+    '''
+    Class for writing zero terminated messages, every frame is built once in a reusable send buffer
+    and leaves with a single call, so no small terminator is left waiting behind Nagle's algorithm
+    '''
+    def __init__(self, sock: socket.socket, buffer_size: int = RECV_SIZE) -> None:
+        '''
+        Initializing the send buffer, it grows if a frame does not fit
+        '''
+        self.sock = sock
+        self._buffer = bytearray(buffer_size)
+        # Several frames are handed to the kernel at once where sendmsg is available (not on Windows)
+        self.gather = hasattr(sock, "sendmsg")
+        # Statistics, used for benchmarks
+        self.send_calls = 0
+        self.frames_sent = 0
+
+    def write_str(self, data: str) -> int:
+        '''
+        Method for sending one message, returns the number of bytes sent
+        '''
+        payload = data.encode("utf-8")
+        size = len(payload) + 1
+        if size > len(self._buffer):
+            self._buffer = bytearray(max(size, 2 * len(self._buffer)))
+        self._buffer[:size - 1] = payload
+        self._buffer[size - 1] = END_BYTE
+        with memoryview(self._buffer) as view:
+            self.sock.sendall(view[:size])
+        self.send_calls += 1
+        self.frames_sent += 1
+        return size
+
+    def write_many(self, messages: list) -> int:
+        '''
+        Method for sending several queued messages with one sendmsg call (writev), returns the number of bytes sent
+        '''
+        if len(messages) == 1 or not self.gather:
+            return sum(self.write_str(message) for message in messages)
+        end = bytes([END_BYTE])
+        parts = []
+        for message in messages:
+            parts.append(message.encode("utf-8"))
+            parts.append(end)
+        total = sum(len(part) for part in parts)
+        sent = 0
+        while sent < total:
+            n = self.sock.sendmsg(parts)
+            self.send_calls += 1
+            sent += n
+            # Partial write, dropping what is already sent
+            while parts and n >= len(parts[0]):
+                n -= len(parts[0])
+                parts.pop(0)
+            if n:
+                parts[0] = parts[0][n:]
+        self.frames_sent += len(messages)
+        return total
+
+
+def encode_frame(data: str) -> bytes:
+    '''
+    Function for building one complete frame out of a string
+    '''
+    return bytes(data, 'utf-8') + bytes([END_BYTE])
+
+
+def encode_caps(caps: dict, server: bool = False) -> str:
+    '''
+    Function for the capabilities of the client, or with server the ones of the server, out of names and values
+    (None without value)
+    '''
+    items = [name if value is None else f"{name}={value}" for name, value in caps.items()]
+    return (CAPS_ANSWER if server else CAPS_REQUEST) + " ".join(items)
+
+
+def decode_caps(message: str) -> dict:
+    '''
+    Function for reading the capabilities of the client or the server, returns None for other messages
+    '''
+    if not message.startswith((CAPS_REQUEST, CAPS_ANSWER)):
+        return None
+    caps = {}
+    for item in message[len(CAPS_REQUEST):].split():
+        name, _, value = item.partition("=")
+        caps[name] = value or None
+    return caps
+
+
+def _board_pattern(size: int) -> str:
+    '''
+    Function for building the pattern of one board as a list of rows
+    '''
+    # Printable ascii without quote and backslash
+    cell = r"\s*'[ -&(-\[\]-~]'\s*"
+    row = r"\s*\[" + (cell + ",") * (size - 1) + cell + r"\]\s*"
+    return r"\s*(\[" + (row + ",") * (size - 1) + row + r"\])\s*"
+
+
+@lru_cache(maxsize=None)
+def _update_pattern(size: int) -> re.Pattern:
+    '''
+    Function for building the pattern of a complete field update for a board size
+    '''
+    board = _board_pattern(size)
+    return re.compile(r"\s*\{\s*'(own|opponent)'\s*:" + board + r",\s*'(own|opponent)'\s*:" + board + r"\}\s*")
+
+
+@lru_cache(maxsize=None)
+def _field_pattern(size: int) -> re.Pattern:
+    '''
+    Function for building the pattern of a single board like the client sends it
+    '''
+    return re.compile(_board_pattern(size))
+
+
+# Extracts the cell values out of an already checked board
+_CELL = re.compile(r"'(.)'")
+
+
+def decode_update(message: str, size: int = BOARD_SIZE) -> BoardUpdate:
+    '''
+    Function for decoding a field update like "{'own': [[...]], 'opponent': [[...]]}" without eval
+    '''
+    match = _update_pattern(size).fullmatch(message)
+    if match is None:
+        raise ProtocolError(f"Malformed field update: {message[:60]!r}")
+    first_key, first_board, second_key, second_board = match.groups()
+    if first_key == second_key:
+        raise ProtocolError(f"Field update contains '{first_key}' twice")
+    first = "".join(_CELL.findall(first_board)).encode("latin-1")
+    second = "".join(_CELL.findall(second_board)).encode("latin-1")
+    if first_key == "own":
+        return BoardUpdate(first, second)
+    return BoardUpdate(second, first)
+
+
+def decode_board(message: str, size: int = BOARD_SIZE) -> bytes:
+    '''
+    Function for decoding a single board like "[[' ', 'o', ...], ...]" as the client sends its field
+    '''
+    match = _field_pattern(size).fullmatch(message)
+    if match is None:
+        raise ProtocolError(f"Malformed field: {message[:60]!r}")
+    return "".join(_CELL.findall(match.group(1))).encode("latin-1")
+
+
+def encode_board(board: bytes, size: int = BOARD_SIZE) -> list:
+    '''
+    Function for turning a decoded board back into the list of rows the server and client exchange
+    '''
+    text = board.decode("latin-1")
+    return [list(text[i:i + size]) for i in range(0, size * size, size)]
+
+
+def diff_board(old: bytes, new: bytes) -> list:
+    '''
+    Function for getting all changed cells between two decoded boards as (index, value) pairs
+    '''
+    if old == new:
+        return []
+    return [(i, value) for i, (before, value) in enumerate(zip(old, new)) if before != value]
+
+
+def is_update(message: str) -> bool:
+    '''
+    Function for a quick check if a message looks like a field update
+    '''
+    return message.startswith("{")
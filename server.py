@@ -0,0 +1,587 @@
+import argparse
+import asyncio
+import random
+import re
+import secrets
+from collections import deque
+
+import compact
+from async_client import AsyncConnection
+from board import BitBoard
+from protocol import (BoardUpdate, ProtocolError, decode_board, decode_caps, encode_board, encode_caps, BOARD_SIZE,
+                      DEFAULT_HOST, DEFAULT_PORT, RESUME, RESUME_FAILED, RESUME_REQUEST)
+#Importing various librarys
+#argparse = command line options
+#asyncio = many matches in one thread
+#random = who starts a match
+#re = reading the moves
+#secrets = resume tokens
+#deque = players waiting for an opponent
+#compact = optional binary format, negotiated per connection
+#async_client = zero terminated messages on asyncio streams
+#board = bitmask state of the boards
+#protocol = board format of the messages
+# Local stand-in for the course server, speaks exactly the protocol the client expects
+# --binary and --resume offer the negotiated extensions after the username, only for clients which answer the offer
+
+# A move like "(3, 4)"
+MOVE = re.compile(r"\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)\s*")
+
+
+class Player:
+    '''
+    Class for one connected player
+    '''
+    def __init__(self, name: str, connection: AsyncConnection, binary: bool = False, token: str = None,
+                 grace: float = 0.0) -> None:
+        '''
+        Initializing the player, the board is received once the match starts
+        binary if the client has negotiated the compact format, token if it can resume the match
+        within grace seconds after losing the connection
+        '''
+        self.name = name
+        self.connection = connection
+        self.binary = binary
+        self.token = token
+        self.grace = grace
+        self.match = None
+        # True while a lost connection waits for the player to come back instead of ending the match
+        self.resumable = False
+        # Resolved when the player continues on a new connection
+        self.replaced = asyncio.get_running_loop().create_future()
+        # True while an operation waits on the connection and a snapshot which has to go out before the next one
+        self.busy = False
+        self.snapshot_due = False
+        self.board = None
+        # Boards the client got with the last update, compact updates only contain the difference
+        self.sent = compact.empty_update()
+        # Number of the last turn of the match the client was told about, by a turn, an update or a snapshot
+        self.turn_sent = None
+        # Resolved once the match of this player has ended, True if the connection is still usable
+        self.done = asyncio.get_running_loop().create_future()
+
+    async def send(self, message) -> None:
+        '''
+        Method for sending a message, it may be a function so it is built again for every attempt, None sends nothing
+        '''
+        await self._io(lambda connection: self._send(connection.send, message))
+
+    async def recv(self) -> str:
+        return await self._io(lambda connection: connection.recv())
+
+    async def send_packet(self, payload) -> None:
+        await self._io(lambda connection: self._send(connection.send_packet, payload))
+
+    async def recv_packet(self) -> bytes:
+        return await self._io(lambda connection: connection.recv_packet())
+
+    async def _send(self, send, message) -> None:
+        if callable(message):
+            message = message()
+        if message is not None:
+            await send(message)
+
+    async def _io(self, operation):
+        '''
+        Method for running a send or receive on the connection of the player
+        While the match can be resumed a broken connection is no error yet, the player has grace seconds
+        to come back and the operation is repeated on the new connection
+        '''
+        if not self.resumable:
+            return await operation(self.connection)
+        self.busy = True
+        try:
+            while True:
+                replaced = self.replaced
+                task = asyncio.ensure_future(self._attempt(operation))
+                try:
+                    await asyncio.wait((task, replaced), return_when=asyncio.FIRST_COMPLETED)
+                except asyncio.CancelledError:
+                    task.cancel()
+                    raise
+                if not task.done():
+                    # The player is back on a new connection, the old one is not read anymore
+                    task.cancel()
+                    task.add_done_callback(lambda task: task.cancelled() or task.exception())
+                    continue
+                try:
+                    return task.result()
+                except OSError as e:
+                    if not self.resumable or isinstance(e, asyncio.TimeoutError):
+                        raise
+                    error = e
+                try:
+                    await asyncio.wait_for(asyncio.shield(replaced), self.grace)
+                except asyncio.TimeoutError:
+                    raise ConnectionError(f"{self.name} did not come back: {error}")
+        finally:
+            self.busy = False
+
+    async def _attempt(self, operation):
+        await self.flush()
+        return await operation(self.connection)
+
+    async def flush(self) -> None:
+        '''
+        Method for sending a snapshot which is still due after the player came back
+        '''
+        if self.snapshot_due:
+            self.snapshot_due = False
+            await self.send_snapshot(self.connection)
+
+    async def reattach(self, connection: AsyncConnection) -> None:
+        '''
+        Method for continuing on a new connection, the player gets the current state as one snapshot
+        '''
+        old, self.connection = self.connection, connection
+        if self.busy:
+            # A move may still arrive on the old connection, the snapshot goes out once the match has used it
+            self.snapshot_due = True
+        else:
+            try:
+                await self.send_snapshot(connection)
+            except OSError:
+                # Lost again, the next resume sends a new snapshot
+                pass
+        replaced, self.replaced = self.replaced, asyncio.get_running_loop().create_future()
+        replaced.set_result(None)
+        await old.close()
+
+    async def send_snapshot(self, connection: AsyncConnection) -> None:
+        '''
+        Method for sending both boards and whose turn it is, the client replaces its state with it
+        '''
+        match = self.match
+        opponent = match.opponent(self)
+        turn = None if match.shooter is None else match.shooter is self
+        won = None if match.winner is None else match.winner is self
+        if self.binary:
+            update = BoardUpdate(self.board.encode(False), opponent.board.encode(True))
+            await connection.send_packet(compact.encode_update(compact.empty_update(), update,
+                                                               compact.update_flags(turn, won)))
+            self.sent = update
+        else:
+            await connection.send(str({'own': self.view(False), 'opponent': opponent.view(True)}))
+            if turn is not None:
+                await connection.send("your turn" if turn else "opponent turn")
+            elif won is not None:
+                await connection.send("winner" if won else "looser")
+        if turn is not None:
+            self.turn_sent = match.turn
+
+    def view(self, hide_ships: bool) -> list:
+        '''
+        Method for getting the board as rows, ships are hidden for the opponent
+        '''
+        return encode_board(self.board.encode(hide_ships))
+
+    async def send_start(self, opponent_name: str) -> None:
+        if self.binary:
+            await self.send_packet(compact.encode_start(opponent_name))
+        else:
+            await self.send("game start")
+            await self.send(opponent_name)
+
+    async def send_turn(self, mine: bool) -> None:
+        def turn():
+            # Known already from the last update or a snapshot
+            if self.turn_sent == self.match.turn:
+                return None
+            self.turn_sent = self.match.turn
+            if self.binary:
+                return compact.encode_turn(mine)
+            return "your turn" if mine else "opponent turn"
+
+        if self.binary:
+            await self.send_packet(turn)
+        else:
+            await self.send(turn)
+
+    async def send_result(self, won: bool) -> None:
+        if self.binary:
+            await self.send_packet(compact.encode_result(won))
+        else:
+            await self.send("winner" if won else "looser")
+
+    async def send_update(self, opponent: "Player", turn: bool = None, won: bool = None) -> None:
+        '''
+        Method for sending both boards after a shot, turn if the game goes on and won once it is over
+        The compact format sends the changed cells and the flags in one message, the text format
+        the whole boards followed by "continue" or the result
+        '''
+        if self.binary:
+            update = BoardUpdate(self.board.encode(False), opponent.board.encode(True))
+
+            def message():
+                # Built again if the connection is replaced in between, the snapshot may contain everything already
+                if self.sent == update and (turn is None or self.turn_sent == self.match.turn):
+                    return None
+                return compact.encode_update(self.sent, update, compact.update_flags(turn, won))
+
+            await self.send_packet(message)
+            self.sent = update
+            if turn is not None:
+                self.turn_sent = self.match.turn
+            return
+        await self.send(str({'own': self.view(False), 'opponent': opponent.view(True)}))
+        if won is None:
+            await self.send("continue")
+        else:
+            await self.send_result(won)
+
+    async def recv_board(self) -> bytes:
+        if self.binary:
+            return compact.decode_fleet(await self.recv_packet())
+        return decode_board(await self.recv())
+
+    async def recv_move(self) -> tuple:
+        '''
+        Method for receiving a shot as (row, col), None if the move can not be read
+        '''
+        if self.binary:
+            return compact.decode_shot(await self.recv_packet())
+        match = MOVE.fullmatch(await self.recv())
+        if not match:
+            return None
+        return int(match.group(1)), int(match.group(2))
+
+
+class Match:
+    '''
+    Class for one game between two players
+    '''
+    def __init__(self, server: "BattleshipServer", first: Player, second: Player) -> None:
+        self.server = server
+        self.players = (first, second)
+        # Player on turn, None before the first turn and after the end, turn counts every change of it
+        self.shooter = None
+        self.turn = 0
+        self.winner = None
+        # Player whose connection or messages ended the match early, and the ones which got the start
+        self.culprit = None
+        self.started = set()
+        for player in self.players:
+            player.match = self
+
+    def next_turn(self, shooter: Player) -> None:
+        '''
+        Method for setting the player on turn, None once the game is over
+        '''
+        self.shooter = shooter
+        self.turn += 1
+
+    def opponent(self, player: Player) -> Player:
+        first, second = self.players
+        return second if player is first else first
+
+    async def checked(self, player: Player, operation):
+        '''
+        Method for awaiting an operation of one player, if it fails the abort of the match is the fault of this player
+        '''
+        try:
+            return await operation
+        except (OSError, asyncio.TimeoutError, ProtocolError, UnicodeDecodeError):
+            if self.culprit is None:
+                self.culprit = player
+            raise
+
+    async def read_board(self, player: Player) -> None:
+        '''
+        Method for receiving and checking the field of a player
+        '''
+        player.board = BitBoard.from_bytes(await player.recv_board())
+        if not player.board.ship_count():
+            raise ProtocolError(f"{player.name} has no ships")
+
+    async def send_updates(self, shooter: Player, next_shooter: Player) -> None:
+        '''
+        Method for sending both players their own board and the board of the opponent
+        next_shooter is None once the game is over, then the shooter has won
+        '''
+        first, second = self.players
+        updates = []
+        for player, opponent in ((first, second), (second, first)):
+            if next_shooter:
+                update = player.send_update(opponent, turn=player is next_shooter)
+            else:
+                update = player.send_update(opponent, won=player is shooter)
+            updates.append(self.checked(player, update))
+        await asyncio.gather(*updates)
+
+    def shoot(self, defender: Player, move: tuple) -> bool:
+        '''
+        Method for applying a move, returns True for a hit and None for an invalid move
+        '''
+        if not move:
+            return None
+        row, col = move
+        if not (0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE):
+            return None
+        return defender.board.shoot(row, col)
+
+    async def play(self) -> None:
+        '''
+        Method for running the match until one fleet is destroyed or a player is gone
+        '''
+        first, second = self.players
+        shooter, defender = first, second
+        finished = False
+        try:
+            for player, opponent in ((first, second), (second, first)):
+                await self.checked(player, player.send_start(opponent.name))
+                self.started.add(player)
+            await asyncio.gather(self.checked(first, self.read_board(first)),
+                                 self.checked(second, self.read_board(second)))
+            # From now on a lost connection can be resumed
+            for player in self.players:
+                player.resumable = player.token is not None
+
+            # The player who waited longer starts in deterministic mode
+            if not self.server.deterministic and self.server.rng.random() < 0.5:
+                shooter, defender = second, first
+
+            self.next_turn(shooter)
+            while True:
+                await asyncio.gather(self.checked(shooter, shooter.send_turn(True)),
+                                     self.checked(defender, defender.send_turn(False)))
+                hit = self.shoot(defender, await self.checked(shooter, shooter.recv_move()))
+                if hit is None:
+                    # Invalid moves are ignored, the same player has to try again
+                    self.next_turn(shooter)
+                    continue
+                self.server.stats["shots"] += 1
+                if defender.board.all_sunk:
+                    self.winner = shooter
+                    self.next_turn(None)
+                    await self.send_updates(shooter, None)
+                    finished = True
+                    break
+                # A hit stays on turn
+                self.next_turn(shooter if hit else defender)
+                await self.send_updates(shooter, self.shooter)
+                if not hit:
+                    shooter, defender = defender, shooter
+        except (OSError, asyncio.TimeoutError, ProtocolError, UnicodeDecodeError) as e:
+            print(f"Match {first.name} vs {second.name} aborted: {e}")
+            for player in self.players:
+                player.resumable = False
+            # The remaining player wins, the one who caused the abort loses if it can still be reached
+            # A player who did not get the start yet is still searching and waits for the next opponent
+            for player in self.players:
+                if player is not self.culprit and player not in self.started:
+                    player.match = None
+                    self.server.matchmake(player)
+                    continue
+                try:
+                    await player.send_result(player is not self.culprit)
+                except OSError:
+                    pass
+        finally:
+            self.server.stats["matches"] += 1
+            # After a finished match the connections stay open, the players may queue again on them
+            for player in self.players:
+                if player.match is not self:
+                    continue
+                if finished:
+                    try:
+                        await player.flush()
+                    except OSError:
+                        pass
+                player.resumable = False
+                if not finished:
+                    await player.connection.close()
+                if not player.done.done():
+                    player.done.set_result(finished)
+
+
+class BattleshipServer:
+    '''
+    Class for the server, pairs waiting players and runs any number of matches concurrently
+    '''
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, deterministic: bool = False,
+                 seed: int = None, read_timeout: float = 300.0, binary: bool = False, resume_grace: float = 0.0) -> None:
+        '''
+        Initializing the server, deterministic pairs players strictly in order and lets the first one start
+        binary offers the compact format, resume_grace is how long a match waits for a player who lost the connection
+        With both off (the default) nothing is offered and the server speaks only the original protocol
+        '''
+        self.host = host
+        self.port = port
+        self.deterministic = deterministic
+        self.rng = random.Random(seed)
+        self.read_timeout = read_timeout
+        self.binary = binary
+        self.resume_grace = resume_grace
+        # Resume token -> player of the client
+        self.sessions = {}
+        self.waiting = deque()
+        self.matches = set()
+        # Tasks of the connections, from the username until the player leaves
+        self.connections = set()
+        self.stats = {"connections": 0, "matches": 0, "shots": 0, "requeues": 0, "binary": 0, "resumes": 0}
+        self.server = None
+
+    async def start(self) -> None:
+        '''
+        Method for starting to listen, port 0 picks a free port
+        '''
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=4096)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if not self.server:
+            await self.start()
+        print(f"Server running on {self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def close(self) -> None:
+        '''
+        Method for stopping the server, all matches and all connections
+        '''
+        self.server.close()
+        tasks = self.matches | self.connections
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        '''
+        Method for a new connection, runs until the player leaves or the server is closed
+        '''
+        self.stats["connections"] += 1
+        task = asyncio.current_task()
+        self.connections.add(task)
+        task.add_done_callback(self.connections.discard)
+        connection = AsyncConnection(reader, writer, self.read_timeout)
+        try:
+            await self.serve_client(connection)
+        except asyncio.CancelledError:
+            # Cancelled by close, asyncio would report a cancelled connection task as an error
+            await connection.close()
+
+    async def serve_client(self, connection: AsyncConnection) -> None:
+        '''
+        Method for a new connection, the first message is the username, the server offers its capabilities after it
+        A resume request instead of the username continues the running match of that client on this connection
+        '''
+        try:
+            name = await connection.recv()
+            if self.resume_grace and name.startswith(RESUME_REQUEST):
+                await self.resume(connection, name[len(RESUME_REQUEST):])
+                return
+            # Without anything to offer the server speaks exactly the original protocol
+            offered = {}
+            if self.binary:
+                offered[compact.CAPS] = None
+            if self.resume_grace:
+                offered[RESUME] = secrets.token_hex(8)
+            wanted = {}
+            if offered:
+                await connection.send(encode_caps(offered, server=True))
+                wanted = decode_caps(await connection.recv())
+                if wanted is None:
+                    raise ProtocolError("No answer to the capabilities")
+        except (OSError, asyncio.TimeoutError, ProtocolError, UnicodeDecodeError):
+            await connection.close()
+            return
+        binary = compact.CAPS in offered and compact.CAPS in wanted
+        if binary:
+            self.stats["binary"] += 1
+        token = offered.get(RESUME) if RESUME in wanted else None
+        await self.play_matches(Player(name, connection, binary, token, self.resume_grace))
+
+    async def resume(self, connection: AsyncConnection, token: str) -> None:
+        '''
+        Method for continuing a running match on a new connection of the player with this token
+        '''
+        player = self.sessions.get(token)
+        # A finished match is resumed as well, the result may have been lost with the connection
+        if player is None or not (player.resumable or player.match and player.match.winner):
+            await connection.send(RESUME_FAILED)
+            await connection.close()
+            return
+        # The format stays the one of the lost connection
+        accepted = {compact.CAPS: None} if player.binary else {}
+        accepted[RESUME] = token
+        await connection.send(encode_caps(accepted, server=True))
+        self.stats["resumes"] += 1
+        await player.reattach(connection)
+        await self.play_matches(player, queued=True)
+
+    async def play_matches(self, player: Player, queued: bool = False) -> None:
+        '''
+        Method for queueing a player, sending the username again after a finished match queues for the next one
+        '''
+        connection = player.connection
+        while True:
+            if player.token:
+                self.sessions[player.token] = player
+            if not queued:
+                self.matchmake(player)
+            queued = False
+            requeue = await player.done
+            if player.connection is not connection:
+                # The player went on on a newer connection
+                return
+            if not requeue:
+                # Closed by the match already, or the player left while waiting
+                await connection.close()
+                break
+            try:
+                if player.binary:
+                    name = str(await connection.recv_packet(), 'utf-8')
+                else:
+                    name = await connection.recv()
+            except (OSError, asyncio.TimeoutError, UnicodeDecodeError):
+                # Clients which only play one game just close the connection
+                await connection.close()
+                break
+            self.stats["requeues"] += 1
+            player = Player(name, connection, player.binary, player.token, self.resume_grace)
+        if player.token:
+            # The client may still come back for the result within the grace period
+            asyncio.get_running_loop().call_later(self.resume_grace, self.forget, player)
+
+    def forget(self, player: Player) -> None:
+        if self.sessions.get(player.token) is player:
+            del self.sessions[player.token]
+
+    def matchmake(self, player: Player) -> None:
+        '''
+        Method for pairing a player with the one who is waiting the longest
+        '''
+        # Players who left while waiting would only abort the match
+        while self.waiting and self.waiting[0].connection.closed:
+            self.waiting.popleft().done.set_result(False)
+        if not self.waiting:
+            self.waiting.append(player)
+            return
+        opponent = self.waiting.popleft()
+        task = asyncio.get_running_loop().create_task(Match(self, opponent, player).play())
+        self.matches.add(task)
+        task.add_done_callback(self.matches.discard)
+
+
+if __name__ == "__main__":
+    # Command line options
+    parser = argparse.ArgumentParser(description="Local battleship server")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--deterministic", action="store_true",
+                        help="pair players in order and let the first one start, for reproducible runs")
+    parser.add_argument("--seed", type=int, default=None, help="seed for who starts a match")
+    parser.add_argument("--binary", action="store_true",
+                        help="offer the compact binary format, clients have to answer the offer")
+    parser.add_argument("--resume", action="store_true",
+                        help="offer resuming after a lost connection, clients have to answer the offer")
+    parser.add_argument("--resume-grace", type=float, default=30.0,
+                        help="seconds a match waits for a player who lost the connection, with --resume")
+    args = parser.parse_args()
+    server = BattleshipServer(args.host, args.port, args.deterministic, args.seed,
+                              binary=args.binary, resume_grace=args.resume_grace if args.resume else 0.0)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,285 @@
+import argparse
+import queue
+import struct
+import threading
+import time
+
+from compact import UPDATE
+from core import Fleet, GameSession
+from protocol import BoardUpdate, decode_caps, BOARD_SIZE
+#Importing various librarys
+#argparse = command line options
+#queue = records from the network thread to the writer thread
+#struct = binary record headers
+#threading = writing and replaying in the background
+#time = timestamps and replay speed
+#compact = recognizing field updates of the compact format
+#core = the same message handling as a live game
+#protocol = decoded board format
+# A transcript is a header followed by records, every record is
+# timestamp (float64), kind (uint8), payload length (uint32) and the payload
+
+MAGIC = b"BSTR1"
+HEADER = struct.Struct("<5sB")
+RECORD = struct.Struct("<dBI")
+SNAPSHOT = struct.Struct("<I")
+
+# Record kinds
+RECEIVED = 0
+SENT = 1
+# Both boards after a field update, written every snapshot_every updates
+BOARD_SNAPSHOT = 2
+# Messages of the compact format, stored as they are
+RECEIVED_PACKET = 3
+SENT_PACKET = 4
+
+
+class TranscriptWriter:
+    '''
+    Class for recording all frames of a game, the file is written by a background thread
+    Calling received / sent only puts the frame into a queue, so the network thread never waits for the disk
+    '''
+    def __init__(self, path: str, size: int = BOARD_SIZE, snapshot_every: int = 10) -> None:
+        '''
+        Creating the file and starting the writer thread
+        '''
+        self.path = path
+        self.size = size
+        self.snapshot_every = snapshot_every
+        self.updates = 0
+        self.records = 0
+        self._start = time.perf_counter()
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, size))
+        self._thread = threading.Thread(target=self._write, daemon=True)
+        self._thread.start()
+
+    def received(self, message: str) -> None:
+        self._queue.put((time.perf_counter() - self._start, RECEIVED, message))
+
+    def sent(self, message: str) -> None:
+        self._queue.put((time.perf_counter() - self._start, SENT, message))
+
+    def received_packet(self, payload: bytes) -> None:
+        self._queue.put((time.perf_counter() - self._start, RECEIVED_PACKET, payload))
+
+    def sent_packet(self, payload: bytes) -> None:
+        self._queue.put((time.perf_counter() - self._start, SENT_PACKET, payload))
+
+    def board(self, update: BoardUpdate) -> None:
+        '''
+        Method for counting a decoded field update, every snapshot_every updates both boards are stored
+        '''
+        self.updates += 1
+        if self.updates % self.snapshot_every == 0:
+            self._queue.put((time.perf_counter() - self._start, BOARD_SNAPSHOT, (self.updates, update)))
+
+    def _write(self) -> None:
+        '''
+        Writer thread, packs the queued records until close is called
+        '''
+        while True:
+            item = self._queue.get()
+            # Everything which is already queued is written in one go
+            batch = [item]
+            try:
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            chunks = []
+            for record in batch:
+                if record is None:
+                    self._file.write(b"".join(chunks))
+                    self._file.close()
+                    return
+                timestamp, kind, payload = record
+                if kind == BOARD_SNAPSHOT:
+                    updates, update = payload
+                    payload = SNAPSHOT.pack(updates) + update.own + update.opponent
+                elif kind in (RECEIVED, SENT):
+                    payload = payload.encode("utf-8")
+                chunks.append(RECORD.pack(timestamp, kind, len(payload)))
+                chunks.append(payload)
+                self.records += 1
+            self._file.write(b"".join(chunks))
+            self._file.flush()
+
+    def close(self) -> None:
+        '''
+        Method for writing the remaining records and closing the file
+        '''
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+
+class TranscriptReader:
+    '''
+    Class for reading a transcript, the index of all records is built from the headers only
+    '''
+    def __init__(self, path: str) -> None:
+        '''
+        Opening the file and indexing the records
+        '''
+        self.path = path
+        # Records as (timestamp, kind, offset of the payload, length)
+        self.index = []
+        # Snapshots as (number of updates, position in index)
+        self.snapshots = []
+        # Position in index of every received field update, update n is at updates[n - 1]
+        self.updates = []
+        self._file = open(path, "rb")
+        magic, self.size = HEADER.unpack(self._file.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a transcript")
+        while True:
+            header = self._file.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            timestamp, kind, length = RECORD.unpack(header)
+            offset = self._file.tell()
+            if kind == BOARD_SNAPSHOT:
+                self.snapshots.append((SNAPSHOT.unpack(self._file.read(SNAPSHOT.size))[0], len(self.index)))
+            elif kind == RECEIVED and length and self._file.read(1) == b"{":
+                self.updates.append(len(self.index))
+            elif kind == RECEIVED_PACKET and length and self._file.read(1) == bytes([UPDATE]):
+                self.updates.append(len(self.index))
+            self.index.append((timestamp, kind, offset, length))
+            self._file.seek(offset + length)
+
+    def payload(self, position: int) -> bytes:
+        '''
+        Method for reading the payload of one record
+        '''
+        _, _, offset, length = self.index[position]
+        self._file.seek(offset)
+        return self._file.read(length)
+
+    def message(self, position: int) -> str:
+        return self.payload(position).decode("utf-8")
+
+    def snapshot(self, position: int) -> BoardUpdate:
+        '''
+        Method for reading the boards of a snapshot record
+        '''
+        data = self.payload(position)[SNAPSHOT.size:]
+        cells = self.size * self.size
+        return BoardUpdate(data[:cells], data[cells:])
+
+    def seek(self, update: int) -> tuple:
+        '''
+        Method for finding the nearest snapshot at or before the given field update
+        Returns (number of updates, boards, position of the next record), the boards are None without a snapshot
+        '''
+        found = (0, None, 0)
+        for updates, position in self.snapshots:
+            if updates > update:
+                break
+            found = (updates, self.snapshot(position), position + 1)
+        return found
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class ReplayClient:
+    '''
+    Class for playing a transcript back through a GameSession, same interface as GameClient
+    The events reach on_event exactly like in a live game, only faster
+    '''
+    def __init__(self, path: str, on_event, speed: float = 10.0, seek: int = None) -> None:
+        '''
+        Initializing the replay, seek skips to the state after that many field updates
+        '''
+        self.reader = TranscriptReader(path)
+        self.session = GameSession("replay", Fleet(self.reader.size), on_event)
+        self.on_event = on_event
+        self.speed = speed
+        self.seek = seek
+        self.thread = None
+        self._stopped = threading.Event()
+
+    def start(self) -> threading.Thread:
+        '''
+        Method for replaying in a background thread
+        '''
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def run(self) -> None:
+        '''
+        Method for replaying all received frames, waiting between them by the recorded time divided by speed
+        '''
+        reader = self.reader
+        self.session.start()
+        position = 0
+        skip_until = -1
+        if self.seek:
+            updates, boards, position = reader.seek(self.seek)
+            # Everything before the snapshot is replayed without waiting and without field updates
+            skipped = set(reader.updates)
+            for earlier in range(position):
+                if earlier not in skipped:
+                    self.replay(earlier)
+            if boards:
+                self.session.board = boards
+                self.on_event("board", boards)
+            # Remaining updates up to the target are applied without waiting
+            if reader.updates:
+                skip_until = reader.updates[min(self.seek, len(reader.updates)) - 1]
+
+        previous = reader.index[position][0] if position < len(reader.index) else 0
+        while position < len(reader.index) and self.session.active and not self._stopped.is_set():
+            timestamp, kind, _, _ = reader.index[position]
+            if kind in (RECEIVED, RECEIVED_PACKET):
+                if position > skip_until:
+                    self._stopped.wait(max(0.0, timestamp - previous) / self.speed)
+                previous = timestamp
+                self.replay(position)
+            position += 1
+        reader.close()
+
+    def replay(self, position: int) -> None:
+        '''
+        Method for passing one received record to the session, sent records and snapshots are skipped
+        '''
+        kind = self.reader.index[position][1]
+        if kind == RECEIVED:
+            message = self.reader.message(position)
+            # The answer to the capabilities is not part of the game
+            if decode_caps(message) is None:
+                self.session.receive(message)
+        elif kind == RECEIVED_PACKET:
+            self.session.receive_packet(self.reader.payload(position))
+
+    def move(self, row: int, col: int) -> None:
+        '''
+        Shots are ignored during a replay
+        '''
+
+    def close(self) -> None:
+        self._stopped.set()
+
+
+def describe(path: str) -> None:
+    '''
+    Function for printing a short summary of a transcript
+    '''
+    reader = TranscriptReader(path)
+    duration = reader.index[-1][0] if reader.index else 0
+    sent = sum(1 for record in reader.index if record[1] in (SENT, SENT_PACKET))
+    print(f"{path}: {len(reader.index)} records, {sent} sent, {len(reader.updates)} field updates, "
+          f"{len(reader.snapshots)} snapshots, {duration:.1f} s")
+    reader.close()
+
+
+if __name__ == "__main__":
+    # Command line options
+    parser = argparse.ArgumentParser(description="Shows a summary of game transcripts, replay them with main.py --replay")
+    parser.add_argument("paths", nargs="+", help="transcript files")
+    args = parser.parse_args()
+    for transcript in args.paths:
+        describe(transcript)